@@ -3,19 +3,27 @@ Admin API — all routes require the 'admin' role.
 Prefix (set in main.py): /api/v1/admin
 """
 
-import csv
-import io
+import tempfile
 from datetime import date, datetime, timedelta, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, status, Response
-from fastapi.responses import StreamingResponse
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-
-from app.core.database import get_db
-from app.core.dependencies import require_role, get_current_user
-from app.core.security import hash_password, verify_password
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, UploadFile, File, status, Response
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session, aliased
+from starlette.concurrency import run_in_threadpool
+
+from app.core.csv_stream import csv_response
+from app.core.database import SessionLocal, async_engine, engine, get_db, get_read_db, read_engine
+from app.core.dependencies import require_role, get_current_user_orm
+from app.core.pool_metrics import pool_metrics
+from app.core.principal_cache import principal_cache
+from app.core.response_cache import CLASSES_SCOPE, SUBJECTS_SCOPE, response_cache
+from app.core.serialization import trusted
+from app.core.security import hash_password, hash_password_async, verify_password_async, bcrypt_pool
+from app.services import attendance_facts
+from app.services.id_allocator import id_allocator
+from app.services.timetable_service import TIMETABLE_SCOPE, class_scope, invalidate_timetables, student_scope
+from app.services.user_import import import_jobs, run_import
 from app.models.user import User, Role
 from app.models.admin import (
     Class, ClassSubject, StudentProfile, Subject, TimetableEntry,
@@ -23,8 +31,7 @@ from app.models.admin import (
 )
 from app.models.extensions import (
     AttendanceRecord, AttendanceStatusEnum,
-    AttendanceSession, SessionAttendanceRecord, SessionAttendanceStatusEnum,
-    FeePlan, FeePayment,
+    FeePlan,
     Event,
 )
 from app.schemas.admin import (
@@ -61,20 +68,18 @@ def _unique_email(base_email: str, db: Session) -> str:
     return email
 
 
-def _next_student_code(db: Session) -> str:
-    count = db.query(StudentProfile).count() + 1
-    return f"ST{count:04d}"
-
-
-def _next_staff_id(db: Session) -> str:
-    count = db.query(TeacherProfile).count() + 1
-    return f"TCH{count:03d}"
+async def _spool_upload(file: UploadFile) -> str:
+    """Copy an upload to a temp file in 1 MB pieces so the import can stream it."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as tmp:
+        while chunk := await file.read(1024 * 1024):
+            tmp.write(chunk)
+        return tmp.name
 
 
 # Dashboard
 
 @router.get("/dashboard")
-def admin_dashboard(db: Session = Depends(get_db), _=_admin):
+def admin_dashboard(db: Session = Depends(get_read_db), _=_admin):
     today = date.today()
     thirty_days_ago = today - timedelta(days=30)
 
@@ -92,76 +97,38 @@ def admin_dashboard(db: Session = Depends(get_db), _=_admin):
         .count()
     )
 
-    # Attendance rate (last 30 days) — from session-based records
-    att_total = (
-        db.query(func.count(SessionAttendanceRecord.student_id))
-        .join(AttendanceSession, AttendanceSession.id == SessionAttendanceRecord.attendance_session_id)
-        .filter(
-            AttendanceSession.session_date.between(thirty_days_ago, today),
-            SessionAttendanceRecord.status.isnot(None),
+    # Attendance rate and daily trend (last 30 days) — daily facts + today's records
+    daily = attendance_facts.daily_counts(thirty_days_ago, today, today)
+    marked, attended = attendance_facts.totals(daily)
+    att_rows = db.execute(
+        select(
+            daily.c.session_date.label("date"),
+            func.sum(marked).label("total"),
+            func.sum(attended).label("present"),
         )
-        .scalar()
-    ) or 0
-    att_present = (
-        db.query(func.count(SessionAttendanceRecord.student_id))
-        .join(AttendanceSession, AttendanceSession.id == SessionAttendanceRecord.attendance_session_id)
-        .filter(
-            AttendanceSession.session_date.between(thirty_days_ago, today),
-            SessionAttendanceRecord.status.in_([
-                SessionAttendanceStatusEnum.PRESENT,
-                SessionAttendanceStatusEnum.LATE,
-            ]),
-        )
-        .scalar()
-    ) or 0
+        .group_by(daily.c.session_date)
+        .order_by(daily.c.session_date)
+    ).all()
+    att_total = sum(r.total for r in att_rows)
+    att_present = sum(r.present for r in att_rows)
     attendance_rate = round((att_present / att_total * 100), 1) if att_total else 0.0
 
-    # Unpaid fees — total outstanding amount across all plans
-    plans = db.query(FeePlan).all()
-    total_outstanding = 0.0
-    paid_count = 0
-    partial_unpaid_count = 0
-    overdue_count = 0
-    for fp in plans:
-        paid = float(sum(p.amount_paid for p in fp.payments))
-        balance = float(fp.total_amount) - paid
-        if balance <= 0:
-            paid_count += 1
-        else:
-            total_outstanding += balance
-            is_overdue = fp.due_date < today if fp.due_date else False
-            if is_overdue:
-                overdue_count += 1
-            else:
-                partial_unpaid_count += 1
-
-    # Attendance trend (daily) — from session-based records
-    from sqlalchemy import case as sql_case, func as sql_func
-    att_rows = (
-        db.query(
-            AttendanceSession.session_date.label("date"),
-            sql_func.count(SessionAttendanceRecord.student_id).label("total"),
-            sql_func.sum(
-                sql_case(
-                    (SessionAttendanceRecord.status.in_([
-                        SessionAttendanceStatusEnum.PRESENT,
-                        SessionAttendanceStatusEnum.LATE,
-                    ]), 1),
-                    else_=0,
-                )
-            ).label("present"),
-        )
-        .join(AttendanceSession, AttendanceSession.id == SessionAttendanceRecord.attendance_session_id)
-        .filter(
-            AttendanceSession.session_date.between(thirty_days_ago, today),
-            SessionAttendanceRecord.status.isnot(None),
-        )
-        .group_by(AttendanceSession.session_date)
-        .order_by(AttendanceSession.session_date)
-        .all()
-    )
+    # Unpaid fees — outstanding amount and Paid / Pending / Overdue counts, one pass over the ledger
+    owing = FeePlan.balance > 0
+    overdue = owing & (FeePlan.due_date < today)
+    fees = db.query(
+        func.coalesce(func.sum(case((owing, FeePlan.balance), else_=0)), 0).label("outstanding"),
+        func.coalesce(func.sum(case((owing, 0), else_=1)), 0).label("paid"),
+        func.coalesce(func.sum(case((overdue, 1), else_=0)), 0).label("overdue"),
+        func.count(FeePlan.id).label("plans"),
+    ).one()
+    total_outstanding = float(fees.outstanding)
+    paid_count = int(fees.paid)
+    overdue_count = int(fees.overdue)
+    partial_unpaid_count = fees.plans - paid_count - overdue_count
+
     attendance_trend = [
-        {"month": r.date.strftime("%b %d"), "rate": round((r.present / r.total * 100), 1) if r.total else 0}
+        {"month": attendance_facts.as_date(r.date).strftime("%b %d"), "rate": round((r.present / r.total * 100), 1) if r.total else 0}
         for r in att_rows
     ]
 
@@ -176,7 +143,7 @@ def admin_dashboard(db: Session = Depends(get_db), _=_admin):
     class_rows = (
         db.query(
             Class.name.label("grade"),
-            sql_func.count(StudentProfile.id).label("students"),
+            func.count(StudentProfile.id).label("students"),
         )
         .outerjoin(StudentProfile, StudentProfile.class_id == Class.id)
         .group_by(Class.id, Class.name)
@@ -214,13 +181,41 @@ def admin_dashboard(db: Session = Depends(get_db), _=_admin):
     }
 
 
+# Runtime telemetry
+
+@router.get("/metrics")
+def runtime_metrics(_=_admin):
+    """DB pool health (per engine) plus the auth caches, for ops dashboards."""
+    engines = {"primary": engine, "async": async_engine.sync_engine}
+    if read_engine is not engine:
+        engines["replica"] = read_engine
+    return {
+        "db_pools": pool_metrics(engines),
+        "principal_cache": principal_cache.stats(),
+        "bcrypt_pool": bcrypt_pool.stats(),
+        "response_cache": response_cache.stats(),
+    }
+
+
+@router.get("/principal-cache")
+def principal_cache_stats(_=_admin):
+    """Hit/miss counters for the in-process authenticated-principal cache."""
+    return principal_cache.stats()
+
+
+@router.get("/bcrypt-pool")
+def bcrypt_pool_stats(_=_admin):
+    """Queue depth and wait/run timings for the dedicated bcrypt executor."""
+    return bcrypt_pool.stats()
+
+
 # Admin Password Change
 
 @router.patch("/profile/password")
-def change_own_password(
+async def change_own_password(
     payload: dict,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_orm),
 ):
     """Lets the logged-in admin change their own password."""
     old_password = payload.get("old_password", "")
@@ -230,11 +225,11 @@ def change_own_password(
         raise HTTPException(status_code=422, detail="old_password and new_password are required.")
     if len(new_password) < 6:
         raise HTTPException(status_code=422, detail="New password must be at least 6 characters.")
-    if not verify_password(old_password, current_user.hashed_password):
+    if not await verify_password_async(old_password, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Current password is incorrect.")
 
-    current_user.hashed_password = hash_password(new_password)
-    db.commit()
+    current_user.hashed_password = await hash_password_async(new_password)
+    await run_in_threadpool(db.commit)
     return {"detail": "Password updated successfully."}
 
 
@@ -248,7 +243,13 @@ def list_users(
     _=_admin,
 ):
     """List users, optionally filtered by role and search term. Excludes soft-deleted."""
-    q = db.query(User).join(User.role).filter(User.deleted_at == None)  # noqa: E711
+    q = (
+        db.query(User.id, User.full_name, User.email, Role.name, Class.name, User.is_active)
+        .join(Role, User.role_id == Role.id)
+        .outerjoin(StudentProfile, StudentProfile.user_id == User.id)
+        .outerjoin(Class, Class.id == StudentProfile.class_id)
+        .filter(User.deleted_at == None)  # noqa: E711
+    )
     if role:
         q = q.filter(Role.name == role)
     if search:
@@ -256,27 +257,19 @@ def list_users(
         q = q.filter(
             (User.full_name.ilike(term)) | (User.email.ilike(term))
         )
-    users = q.all()
 
-    result = []
-    for u in users:
-        class_name = None
-        if u.role.name == "student":
-            profile = db.query(StudentProfile).filter(StudentProfile.user_id == u.id).first()
-            if profile and profile.class_:
-                class_name = profile.class_.name
-
-        result.append(
-            AdminUserRead(
-                id=u.id,
-                full_name=u.full_name,
-                email=u.email,
-                role=u.role.name,
-                class_name=class_name,
-                is_active=u.is_active,
-            )
-        )
-    return result
+    rows = [
+        {
+            "id": uid,
+            "full_name": full_name,
+            "email": email,
+            "role": role_name,
+            "class_name": class_name if role_name == "student" else None,
+            "is_active": bool(is_active),
+        }
+        for uid, full_name, email, role_name, class_name, is_active in q
+    ]
+    return trusted(rows, List[AdminUserRead])
 
 
 @router.post("/users", response_model=AdminUserRead, status_code=201)
@@ -289,6 +282,12 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db), _=_admin):
     base_email = _generate_email(payload.first_name, payload.last_name, payload.role)
     email = _unique_email(base_email, db)
 
+    # Reserve the profile code before this session starts writing
+    if payload.role == "student":
+        profile_code = id_allocator.student_code()
+    elif payload.role == "teacher":
+        profile_code = id_allocator.staff_id()
+
     user = User(
         email=email,
         full_name=f"{payload.first_name.strip()} {payload.last_name.strip()}",
@@ -305,7 +304,7 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db), _=_admin):
         data = payload.student or StudentCreateData()
         profile = StudentProfile(
             user_id=user.id,
-            student_code=_next_student_code(db),
+            student_code=profile_code,
             class_id=data.class_id,
             dob=data.dob,
             address=data.address,
@@ -321,7 +320,7 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db), _=_admin):
         data = payload.teacher or TeacherCreateData()
         tp = TeacherProfile(
             user_id=user.id,
-            staff_id=_next_staff_id(db),
+            staff_id=profile_code,
             dob=data.dob,
             address=data.address,
             phone=data.phone,
@@ -342,6 +341,8 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db), _=_admin):
             ))
 
     db.commit()
+    if payload.role == "student":
+        response_cache.bump(CLASSES_SCOPE)
     db.refresh(user)
 
     return AdminUserRead(
@@ -356,53 +357,24 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db), _=_admin):
 
 @router.post("/users/import")
 async def bulk_import(  # must come before /users/{user_id}/... routes
+    background_tasks: BackgroundTasks,
+    response: Response,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    background: bool = Query(False, description="Return 202 + job_id immediately and import in the background"),
     _=_admin,
 ):
     """Bulk CSV import. Expected columns: full_name, email, role, class (optional)."""
-    content = await file.read()
-    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
-
-    created, skipped = 0, 0
-    for row in reader:
-        email = row.get("email", "").strip().lower()
-        if not email or db.query(User).filter(User.email == email).first():
-            skipped += 1
-            continue
-
-        role_name = row.get("role", "student").strip().lower()
-        role = db.query(Role).filter(Role.name == role_name).first()
-        if not role:
-            skipped += 1
-            continue
-
-        u = User(
-            email=email,
-            full_name=row.get("full_name", "").strip(),
-            hashed_password=hash_password("changeme123"),
-            role_id=role.id,
-            is_active=True,
-        )
-        db.add(u)
-        db.flush()
+    job = import_jobs.create("users")
+    path = await _spool_upload(file)
+    if background:
+        background_tasks.add_task(run_import, job.id, path, None, "changeme123")
+        response.status_code = status.HTTP_202_ACCEPTED
+        return job.to_dict(include_details=False)
 
-        if role_name == "student":
-            profile = StudentProfile(
-                user_id=u.id,
-                student_code=_next_student_code(db),
-            )
-            db.add(profile)
-            cls_name = row.get("class", "").strip()
-            if cls_name:
-                cls = db.query(Class).filter(Class.name == cls_name).first()
-                if cls:
-                    profile.class_id = cls.id
-
-        created += 1
-
-    db.commit()
-    return {"created": created, "skipped": skipped}
+    await run_in_threadpool(run_import, job.id, path, None, "changeme123")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Import failed: {job.error}")
+    return {"created": job.created, "skipped": job.skipped, "job_id": job.id}
 
 
 @router.get("/users/{user_id}/detail", response_model=UserDetailRead)
@@ -500,6 +472,7 @@ def update_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    renamed = payload.full_name is not None and payload.full_name.strip() != user.full_name
     if payload.full_name is not None:
         user.full_name = payload.full_name.strip()
     if payload.is_active is not None:
@@ -511,7 +484,7 @@ def update_user(
         d = payload.student
         profile = db.query(StudentProfile).filter(StudentProfile.user_id == user_id).first()
         if not profile:
-            profile = StudentProfile(user_id=user_id, student_code=_next_student_code(db))
+            profile = StudentProfile(user_id=user_id, student_code=id_allocator.student_code())
             db.add(profile)
         if d.class_id is not None:
             profile.class_id = d.class_id
@@ -528,7 +501,7 @@ def update_user(
         d = payload.teacher
         tp = db.query(TeacherProfile).filter(TeacherProfile.user_id == user_id).first()
         if not tp:
-            tp = TeacherProfile(user_id=user_id, staff_id=_next_staff_id(db))
+            tp = TeacherProfile(user_id=user_id, staff_id=id_allocator.staff_id())
             db.add(tp)
         if d.dob is not None:
             tp.dob = d.dob
@@ -559,6 +532,13 @@ def update_user(
 
     db.commit()
     db.refresh(user)
+    principal_cache.invalidate(user_id)
+    if user.role.name == "student" and payload.student:
+        response_cache.bump(CLASSES_SCOPE, student_scope(user_id))
+    if renamed and user.role.name == "teacher":
+        # Names appear in every timetable and as class head teacher
+        response_cache.bump(CLASSES_SCOPE)
+        invalidate_timetables(everything=True)
 
     return AdminUserRead(
         id=user.id,
@@ -579,22 +559,27 @@ def delete_user(user_id: int, db: Session = Depends(get_db), _=_admin):
     user.deleted_at = datetime.now(timezone.utc)
     user.is_active = False
     db.commit()
+    principal_cache.invalidate(user_id)
+    response_cache.bump(CLASSES_SCOPE)
     return Response(status_code=204)
 
 
 @router.post("/users/{user_id}/password")
-def reset_password(
+async def reset_password(
     user_id: int,
     payload: PasswordReset,
     db: Session = Depends(get_db),
     _=_admin,
 ):
     """Reset a user's password. Defaults to '12345' if no password provided."""
-    user = db.query(User).filter(User.id == user_id, User.deleted_at == None).first()  # noqa: E711
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.id == user_id, User.deleted_at == None).first()  # noqa: E711
+    )
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    user.hashed_password = hash_password(payload.new_password or "12345")
-    db.commit()
+    user.hashed_password = await hash_password_async(payload.new_password or "12345")
+    await run_in_threadpool(db.commit)
+    principal_cache.invalidate(user_id)
     return {"status": "ok"}
 
 
@@ -631,88 +616,100 @@ def search_students(
 def export_users(
     role: str,
     search: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
     _=_admin,
 ):
-    """Export users of a given role to CSV."""
+    """Export users of a given role to CSV, streamed in batches (see app/core/csv_stream.py)."""
     if role not in ("student", "teacher", "parent"):
         raise HTTPException(status_code=400, detail="Invalid role. Use student, teacher, or parent.")
 
-    q = (
-        db.query(User)
-        .join(User.role)
-        .filter(Role.name == role, User.deleted_at == None)  # noqa: E711
-    )
-    if search:
-        term = f"%{search}%"
-        q = q.filter((User.full_name.ilike(term)) | (User.email.ilike(term)))
-    users = q.all()
-
-    output = io.StringIO()
-    writer = csv.writer(output)
+    def status_of(r) -> str:
+        return "active" if r.is_active else "suspended"
 
     if role == "student":
-        writer.writerow(["full_name", "email", "student_code", "class", "dob", "phone", "address", "status"])
-        for u in users:
-            p = db.query(StudentProfile).filter(StudentProfile.user_id == u.id).first()
-            writer.writerow([
-                u.full_name, u.email,
-                p.student_code if p else "",
-                p.class_.name if p and p.class_ else "",
-                str(p.dob) if p and p.dob else "",
-                p.phone or "" if p else "",
-                p.address or "" if p else "",
-                "active" if u.is_active else "suspended",
-            ])
+        header = ["full_name", "email", "student_code", "class", "dob", "phone", "address", "status"]
+        stmt = (
+            select(User.full_name, User.email, User.is_active, StudentProfile.student_code,
+                   Class.name.label("class_name"), StudentProfile.dob, StudentProfile.phone, StudentProfile.address)
+            .outerjoin(StudentProfile, StudentProfile.user_id == User.id)
+            .outerjoin(Class, Class.id == StudentProfile.class_id)
+        )
+
+        def to_row(r):
+            return [
+                r.full_name, r.email, r.student_code or "", r.class_name or "",
+                str(r.dob) if r.dob else "", r.phone or "", r.address or "", status_of(r),
+            ]
 
     elif role == "teacher":
-        writer.writerow(["full_name", "email", "staff_id", "phone", "address", "bio", "subjects", "status"])
-        all_subjects = {s.id: s.name for s in db.query(Subject).all()}
-        for u in users:
-            tp = db.query(TeacherProfile).filter(TeacherProfile.user_id == u.id).first()
-            ts_ids = [ts.subject_id for ts in db.query(TeacherSubject).filter(TeacherSubject.teacher_id == u.id).all()]
-            subject_names = ", ".join(all_subjects[sid] for sid in ts_ids if sid in all_subjects)
-            writer.writerow([
-                u.full_name, u.email,
-                tp.staff_id or "" if tp else "",
-                tp.phone or "" if tp else "",
-                tp.address or "" if tp else "",
-                tp.bio or "" if tp else "",
-                subject_names,
-                "active" if u.is_active else "suspended",
-            ])
+        header = ["full_name", "email", "staff_id", "phone", "address", "bio", "subjects", "status"]
+        subjects = (
+            select(func.aggregate_strings(Subject.name, ", "))
+            .join(TeacherSubject, TeacherSubject.subject_id == Subject.id)
+            .where(TeacherSubject.teacher_id == User.id)
+            .scalar_subquery()
+        )
+        stmt = (
+            select(User.full_name, User.email, User.is_active, TeacherProfile.staff_id,
+                   TeacherProfile.phone, TeacherProfile.address, TeacherProfile.bio, subjects.label("subjects"))
+            .outerjoin(TeacherProfile, TeacherProfile.user_id == User.id)
+        )
+
+        def to_row(r):
+            return [
+                r.full_name, r.email, r.staff_id or "", r.phone or "", r.address or "", r.bio or "",
+                r.subjects or "", status_of(r),
+            ]
 
     else:  # parent
-        writer.writerow(["full_name", "email", "phone", "address", "linked_students", "status"])
-        for u in users:
-            links = db.query(ParentStudent).filter(ParentStudent.parent_id == u.id).all()
-            student_names = []
-            for lnk in links:
-                s = db.query(User).filter(User.id == lnk.student_id).first()
-                if s:
-                    student_names.append(s.full_name)
-            writer.writerow([
-                u.full_name, u.email,
+        header = ["full_name", "email", "phone", "address", "linked_students", "status"]
+        child = aliased(User)
+        children = (
+            select(func.aggregate_strings(child.full_name, ", "))
+            .join(ParentStudent, ParentStudent.student_id == child.id)
+            .where(ParentStudent.parent_id == User.id)
+            .scalar_subquery()
+        )
+        stmt = select(User.full_name, User.email, User.is_active, children.label("children"))
+
+        def to_row(r):
+            return [
+                r.full_name, r.email,
                 "", "",   # no dedicated phone/address profile for parents yet
-                ", ".join(student_names),
-                "active" if u.is_active else "suspended",
-            ])
-
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={role}s_export.csv"},
+                r.children or "", status_of(r),
+            ]
+
+    stmt = (
+        stmt.join(Role, Role.id == User.role_id)
+        .where(Role.name == role, User.deleted_at == None)  # noqa: E711
+        .order_by(User.id)
     )
+    if search:
+        term = f"%{search}%"
+        stmt = stmt.where((User.full_name.ilike(term)) | (User.email.ilike(term)))
+    return csv_response(f"{role}s_export.csv", header, stmt, to_row)
 
 
 # Role-specific CSV Import
 
+def _role_exists(role: str) -> bool:
+    """
+    Own short-lived session, closed before run_import opens its own, so an
+    import holds one pool connection rather than two.
+    """
+    db = SessionLocal()
+    try:
+        return db.query(Role.id).filter(Role.name == role).first() is not None
+    finally:
+        db.close()
+
+
 @router.post("/import/{role}")
 async def role_import(
     role: str,
+    background_tasks: BackgroundTasks,
+    response: Response,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    background: bool = Query(False, description="Return 202 + job_id immediately and import in the background"),
     _=_admin,
 ):
     """
@@ -725,72 +722,29 @@ async def role_import(
     if role not in ("student", "teacher", "parent"):
         raise HTTPException(status_code=400, detail="Invalid role.")
 
-    role_obj = db.query(Role).filter(Role.name == role).first()
-    if not role_obj:
+    if not await run_in_threadpool(_role_exists, role):
         raise HTTPException(status_code=400, detail="Role not found in database.")
 
-    content = await file.read()
-    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
-
-    created, skipped = 0, 0
-    details: list = []
-
-    for i, row in enumerate(reader, start=2):
-        full_name = row.get("full_name", "").strip()
-        if not full_name:
-            skipped += 1
-            details.append({"line": i, "status": "skipped", "reason": "Missing full_name"})
-            continue
-
-        email = row.get("email", "").strip().lower()
-        if not email:
-            parts = full_name.split()
-            fname, lname = parts[0], parts[-1] if len(parts) > 1 else parts[0]
-            email = _unique_email(_generate_email(fname, lname, role), db)
-        elif db.query(User).filter(User.email == email).first():
-            skipped += 1
-            details.append({"line": i, "status": "skipped", "email": email, "reason": "Email already exists"})
-            continue
-
-        u = User(
-            email=email,
-            full_name=full_name,
-            hashed_password=hash_password("12345"),
-            role_id=role_obj.id,
-            is_active=True,
-        )
-        db.add(u)
-        db.flush()
+    job = import_jobs.create(role)
+    path = await _spool_upload(file)
+    if background:
+        background_tasks.add_task(run_import, job.id, path, role, "12345")
+        response.status_code = status.HTTP_202_ACCEPTED
+        return job.to_dict(include_details=False)
 
-        if role == "student":
-            profile = StudentProfile(user_id=u.id, student_code=_next_student_code(db))
-            db.add(profile)
-            cls_name = row.get("class", "").strip()
-            if cls_name:
-                cls = db.query(Class).filter(Class.name == cls_name).first()
-                if cls:
-                    profile.class_id = cls.id
-
-        elif role == "teacher":
-            tp = TeacherProfile(
-                user_id=u.id,
-                staff_id=_next_staff_id(db),
-                bio=row.get("bio", "").strip() or None,
-            )
-            db.add(tp)
-            db.flush()
-            subj_str = row.get("subjects", "").strip()
-            if subj_str:
-                for sname in [s.strip() for s in subj_str.split(",") if s.strip()]:
-                    s_obj = db.query(Subject).filter(Subject.name.ilike(sname)).first()
-                    if s_obj:
-                        db.add(TeacherSubject(teacher_id=u.id, subject_id=s_obj.id))
+    await run_in_threadpool(run_import, job.id, path, role, "12345")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Import failed: {job.error}")
+    return {"created": job.created, "skipped": job.skipped, "details": job.details, "job_id": job.id}
 
-        created += 1
-        details.append({"line": i, "status": "created", "email": email})
 
-    db.commit()
-    return {"created": created, "skipped": skipped, "details": details}
+@router.get("/import/jobs/{job_id}")
+def get_import_job(job_id: str, _=_admin):
+    """Progress and per-row errors for a CSV import started with ?background=true."""
+    job = import_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found.")
+    return job.to_dict()
 
 
 @router.patch("/users/{user_id}/status", response_model=AdminUserRead)
@@ -807,6 +761,7 @@ def toggle_status(
     user.is_active = payload.is_active
     db.commit()
     db.refresh(user)
+    principal_cache.invalidate(user_id)
     return AdminUserRead(
         id=user.id,
         full_name=user.full_name,
@@ -836,14 +791,14 @@ def assign_class(
 
     profile = db.query(StudentProfile).filter(StudentProfile.user_id == user_id).first()
     if not profile:
-        count = db.query(StudentProfile).count() + 1
         profile = StudentProfile(
             user_id=user_id,
-            student_code=_next_student_code(db),
+            student_code=id_allocator.student_code(),
         )
         db.add(profile)
     profile.class_id = payload.class_id
     db.commit()
+    response_cache.bump(CLASSES_SCOPE, student_scope(user_id))
 
     return AdminUserRead(
         id=user.id,
@@ -858,14 +813,28 @@ def assign_class(
 # Subjects
 
 @router.get("/subjects", response_model=List[SubjectRead])
-def list_subjects(db: Session = Depends(get_db), _=_admin):
-    return db.query(Subject).order_by(Subject.name).all()
+def list_subjects(request: Request, db: Session = Depends(get_db), _=_admin):
+    body = response_cache.get("admin:subjects")
+    if body is None:
+        generation = response_cache.generation()
+        subjects = [SubjectRead.model_validate(s) for s in db.query(Subject).order_by(Subject.name).all()]
+        body = response_cache.put("admin:subjects", [SUBJECTS_SCOPE], subjects, generation)
+    return response_cache.respond(request, body)
 
 
 # Classes
 
 @router.get("/classes", response_model=List[ClassRead])
-def list_classes(db: Session = Depends(get_db), _=_admin):
+def list_classes(request: Request, db: Session = Depends(get_db), _=_admin):
+    """Served from the response cache (ETag / 304) until a class or student changes."""
+    body = response_cache.get("admin:classes")
+    if body is None:
+        generation = response_cache.generation()
+        body = response_cache.put("admin:classes", [CLASSES_SCOPE], _class_rows(db), generation)
+    return response_cache.respond(request, body)
+
+
+def _class_rows(db: Session) -> List[ClassRead]:
     classes = db.query(Class).all()
     result = []
     for cls in classes:
@@ -895,6 +864,7 @@ def create_class(payload: ClassCreate, db: Session = Depends(get_db), _=_admin):
     cls = Class(name=payload.name)
     db.add(cls)
     db.commit()
+    response_cache.bump(CLASSES_SCOPE)
     db.refresh(cls)
     return ClassRead(id=cls.id, name=cls.name, student_count=0, subject_count=0)
 
@@ -951,6 +921,9 @@ def manage_class(
         db.add(ClassSubject(class_id=class_id, subject_id=sid))
 
     db.commit()
+    response_cache.bump(CLASSES_SCOPE)
+    if removed_subject_ids:
+        invalidate_timetables([class_id], everything=True)
     db.refresh(cls)
 
     student_count = db.query(StudentProfile).filter(StudentProfile.class_id == class_id).count()
@@ -966,37 +939,55 @@ def manage_class(
 
 # Timetable
 
+def _timetable_slots(class_id: int, db: Session) -> List[TimetableSlot]:
+    """All entries (draft and published) of a class as builder slots."""
+    entries = (
+        db.query(TimetableEntry)
+        .filter(TimetableEntry.class_id == class_id)
+        .all()
+    )
+    return [
+        TimetableSlot(
+            day=e.day,
+            time_slot=e.time_slot,
+            subject_id=e.subject_id,
+            subject_name=e.subject.name if e.subject else None,
+            teacher_id=e.teacher_id,
+            teacher_name=e.teacher.full_name if e.teacher else None,
+            delivery_mode=e.delivery_mode,
+            location_id=e.location_id,
+            location_name=e.location.name if e.location else None,
+            online_join_url=e.online_join_url,
+        )
+        for e in entries
+        if e.subject is not None  # skip orphaned entries with deleted subjects
+    ]
+
+
+def _cached_timetable(request: Request, class_id: int, db: Session) -> Response:
+    key = f"admin:timetable:{class_id}"
+    body = response_cache.get(key)
+    if body is None:
+        generation = response_cache.generation()
+        body = response_cache.put(key, [class_scope(class_id), TIMETABLE_SCOPE], _timetable_slots(class_id, db), generation)
+    return response_cache.respond(request, body)
+
+
+def _replaced_teacher_ids(class_id: int, payload: TimetableBulk, db: Session) -> set:
+    """Teachers whose timetables a bulk rewrite of `class_id` touches (old and new)."""
+    old = {t for (t,) in db.query(TimetableEntry.teacher_id).filter(TimetableEntry.class_id == class_id)}
+    return old | {slot.teacher_id for slot in payload.slots}
+
+
 @router.get("/timetable", response_model=List[TimetableSlot])
 def get_timetable_query(
+    request: Request,
     class_id: int = Query(...),
     db: Session = Depends(get_db),
     _=_admin,
 ):
-    """GET /timetable?class_id={id} — returns [] with 200 OK if no entries exist."""
-    try:
-        entries = (
-            db.query(TimetableEntry)
-            .filter(TimetableEntry.class_id == class_id)
-            .all()
-        )
-        return [
-            TimetableSlot(
-                day=e.day,
-                time_slot=e.time_slot,
-                subject_id=e.subject_id,
-                subject_name=e.subject.name if e.subject else None,
-                teacher_id=e.teacher_id,
-                teacher_name=e.teacher.full_name if e.teacher else None,
-                delivery_mode=e.delivery_mode,
-                location_id=e.location_id,
-                location_name=e.location.name if e.location else None,
-                online_join_url=e.online_join_url,
-            )
-            for e in entries
-            if e.subject is not None
-        ]
-    except Exception:
-        return []
+    """GET /timetable?class_id={id} — returns [] with 200 OK if no entries exist. ETag / 304."""
+    return _cached_timetable(request, class_id, db)
 
 
 @router.put("/timetable", response_model=List[TimetableSlot])
@@ -1046,6 +1037,7 @@ def save_timetable_query(
                     detail=f"Teacher {t_name} is not assigned to teach {s_name} in this class.",
                 )
 
+    teacher_ids = _replaced_teacher_ids(class_id, payload, db)
     db.query(TimetableEntry).filter(TimetableEntry.class_id == class_id).delete()
     for slot in payload.slots:
         mode = (slot.delivery_mode or "ONSITE").upper()
@@ -1060,35 +1052,13 @@ def save_timetable_query(
             online_join_url=slot.online_join_url if mode == "ONLINE" else None,
         ))
     db.commit()
-    return get_timetable_query(class_id, db, _)
+    invalidate_timetables([class_id], teacher_ids)
+    return _timetable_slots(class_id, db)
 
 
 @router.get("/timetable/{class_id}", response_model=List[TimetableSlot])
-def get_timetable(class_id: int, db: Session = Depends(get_db), _=_admin):
-    try:
-        entries = (
-            db.query(TimetableEntry)
-            .filter(TimetableEntry.class_id == class_id)
-            .all()
-        )
-        return [
-            TimetableSlot(
-                day=e.day,
-                time_slot=e.time_slot,
-                subject_id=e.subject_id,
-                subject_name=e.subject.name if e.subject else None,
-                teacher_id=e.teacher_id,
-                teacher_name=e.teacher.full_name if e.teacher else None,
-                delivery_mode=e.delivery_mode,
-                location_id=e.location_id,
-                location_name=e.location.name if e.location else None,
-                online_join_url=e.online_join_url,
-            )
-            for e in entries
-            if e.subject is not None  # skip orphaned entries with deleted subjects
-        ]
-    except Exception:
-        return []
+def get_timetable(request: Request, class_id: int, db: Session = Depends(get_db), _=_admin):
+    return _cached_timetable(request, class_id, db)
 
 
 @router.post("/timetable/{class_id}/bulk", response_model=List[TimetableSlot])
@@ -1141,6 +1111,7 @@ def save_timetable(
                 )
 
     # Delete existing entries and replace
+    teacher_ids = _replaced_teacher_ids(class_id, payload, db)
     db.query(TimetableEntry).filter(TimetableEntry.class_id == class_id).delete()
     for slot in payload.slots:
         mode = (slot.delivery_mode or "ONSITE").upper()
@@ -1157,8 +1128,9 @@ def save_timetable(
             )
         )
     db.commit()
+    invalidate_timetables([class_id], teacher_ids)
 
-    return get_timetable(class_id, db, _)
+    return _timetable_slots(class_id, db)
 
 
 # Class-specific subjects & teachers (for Timetable Builder)
@@ -1332,6 +1304,9 @@ def update_class_config(
             ))
 
     db.commit()
+    response_cache.bump(CLASSES_SCOPE)
+    if removed:
+        invalidate_timetables([class_id], everything=True)
     db.refresh(cls)
 
     student_count = db.query(StudentProfile).filter(StudentProfile.class_id == class_id).count()
@@ -4,17 +4,19 @@ Prefix (set in main.py): /api/v1/admin
 All routes require the 'admin' role.
 """
 
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 from decimal import Decimal
 from typing import List, Optional
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
-from fastapi.responses import StreamingResponse
-from sqlalchemy import func, and_, case
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, false, func, insert, select
+from sqlalchemy.orm import Session, contains_eager, selectinload
 
-from app.core.database import get_db
+from app.core.csv_stream import csv_response
+from app.core.database import get_db, get_read_db
 from app.core.dependencies import require_role
+from app.core.pagination import cursor_headers, decode_cursor, page_size, split_page
+from app.core.serialization import trusted
 from app.models.admin import StudentProfile, Class
 from app.models.user import User
 from app.models.extensions import (
@@ -23,13 +25,13 @@ from app.models.extensions import (
     FeeNotificationEvent, NotificationTypeEnum,
     Event, EventTargetClass,
     Location, AttendanceSession, SessionAttendanceRecord,
-    SessionStatusEnum, SessionAttendanceStatusEnum,
+    SessionStatusEnum, SessionAttendanceStatusEnum, AttendanceStudentRollup,
 )
 from app.models.admin import TimetableEntry
 from app.schemas.extensions import (
     AttendanceUpsert, AttendanceRecordRead, AttendanceStats,
     AttendanceTrendPoint, AttendanceDistribution, ClasswiseAttendance,
-    ChronicAbsentee,
+    AttendanceDashboard, ChronicAbsentee,
     AcademicPeriodCreate, AcademicPeriodRead,
     FeePlanCreate, BulkFeePlanCreate, FeePlanUpdate, FeePaymentCreate,
     FeeStudentRead, FeeStats, FeeTrendPoint, BulkPlanResult,
@@ -37,6 +39,9 @@ from app.schemas.extensions import (
     LocationRead, LocationCreate, LocationUpdate,
     AdminSessionRead, AttendanceOverviewItem,
 )
+from app.services import attendance_rollups, fee_ledger, fee_notifications
+from app.services.attendance_dashboard import build_dashboard
+from app.services.timetable_service import invalidate_timetables
 
 router = APIRouter()
 _admin = Depends(require_role("admin"))
@@ -76,268 +81,157 @@ def _build_record_read(rec: AttendanceRecord, rate: float, history: list, db: Se
         "history": history,
     }
 
-def _session_attendance_rate(user_id: int, db: Session) -> float:
-    """Attendance rate (%) for a student (by users.id) from new session records."""
-    total = (
-        db.query(func.count(SessionAttendanceRecord.id))
-        .filter(
-            SessionAttendanceRecord.student_id == user_id,
-            SessionAttendanceRecord.status.isnot(None),
-        )
-        .scalar() or 0
-    )
-    if total == 0:
-        return 100.0
-    present = (
-        db.query(func.count(SessionAttendanceRecord.id))
-        .filter(
-            SessionAttendanceRecord.student_id == user_id,
-            SessionAttendanceRecord.status.in_([
-                SessionAttendanceStatusEnum.PRESENT,
-                SessionAttendanceStatusEnum.LATE,
-            ]),
-        )
-        .scalar() or 0
-    )
-    return round((present / total) * 100, 1)
+@router.get("/attendance/dashboard", response_model=AttendanceDashboard)
+def get_attendance_dashboard(
+    date_range: str = Query("This Week", alias="range"),
+    db: Session = Depends(get_read_db),
+    _: None = _admin,
+):
+    """Stats, trend, distribution and per-class rates for one range in a single response."""
+    return trusted(build_dashboard(db, date_range), AttendanceDashboard)
 
 @router.get("/attendance/stats", response_model=AttendanceStats)
 def get_attendance_stats(
     date_range: str = Query("This Week", alias="range"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: None = _admin,
 ):
-    today = date.today()
-    if date_range == "Today":
-        start = today
-    elif date_range == "This Month":
-        start = today.replace(day=1)
-    elif date_range == "This Term":
-        start = today.replace(month=1, day=1)
-    else:  # This Week (default)
-        start = today - timedelta(days=today.weekday())
-
-    days_in_range = (today - start).days + 1
-    total_students = db.query(func.count(StudentProfile.id)).scalar() or 0
-
-    # Today's counts from session records
-    today_sids = [r[0] for r in db.query(AttendanceSession.id).filter(AttendanceSession.session_date == today).all()]
-    if today_sids:
-        today_recs = db.query(SessionAttendanceRecord).filter(
-            SessionAttendanceRecord.attendance_session_id.in_(today_sids)
-        ).all()
-    else:
-        today_recs = []
-    present_today = sum(1 for r in today_recs if r.status == SessionAttendanceStatusEnum.PRESENT)
-    absent_today  = sum(1 for r in today_recs if r.status == SessionAttendanceStatusEnum.ABSENT)
-    late_today    = sum(1 for r in today_recs if r.status == SessionAttendanceStatusEnum.LATE)
-
-    # Overall rate for the date range
-    range_sids = [r[0] for r in db.query(AttendanceSession.id).filter(
-        AttendanceSession.session_date.between(start, today)
-    ).all()]
-    if range_sids:
-        range_total = db.query(func.count(SessionAttendanceRecord.id)).filter(
-            SessionAttendanceRecord.attendance_session_id.in_(range_sids),
-            SessionAttendanceRecord.status.isnot(None),
-        ).scalar() or 0
-        range_present = db.query(func.count(SessionAttendanceRecord.id)).filter(
-            SessionAttendanceRecord.attendance_session_id.in_(range_sids),
-            SessionAttendanceRecord.status.in_([
-                SessionAttendanceStatusEnum.PRESENT,
-                SessionAttendanceStatusEnum.LATE,
-            ]),
-        ).scalar() or 0
-    else:
-        range_total = range_present = 0
-    overall_rate = round((range_present / range_total * 100), 1) if range_total else 0.0
-
-    # Trend vs previous equal period
-    prev_end   = start - timedelta(days=1)
-    prev_start = prev_end - timedelta(days=days_in_range - 1)
-    prev_sids = [r[0] for r in db.query(AttendanceSession.id).filter(
-        AttendanceSession.session_date.between(prev_start, prev_end)
-    ).all()]
-    if prev_sids:
-        prev_total = db.query(func.count(SessionAttendanceRecord.id)).filter(
-            SessionAttendanceRecord.attendance_session_id.in_(prev_sids),
-            SessionAttendanceRecord.status.isnot(None),
-        ).scalar() or 0
-        prev_present = db.query(func.count(SessionAttendanceRecord.id)).filter(
-            SessionAttendanceRecord.attendance_session_id.in_(prev_sids),
-            SessionAttendanceRecord.status.in_([
-                SessionAttendanceStatusEnum.PRESENT,
-                SessionAttendanceStatusEnum.LATE,
-            ]),
-        ).scalar() or 0
-    else:
-        prev_total = prev_present = 0
-    prev_rate = (prev_present / prev_total * 100) if prev_total else 0.0
-    trend_pct = round(overall_rate - prev_rate, 1)
-
-    return AttendanceStats(
-        total_students=total_students,
-        present_today=present_today,
-        absent_today=absent_today,
-        late_today=late_today,
-        overall_rate=overall_rate,
-        trend_pct=trend_pct,
-    )
+    return trusted(build_dashboard(db, date_range)["stats"], AttendanceStats)
 
 @router.get("/attendance/trend", response_model=List[AttendanceTrendPoint])
 def get_attendance_trend(
     date_range: str = Query("This Week", alias="range"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: None = _admin,
 ):
-    today = date.today()
-    if date_range == "Today":
-        start = today
-    elif date_range == "This Month":
-        start = today.replace(day=1)
-    elif date_range == "This Term":
-        start = today.replace(month=1, day=1)
-    else:
-        start = today - timedelta(days=today.weekday())
-
-    rows = (
-        db.query(
-            AttendanceSession.session_date,
-            func.count(SessionAttendanceRecord.id).label("total"),
-            func.sum(
-                case(
-                    (SessionAttendanceRecord.status.in_([
-                        SessionAttendanceStatusEnum.PRESENT,
-                        SessionAttendanceStatusEnum.LATE,
-                    ]), 1),
-                    else_=0,
-                )
-            ).label("present"),
-        )
-        .join(SessionAttendanceRecord, SessionAttendanceRecord.attendance_session_id == AttendanceSession.id)
-        .filter(
-            AttendanceSession.session_date.between(start, today),
-            SessionAttendanceRecord.status.isnot(None),
-        )
-        .group_by(AttendanceSession.session_date)
-        .order_by(AttendanceSession.session_date)
-        .all()
-    )
-
-    return [
-        AttendanceTrendPoint(
-            date=r.session_date.strftime("%b %d"),
-            rate=round((r.present / r.total * 100), 1) if r.total else 0.0,
-        )
-        for r in rows
-    ]
+    return trusted(build_dashboard(db, date_range)["trend"], List[AttendanceTrendPoint])
 
 @router.get("/attendance/distribution", response_model=AttendanceDistribution)
 def get_attendance_distribution(
     date_range: str = Query("This Week", alias="range"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: None = _admin,
 ):
-    today = date.today()
-    if date_range == "Today":
-        start = today
-    elif date_range == "This Month":
-        start = today.replace(day=1)
-    elif date_range == "This Term":
-        start = today.replace(month=1, day=1)
-    else:
-        start = today - timedelta(days=today.weekday())
-
-    range_sids = [r[0] for r in db.query(AttendanceSession.id).filter(
-        AttendanceSession.session_date.between(start, today)
-    ).all()]
-    if not range_sids:
-        return AttendanceDistribution(present=0, absent=0, late=0)
-
-    present = db.query(func.count(SessionAttendanceRecord.id)).filter(
-        SessionAttendanceRecord.attendance_session_id.in_(range_sids),
-        SessionAttendanceRecord.status == SessionAttendanceStatusEnum.PRESENT,
-    ).scalar() or 0
-    absent = db.query(func.count(SessionAttendanceRecord.id)).filter(
-        SessionAttendanceRecord.attendance_session_id.in_(range_sids),
-        SessionAttendanceRecord.status == SessionAttendanceStatusEnum.ABSENT,
-    ).scalar() or 0
-    late = db.query(func.count(SessionAttendanceRecord.id)).filter(
-        SessionAttendanceRecord.attendance_session_id.in_(range_sids),
-        SessionAttendanceRecord.status == SessionAttendanceStatusEnum.LATE,
-    ).scalar() or 0
-
-    return AttendanceDistribution(present=present, absent=absent, late=late)
+    return trusted(build_dashboard(db, date_range)["distribution"], AttendanceDistribution)
 
 @router.get("/attendance/classwise", response_model=List[ClasswiseAttendance])
 def get_classwise_attendance(
     date_range: str = Query("This Week", alias="range"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: None = _admin,
 ):
-    today = date.today()
-    if date_range == "Today":
-        start = today
-    elif date_range == "This Month":
-        start = today.replace(day=1)
-    elif date_range == "This Term":
-        start = today.replace(month=1, day=1)
+    return trusted(build_dashboard(db, date_range)["classwise"], List[ClasswiseAttendance])
+
+@router.get("/attendance/chronic", response_model=List[ChronicAbsentee])
+def get_chronic_absentees(
+    threshold: float          = Query(CHRONIC_THRESHOLD),
+    class_id:  Optional[int]  = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to:   Optional[date] = Query(None),
+    cursor:    Optional[str]  = Query(None),
+    limit:     Optional[int]  = Query(None, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+    _: None = _admin,
+):
+    """
+    Students below `threshold` %, lowest rate first, in one query.
+    Without a date range the all-time rate comes from the rollup table's
+    rate index; with one, rates are aggregated from the session records in
+    that window and filtered with HAVING. The whole report unless `limit` or
+    `cursor` is given; then one page, next page in X-Next-Cursor.
+    """
+    after = decode_cursor(cursor, 2)
+    size = page_size(limit, cursor)
+
+    if date_from or date_to:
+        SAR = SessionAttendanceRecord
+        attended = func.sum(case(
+            (SAR.status.in_([SessionAttendanceStatusEnum.PRESENT, SessionAttendanceStatusEnum.LATE]), 1),
+            else_=0,
+        ))
+        rate = func.round(attended * 100.0 / func.count(SAR.id), 1)
+        q = (
+            db.query(StudentProfile.id, User.full_name, Class.name, rate)
+            .select_from(SAR)
+            .join(AttendanceSession, AttendanceSession.id == SAR.attendance_session_id)
+            .join(StudentProfile, StudentProfile.user_id == SAR.student_id)
+            .join(User, User.id == SAR.student_id)
+            .outerjoin(Class, Class.id == StudentProfile.class_id)
+            .filter(SAR.status.isnot(None))
+            .group_by(StudentProfile.id, User.full_name, Class.name)
+        )
+        if date_from:
+            q = q.filter(AttendanceSession.session_date >= date_from)
+        if date_to:
+            q = q.filter(AttendanceSession.session_date <= date_to)
+        keep = rate < threshold
+        if after:
+            keep = keep & ((rate > after[0]) | ((rate == after[0]) & (StudentProfile.id > after[1])))
+        q = q.having(keep)
     else:
-        start = today - timedelta(days=today.weekday())
+        rate = AttendanceStudentRollup.attendance_rate
+        q = (
+            db.query(StudentProfile.id, User.full_name, Class.name, rate)
+            .join(StudentProfile, StudentProfile.user_id == AttendanceStudentRollup.student_id)
+            .join(User, User.id == StudentProfile.user_id)
+            .outerjoin(Class, Class.id == StudentProfile.class_id)
+            .filter(rate < threshold)
+        )
+        if after:
+            q = q.filter((rate > after[0]) | ((rate == after[0]) & (StudentProfile.id > after[1])))
 
-    rows = (
+    if class_id:
+        q = q.filter(StudentProfile.class_id == class_id)
+    q = q.order_by(rate, StudentProfile.id)
+    if size:
+        q = q.limit(size + 1)
+    page, next_cursor = split_page(q.all(), size, key=lambda r: (float(r[3]), r[0]))
+
+    return trusted(
+        [
+            {
+                "student_id":      sp_id,
+                "student_name":    full_name,
+                "class_name":      class_name or "—",
+                "attendance_rate": float(row_rate),
+            }
+            for sp_id, full_name, class_name, row_rate in page
+        ],
+        List[ChronicAbsentee],
+        headers=cursor_headers(next_cursor),
+    )
+
+def _recent_history(db: Session, student_ids, per_student: int = 10) -> dict:
+    """Last `per_student` marked sessions per student (by users.id), newest first — one windowed query."""
+    if not student_ids:
+        return {}
+    SAR = SessionAttendanceRecord
+    ranked = (
         db.query(
-            Class.name.label("class_name"),
-            func.count(SessionAttendanceRecord.id).label("total"),
-            func.sum(
-                case(
-                    (SessionAttendanceRecord.status.in_([
-                        SessionAttendanceStatusEnum.PRESENT,
-                        SessionAttendanceStatusEnum.LATE,
-                    ]), 1),
-                    else_=0,
-                )
-            ).label("present"),
-        )
-        .join(TimetableEntry, TimetableEntry.class_id == Class.id)
-        .join(AttendanceSession, AttendanceSession.timetable_entry_id == TimetableEntry.id)
-        .join(SessionAttendanceRecord, SessionAttendanceRecord.attendance_session_id == AttendanceSession.id)
-        .filter(
-            AttendanceSession.session_date.between(start, today),
-            SessionAttendanceRecord.status.isnot(None),
+            SAR.student_id,
+            SAR.status,
+            AttendanceSession.session_date,
+            func.row_number().over(
+                partition_by=SAR.student_id,
+                order_by=(AttendanceSession.session_date.desc(), SAR.id.desc()),
+            ).label("rn"),
         )
-        .group_by(Class.id, Class.name)
-        .order_by(Class.name)
+        .join(AttendanceSession, AttendanceSession.id == SAR.attendance_session_id)
+        .filter(SAR.student_id.in_(student_ids), SAR.status.isnot(None))
+        .subquery()
+    )
+    rows = (
+        db.query(ranked.c.student_id, ranked.c.session_date, ranked.c.status)
+        .filter(ranked.c.rn <= per_student)
+        .order_by(ranked.c.student_id, ranked.c.rn)
         .all()
     )
-
-    return [
-        ClasswiseAttendance(
-            class_name=r.class_name,
-            rate=round((r.present / r.total * 100), 1) if r.total else 0.0,
+    history = {}
+    for student_id, session_date, att_status in rows:
+        history.setdefault(student_id, []).append(
+            {"date": session_date.isoformat(), "status": att_status.value}
         )
-        for r in rows
-    ]
-
-@router.get("/attendance/chronic", response_model=List[ChronicAbsentee])
-def get_chronic_absentees(
-    threshold: float = Query(CHRONIC_THRESHOLD),
-    db: Session = Depends(get_db),
-    _: None = _admin,
-):
-    profiles = db.query(StudentProfile).all()
-    result = []
-    for sp in profiles:
-        rate = _session_attendance_rate(sp.user_id, db)
-        if rate < threshold:
-            class_name = sp.class_.name if sp.class_ else "—"
-            result.append(ChronicAbsentee(
-                student_id=sp.id,
-                student_name=sp.user.full_name,
-                class_name=class_name,
-                attendance_rate=rate,
-            ))
-    return sorted(result, key=lambda x: x.attendance_rate)
+    return history
 
 @router.get("/attendance/records", response_model=List[AttendanceRecordRead])
 def get_attendance_records(
@@ -346,10 +240,16 @@ def get_attendance_records(
     att_status: Optional[str]  = Query(None, alias="status"),
     date_from:  Optional[date] = Query(None),
     date_to:    Optional[date] = Query(None),
+    cursor:     Optional[str]  = Query(None),
+    limit:      int            = Query(200, ge=1, le=500),
     db: Session = Depends(get_db),
     _: None = _admin,
 ):
-    """Returns session-based attendance records shaped as AttendanceRecordRead."""
+    """
+    Returns session-based attendance records shaped as AttendanceRecordRead,
+    newest first. Rates and histories for the page are fetched in one query
+    each; the next page's token is in X-Next-Cursor.
+    """
     from sqlalchemy.orm import aliased
 
     StudentUser = aliased(User)
@@ -362,7 +262,7 @@ def get_attendance_records(
         .join(Class, Class.id == TimetableEntry.class_id)
         .join(StudentUser, StudentUser.id == SessionAttendanceRecord.student_id)
         .outerjoin(StudentProfile, StudentProfile.user_id == SessionAttendanceRecord.student_id)
-        .outerjoin(MarkerUser, MarkerUser.id == SessionAttendanceRecord.marked_by_id)
+        .outerjoin(MarkerUser, MarkerUser.id == SessionAttendanceRecord.marked_by)
         .filter(SessionAttendanceRecord.status.isnot(None))
     )
 
@@ -383,37 +283,43 @@ def get_attendance_records(
             StudentProfile.student_code.ilike(f"%{search}%")
         )
 
-    rows = q.order_by(AttendanceSession.session_date.desc()).limit(200).all()
+    after = decode_cursor(cursor, 2)
+    if after:
+        try:
+            after_date = date.fromisoformat(after[0])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        q = q.filter(
+            (AttendanceSession.session_date < after_date) |
+            ((AttendanceSession.session_date == after_date) & (SessionAttendanceRecord.id < after[1]))
+        )
+
+    rows = (
+        q.order_by(AttendanceSession.session_date.desc(), SessionAttendanceRecord.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    rows, next_cursor = split_page(rows, limit, key=lambda r: (r[1].session_date.isoformat(), r[0].id))
+    student_ids = {row[0].student_id for row in rows}
+    rates = attendance_rollups.rates_for(db, student_ids)
+    histories = _recent_history(db, student_ids)
 
     result = []
     for sar, sess, sp, su, cls, marker in rows:
-        rate = _session_attendance_rate(sar.student_id, db)
-        history_recs = (
-            db.query(SessionAttendanceRecord, AttendanceSession)
-            .join(AttendanceSession, AttendanceSession.id == SessionAttendanceRecord.attendance_session_id)
-            .filter(
-                SessionAttendanceRecord.student_id == sar.student_id,
-                SessionAttendanceRecord.status.isnot(None),
-            )
-            .order_by(AttendanceSession.session_date.desc())
-            .limit(10)
-            .all()
-        )
-        history = [{"date": h[1].session_date.isoformat(), "status": h[0].status.value} for h in history_recs]
-        result.append(AttendanceRecordRead(
-            id=sar.id,
-            student_id=sp.id if sp else 0,
-            student_name=su.full_name,
-            student_code=sp.student_code if sp else "—",
-            class_name=cls.name,
-            date=sess.session_date.isoformat(),
-            status=sar.status.value,
-            marked_by=marker.full_name if marker else "—",
-            attendance_rate=rate,
-            history=history,
-        ))
-
-    return result
+        result.append({
+            "id":              sar.id,
+            "student_id":      sp.id if sp else 0,
+            "student_name":    su.full_name,
+            "student_code":    sp.student_code if sp else "—",
+            "class_name":      cls.name,
+            "date":            sess.session_date.isoformat(),
+            "status":          sar.status.value,
+            "marked_by":       marker.full_name if marker else "—",
+            "attendance_rate": rates[sar.student_id],
+            "history":         histories.get(sar.student_id, []),
+        })
+
+    return trusted(result, List[AttendanceRecordRead], headers=cursor_headers(next_cursor))
 
 @router.post("/attendance", status_code=status.HTTP_201_CREATED)
 def upsert_attendance(
@@ -451,6 +357,14 @@ def upsert_attendance(
 
 # Fees
 
+def _pay_status(paid: float, balance: float) -> str:
+    """Plan says: Paid / Partially Paid / Unpaid (overdue is reported separately)."""
+    if balance <= 0:
+        return "paid"
+    if paid > 0:
+        return "partial"
+    return "unpaid"
+
 def _compute_fee_student(fp: FeePlan) -> dict:
     """Compute all derived fee metrics for a single FeePlan."""
     sp: StudentProfile = fp.student
@@ -458,17 +372,11 @@ def _compute_fee_student(fp: FeePlan) -> dict:
     class_name = sp.class_.name if sp.class_ else "—"
     today = date.today()
 
-    total_paid   = float(sum(p.amount_paid for p in fp.payments))
+    total_paid   = float(fp.amount_paid)
     total_amount = float(fp.total_amount)
-    balance      = round(total_amount - total_paid, 2)
+    balance      = float(fp.balance)
 
-    # Status — plan says: Paid / Partially Paid / Unpaid / Overdue
-    if balance <= 0:
-        pay_status = "paid"
-    elif total_paid > 0:
-        pay_status = "partial"
-    else:
-        pay_status = "unpaid"
+    pay_status   = _pay_status(total_paid, balance)
 
     # Overdue: installment-aware if installments exist, else fall back to plan due_date
     if fp.installments:
@@ -519,6 +427,19 @@ def _compute_fee_student(fp: FeePlan) -> dict:
         "payment_history":    history,
     }
 
+def _fee_status_filter(fee_status: str):
+    """SQL filter matching _compute_fee_student's status, or is_overdue for "overdue"."""
+    owing = FeePlan.balance > 0
+    if fee_status == "paid":
+        return ~owing
+    if fee_status == "partial":
+        return and_(owing, FeePlan.amount_paid > 0)
+    if fee_status == "unpaid":
+        return and_(owing, FeePlan.amount_paid <= 0)
+    if fee_status == "overdue":
+        return and_(owing, FeePlan.next_due_date < date.today())
+    return false()
+
 def _build_fee_plan(payload: FeePlanCreate, db: Session) -> FeePlan:
     """Create a FeePlan (+ installments) from a FeePlanCreate payload. Does NOT commit."""
     total = float(payload.base_amount) - float(payload.discount_amount)
@@ -529,6 +450,8 @@ def _build_fee_plan(payload: FeePlanCreate, db: Session) -> FeePlan:
         discount_amount=payload.discount_amount,
         total_amount=total,
         due_date=payload.due_date,
+        amount_paid=0,
+        next_due_date=fee_ledger.next_due_date(payload.due_date, (i.due_date for i in payload.installments)),
     )
     db.add(fp)
     db.flush()  # get fp.id without committing
@@ -584,37 +507,25 @@ def create_academic_period(
 
 @router.get("/fees/stats", response_model=FeeStats)
 def get_fee_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: None = _admin,
 ):
-    plans = db.query(FeePlan).all()
-    total_collected   = 0.0
-    total_outstanding = 0.0
-    fully_paid        = 0
-    overdue           = 0
-    today             = date.today()
-
-    for fp in plans:
-        paid    = float(sum(p.amount_paid for p in fp.payments))
-        balance = float(fp.total_amount) - paid
-        total_collected   += paid
-        total_outstanding += max(balance, 0)
-        if balance <= 0:
-            fully_paid += 1
-        else:
-            # Overdue: installment-aware
-            if fp.installments:
-                if any(inst.due_date < today for inst in fp.installments):
-                    overdue += 1
-            elif fp.due_date < today:
-                overdue += 1
+    # One pass over the ledger columns; overdue is installment-aware via next_due_date
+    owing = FeePlan.balance > 0
+    row = db.query(
+        func.count(FeePlan.id).label("plans"),
+        func.coalesce(func.sum(FeePlan.amount_paid), 0).label("collected"),
+        func.coalesce(func.sum(case((owing, FeePlan.balance), else_=0)), 0).label("outstanding"),
+        func.coalesce(func.sum(case((owing, 0), else_=1)), 0).label("fully_paid"),
+        func.coalesce(func.sum(case((and_(owing, FeePlan.next_due_date < date.today()), 1), else_=0)), 0).label("overdue"),
+    ).one()
 
     return FeeStats(
-        total_collected=round(total_collected, 2),
-        total_outstanding=round(total_outstanding, 2),
-        fully_paid_count=fully_paid,
-        overdue_count=overdue,
-        total_students=len(plans),
+        total_collected=round(float(row.collected), 2),
+        total_outstanding=round(float(row.outstanding), 2),
+        fully_paid_count=int(row.fully_paid),
+        overdue_count=int(row.overdue),
+        total_students=row.plans,
     )
 
 @router.get("/fees/trend", response_model=List[FeeTrendPoint])
@@ -648,33 +559,52 @@ def get_fee_students(
     search:        Optional[str] = Query(None),
     class_id:      Optional[int] = Query(None),
     fee_status:    Optional[str] = Query(None, alias="status"),
+    cursor:        Optional[str] = Query(None),
+    limit:         Optional[int] = Query(None, ge=1, le=500),
     db: Session = Depends(get_db),
     _: None = _admin,
 ):
-    q = db.query(FeePlan)
-    if class_id:
-        q = q.join(StudentProfile, FeePlan.student_id == StudentProfile.id).filter(
-            StudentProfile.class_id == class_id
+    """
+    Fee plans shaped as FeeStudentRead, in plan order. Student, user, class
+    and period come from the list query's joins; payments and installments
+    are loaded for all of its plans with one query each. status / overdue
+    filters run in SQL on the ledger columns. Every plan unless `limit` or
+    `cursor` is given; then one page, next page's token in X-Next-Cursor.
+    """
+    q = (
+        db.query(FeePlan)
+        .join(FeePlan.student)
+        .join(StudentProfile.user)
+        .outerjoin(StudentProfile.class_)
+        .outerjoin(FeePlan.academic_period)
+        .options(
+            contains_eager(FeePlan.student).contains_eager(StudentProfile.user),
+            contains_eager(FeePlan.student).contains_eager(StudentProfile.class_),
+            contains_eager(FeePlan.academic_period),
+            selectinload(FeePlan.payments),
+            selectinload(FeePlan.installments),
         )
+    )
+    if class_id:
+        q = q.filter(StudentProfile.class_id == class_id)
     if search:
-        q = (
-            q.join(StudentProfile, FeePlan.student_id == StudentProfile.id, isouter=True)
-             .join(User, StudentProfile.user_id == User.id, isouter=True)
-             .filter(
-                 User.full_name.ilike(f"%{search}%") | StudentProfile.student_code.ilike(f"%{search}%")
-             )
+        q = q.filter(
+            User.full_name.ilike(f"%{search}%") | StudentProfile.student_code.ilike(f"%{search}%")
         )
-
-    plans = q.all()
-    result = [_compute_fee_student(fp) for fp in plans]
-
     if fee_status:
-        if fee_status == "overdue":
-            result = [r for r in result if r["is_overdue"]]
-        else:
-            result = [r for r in result if r["status"] == fee_status]
+        q = q.filter(_fee_status_filter(fee_status))
 
-    return [FeeStudentRead(**r) for r in result]
+    after = decode_cursor(cursor, 1)
+    if after:
+        q = q.filter(FeePlan.id > after[0])
+    size = page_size(limit, cursor)
+
+    q = q.order_by(FeePlan.id)
+    if size:
+        q = q.limit(size + 1)
+    plans, next_cursor = split_page(q.all(), size, key=lambda fp: (fp.id,))
+    result = [_compute_fee_student(fp) for fp in plans]
+    return trusted(result, List[FeeStudentRead], headers=cursor_headers(next_cursor))
 
 # Create / Update Plans
 
@@ -684,7 +614,8 @@ def create_fee_plan(
     db: Session = Depends(get_db),
     _: None = _admin,
 ):
-    sp = db.query(StudentProfile).filter(StudentProfile.id == payload.student_id).first()
+    # Locked so the duplicate check and a concurrent bulk run see each other's plans
+    sp = db.query(StudentProfile).filter(StudentProfile.id == payload.student_id).with_for_update().first()
     if not sp:
         raise HTTPException(status_code=404, detail="Student not found")
 
@@ -705,6 +636,21 @@ def create_fee_plan(
     db.refresh(fp)
     return FeeStudentRead(**_compute_fee_student(fp))
 
+def _inserted_plan_ids(db: Session, last_id: int, student_ids: List[int], plan: dict) -> List[int]:
+    """
+    Ids of the plans create_fee_plans_bulk just inserted: above `last_id`,
+    for its students and with its period, due date and total.
+    """
+    return db.scalars(
+        select(FeePlan.id).where(
+            FeePlan.id > last_id,
+            FeePlan.student_id.in_(student_ids),
+            FeePlan.academic_period_id == plan["academic_period_id"],
+            FeePlan.due_date == plan["due_date"],
+            FeePlan.total_amount == plan["total_amount"],
+        )
+    ).all()
+
 @router.post("/fees/plans/bulk", status_code=status.HTTP_201_CREATED, response_model=BulkPlanResult)
 def create_fee_plans_bulk(
     payload: BulkFeePlanCreate,
@@ -714,39 +660,53 @@ def create_fee_plans_bulk(
     """
     Create fee plans for all students in a class (or entire school if class_id is None).
     Skips students who already have a plan for the given academic period.
+
+    Set-based: one query for the students, one for those already holding a
+    plan for the period, then an executemany INSERT of the plans, one query
+    reading their ids back and an executemany INSERT of the installments.
+    MySQL has no INSERT … RETURNING, so new plans are read back by
+    _inserted_plan_ids. The student rows stay locked until commit, so no
+    other bulk run or single plan create can add a plan for them meanwhile.
     """
-    q = db.query(StudentProfile)
+    students = select(StudentProfile.id)
     if payload.class_id:
-        q = q.filter(StudentProfile.class_id == payload.class_id)
-    students = q.all()
+        students = students.where(StudentProfile.class_id == payload.class_id)
+    student_ids = db.scalars(students.order_by(StudentProfile.id).with_for_update()).all()
 
-    created = 0
-    skipped = 0
-
-    for sp in students:
-        # Skip if duplicate plan for this period
-        if payload.academic_period_id:
-            exists = db.query(FeePlan).filter(
-                FeePlan.student_id == sp.id,
+    existing = set()
+    if payload.academic_period_id:
+        existing = set(db.scalars(
+            select(FeePlan.student_id).where(
                 FeePlan.academic_period_id == payload.academic_period_id,
-            ).first()
-            if exists:
-                skipped += 1
-                continue
-
-        single = FeePlanCreate(
-            student_id=sp.id,
-            base_amount=payload.base_amount,
-            discount_amount=payload.discount_amount,
-            due_date=payload.due_date,
-            academic_period_id=payload.academic_period_id,
-            installments=payload.installments,
-        )
-        _build_fee_plan(single, db)
-        created += 1
+                FeePlan.student_id.in_(students),
+            )
+        ))
+    new_ids = [sid for sid in student_ids if sid not in existing]
+    if not new_ids:
+        return BulkPlanResult(created=0, skipped=len(student_ids))
+
+    last_id = db.scalar(select(func.max(FeePlan.id))) or 0
+    plan = {
+        "academic_period_id": payload.academic_period_id,
+        "base_amount":        payload.base_amount,
+        "discount_amount":    payload.discount_amount,
+        "total_amount":       payload.base_amount - payload.discount_amount,
+        "due_date":           payload.due_date,
+        "amount_paid":        0,
+        "next_due_date":      fee_ledger.next_due_date(payload.due_date, (i.due_date for i in payload.installments)),
+    }
+    db.execute(insert(FeePlan), [{"student_id": sid, **plan} for sid in new_ids])
+
+    if payload.installments:
+        plan_ids = _inserted_plan_ids(db, last_id, new_ids, plan)
+        db.execute(insert(FeeInstallment), [
+            {"fee_plan_id": pid, "amount": inst.amount, "due_date": inst.due_date}
+            for pid in plan_ids
+            for inst in payload.installments
+        ])
 
     db.commit()
-    return BulkPlanResult(created=created, skipped=skipped)
+    return BulkPlanResult(created=len(new_ids), skipped=len(student_ids) - len(new_ids))
 
 @router.patch("/fees/plans/{plan_id}", response_model=FeeStudentRead)
 def update_fee_plan(
@@ -767,6 +727,7 @@ def update_fee_plan(
     fp.total_amount = float(fp.base_amount) - float(fp.discount_amount)
     if payload.due_date is not None:
         fp.due_date = payload.due_date
+        fp.next_due_date = fee_ledger.next_due_date(fp.due_date, (i.due_date for i in fp.installments))
 
     db.commit()
     db.refresh(fp)
@@ -797,6 +758,7 @@ def record_payment(
         transaction_id=payload.transaction_id,
     )
     db.add(payment)
+    fee_ledger.apply_payment(fp, payload.amount_paid)
     db.flush()
 
     # Log notification event immediately after payment
@@ -820,80 +782,14 @@ def trigger_notifications(
     _: None = _admin,
 ):
     """
-    Run manually or via a daily scheduler.
-    Scans installments and inserts notification events for:
+    Run manually or via a scheduler (safe to run hourly — see app/services/fee_notifications.py).
+    Inserts notification events that don't exist yet for today:
       - Upcoming Due  (due in 7 days)
       - Due Today
       - Overdue       (past due, still unpaid)
+    and returns how many of each were added.
     """
-    today     = date.today()
-    in_7_days = today + timedelta(days=7)
-    counts    = {"upcoming": 0, "due_today": 0, "overdue": 0}
-
-    plans = db.query(FeePlan).all()
-
-    for fp in plans:
-        paid    = float(sum(p.amount_paid for p in fp.payments))
-        balance = float(fp.total_amount) - paid
-        if balance <= 0:
-            continue  # fully paid — no alerts needed
-
-        installments = fp.installments if fp.installments else []
-
-        if installments:
-            for inst in installments:
-                if inst.due_date == today:
-                    db.add(FeeNotificationEvent(
-                        type=NotificationTypeEnum.Due_Today,
-                        student_id=fp.student_id,
-                        fee_plan_id=fp.id,
-                        trigger_date=today,
-                    ))
-                    counts["due_today"] += 1
-                elif today < inst.due_date <= in_7_days:
-                    db.add(FeeNotificationEvent(
-                        type=NotificationTypeEnum.Upcoming_Due,
-                        student_id=fp.student_id,
-                        fee_plan_id=fp.id,
-                        trigger_date=today,
-                    ))
-                    counts["upcoming"] += 1
-                elif inst.due_date < today:
-                    db.add(FeeNotificationEvent(
-                        type=NotificationTypeEnum.Overdue,
-                        student_id=fp.student_id,
-                        fee_plan_id=fp.id,
-                        trigger_date=today,
-                    ))
-                    counts["overdue"] += 1
-        else:
-            # No installments — use the plan-level due_date
-            if fp.due_date == today:
-                db.add(FeeNotificationEvent(
-                    type=NotificationTypeEnum.Due_Today,
-                    student_id=fp.student_id,
-                    fee_plan_id=fp.id,
-                    trigger_date=today,
-                ))
-                counts["due_today"] += 1
-            elif today < fp.due_date <= in_7_days:
-                db.add(FeeNotificationEvent(
-                    type=NotificationTypeEnum.Upcoming_Due,
-                    student_id=fp.student_id,
-                    fee_plan_id=fp.id,
-                    trigger_date=today,
-                ))
-                counts["upcoming"] += 1
-            elif fp.due_date < today:
-                db.add(FeeNotificationEvent(
-                    type=NotificationTypeEnum.Overdue,
-                    student_id=fp.student_id,
-                    fee_plan_id=fp.id,
-                    trigger_date=today,
-                ))
-                counts["overdue"] += 1
-
-    db.commit()
+    counts = fee_notifications.scan(db)
     return {"detail": "Notification trigger complete", **counts}
 
 # Fees CSV Export
@@ -903,49 +799,39 @@ def export_fees_csv(
     search:     Optional[str] = Query(None),
     class_id:   Optional[int] = Query(None),
     fee_status: Optional[str] = Query(None, alias="status"),
-    db: Session = Depends(get_db),
     _: None = _admin,
 ):
-    """Export fee records for students as a downloadable CSV."""
-    import csv as csv_mod
-    import io as io_mod
-
-    q = db.query(FeePlan).join(
-        StudentProfile, FeePlan.student_id == StudentProfile.id
-    ).outerjoin(Class, StudentProfile.class_id == Class.id)
-
+    """Export fee records for students as a CSV, streamed in batches from the ledger columns."""
+    stmt = (
+        select(
+            User.full_name, StudentProfile.student_code, Class.name.label("class_name"),
+            FeePlan.base_amount, FeePlan.discount_amount, FeePlan.total_amount,
+            FeePlan.amount_paid, FeePlan.balance, FeePlan.due_date,
+        )
+        .select_from(FeePlan)
+        .join(StudentProfile, FeePlan.student_id == StudentProfile.id)
+        .join(User, StudentProfile.user_id == User.id)
+        .outerjoin(Class, StudentProfile.class_id == Class.id)
+        .order_by(FeePlan.id)
+    )
     if class_id:
-        q = q.filter(StudentProfile.class_id == class_id)
+        stmt = stmt.where(StudentProfile.class_id == class_id)
     if search:
-        term = f"%{search}%"
-        from app.models.user import User as _U
-        ids = [u.id for u in db.query(StudentProfile.id).join(_U, StudentProfile.user_id == _U.id).filter(_U.full_name.ilike(term)).all()]
-        q = q.filter(FeePlan.student_id.in_(ids))
-
-    plans = q.all()
-
-    output = io_mod.StringIO()
-    writer = csv_mod.writer(output)
-    writer.writerow(["Student", "Student Code", "Class", "Base Amount", "Discount",
-                     "Total Fee", "Amount Paid", "Outstanding", "Status", "Due Date"])
+        stmt = stmt.where(User.full_name.ilike(f"%{search}%"))
+    if fee_status:
+        stmt = stmt.where(_fee_status_filter(fee_status))
 
-    for fp in plans:
-        rec = _compute_fee_student(fp)
-        if fee_status and rec["status"] != fee_status:
-            continue
-        writer.writerow([
-            rec["name"], rec["student_code"], rec["class_name"],
-            rec["base_amount"], rec["discount_amount"], rec["total_fee"],
-            rec["amount_paid"], rec["outstanding_balance"], rec["status"],
-            rec["due_date"],
-        ])
+    def to_row(r):
+        paid, balance = float(r.amount_paid), float(r.balance)
+        return [
+            r.full_name, r.student_code or "", r.class_name or "—",
+            float(r.base_amount), float(r.discount_amount), float(r.total_amount),
+            paid, balance, _pay_status(paid, balance), r.due_date.isoformat(),
+        ]
 
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=fees_report.csv"},
-    )
+    header = ["Student", "Student Code", "Class", "Base Amount", "Discount",
+              "Total Fee", "Amount Paid", "Outstanding", "Status", "Due Date"]
+    return csv_response("fees_report.csv", header, stmt, to_row)
 
 # Calendar / Events
 
@@ -1210,6 +1096,7 @@ def update_location(
     loc = db.query(Location).filter(Location.id == location_id).first()
     if not loc:
         raise HTTPException(status_code=404, detail="Location not found")
+    renamed = payload.name is not None and payload.name != loc.name
     if payload.name is not None:
         loc.name = payload.name
     if payload.type is not None:
@@ -1218,8 +1105,17 @@ def update_location(
         loc.capacity = payload.capacity
     if payload.is_active is not None:
         loc.is_active = payload.is_active
+    booked = (
+        db.query(TimetableEntry.class_id, TimetableEntry.teacher_id)
+        .filter(TimetableEntry.location_id == location_id)
+        .distinct()
+        .all()
+    ) if renamed else []
     db.commit()
     db.refresh(loc)
+    if booked:
+        # Location names appear in the timetables of every class / teacher booked there
+        invalidate_timetables(class_ids={c for c, _ in booked}, teacher_ids={t for _, t in booked})
     return loc
 
 @router.delete("/locations/{location_id}", status_code=204)
@@ -35,10 +35,13 @@ from datetime import datetime, timezone
 from typing import List, Optional
 
 from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, UploadFile
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.core.database import get_db
-from app.core.dependencies import require_role
+from app.core.database import get_async_db, get_db
+from app.core.dependencies import require_role, require_role_async
+from app.core.serialization import trusted
 from app.models.admin import Class, ClassSubjectTeacher, StudentProfile, Subject
 from app.models.extensions import (
     Assignment, AssignmentAttachment, AssignmentStatusEnum, AssignmentTypeEnum,
@@ -821,28 +824,30 @@ def grading_publish(
 # Student: list + submit
 
 @router.get("/student")
-def student_list_assignments(
+async def student_list_assignments(
     subject_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = _student,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role_async("student")),
 ):
-    profile = db.query(StudentProfile).filter(StudentProfile.user_id == current_user.id).first()
-    if not profile or not profile.class_id:
+    class_id = (await db.execute(
+        select(StudentProfile.class_id).where(StudentProfile.user_id == current_user.id)
+    )).scalar()
+    if not class_id:
         return []
 
-    q = (
-        db.query(Assignment)
+    stmt = (
+        select(Assignment)
         .options(
-            joinedload(Assignment.attachments),
+            selectinload(Assignment.attachments),
             joinedload(Assignment.class_),
             joinedload(Assignment.subject),
             joinedload(Assignment.teacher),
-            joinedload(Assignment.submissions).joinedload(Submission.ai_reviews),
-            joinedload(Assignment.submissions).joinedload(Submission.sub_attachments),
-            joinedload(Assignment.submissions).joinedload(Submission.student),
+            selectinload(Assignment.submissions).selectinload(Submission.ai_reviews),
+            selectinload(Assignment.submissions).selectinload(Submission.sub_attachments),
+            selectinload(Assignment.submissions).joinedload(Submission.student),
         )
-        .filter(
-            Assignment.class_id == profile.class_id,
+        .where(
+            Assignment.class_id == class_id,
             Assignment.status.in_([
                 AssignmentStatusEnum.ACTIVE,
                 AssignmentStatusEnum.CLOSED,
@@ -851,10 +856,11 @@ def student_list_assignments(
         )
     )
     if subject_id:
-        q = q.filter(Assignment.subject_id == subject_id)
+        stmt = stmt.where(Assignment.subject_id == subject_id)
 
-    items = q.order_by(Assignment.due_at.asc()).all()
-    return [_serialize_assignment(a, student_id=current_user.id) for a in items]
+    items = (await db.execute(stmt.order_by(Assignment.due_at.asc()))).scalars().all()
+    # _serialize_assignment already emits JSON-native values
+    return trusted([_serialize_assignment(a, student_id=current_user.id) for a in items])
 
 
 @router.post("/{assignment_id}/submit")
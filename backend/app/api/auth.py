@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user_async
 from app.models.user import User
 from app.schemas.user import CurrentUser, LoginRequest, Token, UserCreate, UserRead
 from app.services.auth_service import authenticate_user, register_user
@@ -17,9 +17,9 @@ def register(payload: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
+async def login(payload: LoginRequest, db: Session = Depends(get_db)):
     """Authenticate and return a JWT access token with user info."""
-    token = authenticate_user(db, payload)
+    token = await authenticate_user(db, payload)
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -29,7 +29,7 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=CurrentUser)
-def me(current_user: User = Depends(get_current_user)):
+async def me(current_user: User = Depends(get_current_user_async)):
     """Return the currently authenticated user's info."""
     return CurrentUser(
         email=current_user.email,
@@ -18,7 +18,7 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.dependencies import get_current_user, require_role
 from app.models.extensions import ConsentAuditLog, ConsentRecord
 from app.models.user import User
@@ -266,7 +266,7 @@ def withdraw_consent(
 
 @router.get("/compliance/overview")
 def get_compliance_overview(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_role("admin")),
 ):
     """Admin: institution-wide consent compliance statistics."""
@@ -11,10 +11,12 @@ from datetime import datetime, timezone
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import case, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.core.database import get_db
-from app.core.dependencies import require_role
+from app.core.database import get_async_db, get_db
+from app.core.dependencies import require_role, require_role_async
 from app.models.admin import (
     Class, ClassSubjectTeacher, StudentProfile, Subject,
 )
@@ -364,40 +366,42 @@ def teacher_homework_classes(
 # Student Endpoints
 
 @router.get("/student")
-def student_list_homework(
+async def student_list_homework(
     subject_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = _student,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role_async("student")),
 ):
     """GET /homework/student — list PUBLISHED homework for the student's class."""
-    profile = db.query(StudentProfile).filter(StudentProfile.user_id == current_user.id).first()
-    if not profile or not profile.class_id:
+    class_id = (await db.execute(
+        select(StudentProfile.class_id).where(StudentProfile.user_id == current_user.id)
+    )).scalar()
+    if not class_id:
         return []
 
-    q = (
-        db.query(Homework)
+    stmt = (
+        select(Homework)
         .options(
-            joinedload(Homework.attachments),
-            joinedload(Homework.completions),
+            selectinload(Homework.attachments),
+            selectinload(Homework.completions),
             joinedload(Homework.class_),
             joinedload(Homework.subject),
             joinedload(Homework.teacher),
         )
-        .filter(
-            Homework.class_id == profile.class_id,
+        .where(
+            Homework.class_id == class_id,
             Homework.status == HomeworkStatusEnum.PUBLISHED,
         )
     )
     if subject_id:
-        q = q.filter(Homework.subject_id == subject_id)
+        stmt = stmt.where(Homework.subject_id == subject_id)
 
     # MySQL doesn't support NULLS LAST — use CASE to push NULLs to the end
-    from sqlalchemy import case
-    items = q.order_by(
+    stmt = stmt.order_by(
         case((Homework.due_at.is_(None), 1), else_=0),
         Homework.due_at.asc(),
         Homework.created_at.desc(),
-    ).all()
+    )
+    items = (await db.execute(stmt)).scalars().all()
     return [_hw_to_dict(hw, student_id=current_user.id) for hw in items]
 
 
@@ -6,24 +6,31 @@ Communication rules (RBAC):
   Teacher  → can message students in their classes + parents of those students
   Student  → can message teachers of their class
   Parent   → can message teachers who teach their children's classes
+
+New messages, read receipts and unread counts are also pushed to the
+participants over GET /ws (WebSocket, see app/core/realtime.py).
 """
 
 import logging
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
-from sqlalchemy import func, update as sql_update
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, WebSocket, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, aliased
 
-from app.core.database import get_db
-from app.core.dependencies import require_role
+from app.core import realtime
+from app.core.database import AsyncSessionLocal, get_db
+from app.core.dependencies import principal_for_token, require_role
+from app.core.pagination import cursor_headers, decode_cursor, page_size, split_page
+from app.core.serialization import trusted
 from app.models.admin import ClassSubjectTeacher, ParentStudent, StudentProfile
 from app.models.extensions import (
     Conversation,
     ConversationParticipant,
     Message,
 )
-from app.models.user import User
+from app.models.user import Role, User
 from app.schemas.extensions import (
     ContactRead,
     ConversationDetail,
@@ -31,12 +38,15 @@ from app.schemas.extensions import (
     MessageRead,
     SendMessageRequest,
     StartConversationRequest,
+    UnreadCountRead,
 )
+from app.services import message_unread
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-_any_messaging_role = Depends(require_role("teacher", "student", "parent"))
+_MESSAGING_ROLES = ("teacher", "student", "parent")
+_any_messaging_role = Depends(require_role(*_MESSAGING_ROLES))
 
 
 # Helpers
@@ -135,40 +145,58 @@ def _find_existing_convo(me_id: int, other_id: int, db: Session) -> Optional[Con
     )
 
 
-def _build_conversation_read(conv: Conversation, me_id: int, db: Session) -> ConversationRead:
-    other_part = next((p for p in conv.participants if p.user_id != me_id), None)
-    my_part = next((p for p in conv.participants if p.user_id == me_id), None)
-
-    other_user: Optional[User] = None
-    if other_part:
-        other_user = db.query(User).filter(User.id == other_part.user_id).first()
-
-    # Unread: messages from others that arrived after our last_read_at
-    unread_q = (
-        db.query(func.count(Message.id))
-        .filter(
-            Message.conversation_id == conv.id,
-            Message.is_deleted == False,  # noqa: E712
-            Message.sender_id != me_id,
+def _inbox_query(me_id: int):
+    """
+    One row per active conversation of `me_id`, newest first: the
+    conversation, the other participant's id / name / role, and our stored
+    unread counter (see app/services/message_unread.py).
+    """
+    mine = aliased(ConversationParticipant)
+    other = aliased(ConversationParticipant)
+    other_id = (
+        select(func.min(ConversationParticipant.user_id))
+        .where(
+            ConversationParticipant.conversation_id == mine.conversation_id,
+            ConversationParticipant.user_id != me_id,
+        )
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Conversation.id,
+            Conversation.type,
+            Conversation.last_message_preview,
+            Conversation.updated_at,
+            User.id.label("other_user_id"),
+            User.full_name.label("other_user_name"),
+            Role.name.label("other_user_role"),
+            mine.unread_count,
         )
+        .select_from(mine)
+        .join(Conversation, Conversation.id == mine.conversation_id)
+        .outerjoin(other, (other.conversation_id == mine.conversation_id) & (other.user_id == other_id))
+        .outerjoin(User, User.id == other.user_id)
+        .outerjoin(Role, Role.id == User.role_id)
+        .where(mine.user_id == me_id, mine.is_active == True)  # noqa: E712
     )
-    if my_part and my_part.last_read_at:
-        unread_q = unread_q.filter(Message.created_at > my_part.last_read_at)
-    unread_count = unread_q.scalar() or 0
 
-    conv_type = conv.type if isinstance(conv.type, str) else conv.type.value
-    updated_at = conv.updated_at.isoformat() if conv.updated_at else ""
 
-    return ConversationRead(
-        id=conv.id,
-        type=conv_type,
-        other_user_id=other_user.id if other_user else 0,
-        other_user_name=other_user.full_name if other_user else "Unknown",
-        other_user_role=other_user.role.name if other_user else "—",
-        last_message_preview=conv.last_message_preview,
-        unread_count=unread_count,
-        updated_at=updated_at,
-    )
+def _conversation_read(row) -> dict:
+    return {
+        "id":                   row.id,
+        "type":                 row.type if isinstance(row.type, str) else row.type.value,
+        "other_user_id":        row.other_user_id or 0,
+        "other_user_name":      row.other_user_name or "Unknown",
+        "other_user_role":      row.other_user_role or "—",
+        "last_message_preview": row.last_message_preview,
+        "unread_count":         row.unread_count,
+        "updated_at":           row.updated_at.isoformat() if row.updated_at else "",
+    }
+
+
+def _build_conversation_read(conv: Conversation, me_id: int, db: Session) -> ConversationRead:
+    row = db.execute(_inbox_query(me_id).where(Conversation.id == conv.id)).one()
+    return ConversationRead(**_conversation_read(row))
 
 
 def _build_message_read(msg: Message, me_id: int) -> MessageRead:
@@ -213,18 +241,34 @@ def _send_msg(conv: Conversation, sender: User, content: str, db: Session) -> Me
     conv.last_message_preview = content[:200]
     # conv.updated_at is handled by MySQL's ON UPDATE CURRENT_TIMESTAMP
     db.flush()
-    # Mark the sender as having read their own message (they clearly just read it)
-    db.execute(
-        sql_update(ConversationParticipant)
-        .where(
-            ConversationParticipant.conversation_id == conv.id,
-            ConversationParticipant.user_id == sender.id,
-        )
-        .values(last_read_at=func.now())
-    )
+    # Unread for the others; read for the sender (they clearly just read it)
+    unread = message_unread.message_sent(db, conv.id, sender.id)
+    _publish_message(msg, sender, unread, db)
     return msg
 
 
+def _publish_message(msg: Message, sender: User, unread: dict, db: Session) -> None:
+    """Push a new message and everyone's updated unread count to the participants' sockets on commit."""
+    message = MessageRead(
+        id=msg.id,
+        conversation_id=msg.conversation_id,
+        sender_id=sender.id,
+        sender_name=sender.full_name,
+        content=msg.content,
+        content_type="text",
+        is_deleted=False,
+        created_at=msg.created_at.isoformat() if msg.created_at else "",
+        is_mine=False,
+    ).model_dump()
+    for user_id, unread_count in unread.items():
+        realtime.publish_after_commit(db, user_id, {
+            "type": "message", "message": {**message, "is_mine": user_id == sender.id},
+        })
+        realtime.publish_after_commit(db, user_id, {
+            "type": "unread", "conversation_id": msg.conversation_id, "unread_count": unread_count,
+        })
+
+
 # Notification helper
 
 def _maybe_notify_parent(
@@ -279,28 +323,51 @@ def get_contacts(
 
 @router.get("/conversations", response_model=List[ConversationRead])
 def list_conversations(
+    cursor: Optional[str] = Query(None),
+    limit:  Optional[int] = Query(None, ge=1, le=500),
     me: User = _any_messaging_role,
     db: Session = Depends(get_db),
 ):
-    """Return all active conversations for the current user, newest first."""
-    parts = (
-        db.query(ConversationParticipant)
-        .filter(
-            ConversationParticipant.user_id == me.id,
-            ConversationParticipant.is_active == True,  # noqa: E712
+    """
+    Active conversations for the current user, newest first, with the other
+    participant and unread count, from one query. All of them unless
+    `limit` or `cursor` is given; then a page keyset-paginated on
+    (updated_at, id), the next page's token in X-Next-Cursor.
+    """
+    q = _inbox_query(me.id)
+    after = decode_cursor(cursor, 2)
+    if after:
+        try:
+            after_ts = datetime.fromisoformat(after[0])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        q = q.where(
+            (Conversation.updated_at < after_ts) |
+            ((Conversation.updated_at == after_ts) & (Conversation.id < after[1]))
         )
-        .all()
+    size = page_size(limit, cursor)
+    q = q.order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+    if size:
+        q = q.limit(size + 1)
+    rows, next_cursor = split_page(db.execute(q).all(), size, key=lambda r: (r.updated_at.isoformat(), r.id))
+    return trusted(
+        [_conversation_read(r) for r in rows],
+        List[ConversationRead],
+        headers=cursor_headers(next_cursor),
     )
-    conv_ids = [p.conversation_id for p in parts]
-    if not conv_ids:
-        return []
-    convos = (
-        db.query(Conversation)
-        .filter(Conversation.id.in_(conv_ids))
-        .order_by(Conversation.updated_at.desc())
-        .all()
-    )
-    return [_build_conversation_read(c, me.id, db) for c in convos]
+
+
+@router.get("/unread-count", response_model=UnreadCountRead)
+def get_unread_count(
+    me: User = _any_messaging_role,
+    db: Session = Depends(get_db),
+):
+    """Total unread messages across the current user's active conversations (for the nav badge)."""
+    total = db.query(func.coalesce(func.sum(ConversationParticipant.unread_count), 0)).filter(
+        ConversationParticipant.user_id == me.id,
+        ConversationParticipant.is_active == True,  # noqa: E712
+    ).scalar()
+    return UnreadCountRead(unread_count=total)
 
 
 @router.post("/conversations", response_model=ConversationRead)
@@ -416,16 +483,14 @@ def mark_read(
     me: User = _any_messaging_role,
     db: Session = Depends(get_db),
 ):
-    """Update last_read_at for the current user in the given conversation."""
-    _get_conv_and_my_part(conv_id, me.id, db)  # verifies access
-    db.execute(
-        sql_update(ConversationParticipant)
-        .where(
-            ConversationParticipant.conversation_id == conv_id,
-            ConversationParticipant.user_id == me.id,
-        )
-        .values(last_read_at=func.now())
-    )
+    """Update last_read_at and clear the unread counter for the current user in the given conversation."""
+    conv, _ = _get_conv_and_my_part(conv_id, me.id, db)  # verifies access
+    message_unread.mark_read(db, conv_id, me.id)
+    for p in conv.participants:
+        if p.user_id == me.id:
+            realtime.publish_after_commit(db, me.id, {"type": "unread", "conversation_id": conv_id, "unread_count": 0})
+        elif p.is_active:
+            realtime.publish_after_commit(db, p.user_id, {"type": "read", "conversation_id": conv_id, "user_id": me.id})
     # Clear the WhatsApp dedup entry so the parent can be notified again
     # when the teacher sends the next message after this read.
     from app.models.extensions import WhatsAppSentLog
@@ -435,3 +500,32 @@ def mark_read(
     ).delete()
     db.commit()
     return Response(status_code=204)
+
+
+@router.websocket("/ws")
+async def messages_socket(websocket: WebSocket):
+    """
+    Real-time channel for the messaging pages (see app/core/realtime.py).
+    After connecting, send {"type": "auth", "token": "<access token>"} as the
+    first frame; the server answers {"type": "ready"} and then pushes JSON
+    events:
+
+      {"type": "message", "message": MessageRead}
+      {"type": "read",    "conversation_id", "user_id"}        — the other side read it
+      {"type": "unread",  "conversation_id", "unread_count"}
+      {"type": "ping"}                                          — keep-alive when idle
+
+    Closed with 1008 when the auth frame is missing, the token is invalid or
+    the role can't message.
+    """
+    await websocket.accept()
+    token = await realtime.receive_token(websocket)
+    try:
+        async with AsyncSessionLocal() as db:
+            me = await principal_for_token(token, db)
+    except HTTPException:
+        me = None
+    if me is None or me.role.name not in _MESSAGING_ROLES:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await realtime.serve(websocket, me.id)
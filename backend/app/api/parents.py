@@ -7,12 +7,13 @@ from datetime import date
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
-from app.core.security import hash_password, verify_password
 from pydantic import BaseModel
 from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 
 from app.core.database import get_db
 from app.core.dependencies import require_role
+from app.core.security import hash_password_async, verify_password_async
 from app.models.admin import ParentStudent, StudentProfile
 from app.models.extensions import (
     Assignment,
@@ -271,10 +272,10 @@ def parent_profile(
 
 
 @router.patch("/profile/password")
-def parent_change_password(
+async def parent_change_password(
     payload: dict,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role("parent")),
+    current_user: User = Depends(require_role("parent", load_user=True)),
 ):
     """PATCH /parents/profile/password — change own password."""
     old_pw = payload.get("old_password", "")
@@ -283,10 +284,10 @@ def parent_change_password(
         raise HTTPException(status_code=422, detail="old_password and new_password are required.")
     if len(new_pw) < 6:
         raise HTTPException(status_code=422, detail="New password must be at least 6 characters.")
-    if not verify_password(old_pw, current_user.hashed_password):
+    if not await verify_password_async(old_pw, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Current password is incorrect.")
-    current_user.hashed_password = hash_password(new_pw)
-    db.commit()
+    current_user.hashed_password = await hash_password_async(new_pw)
+    await run_in_threadpool(db.commit)
     return {"detail": "Password updated successfully."}
 
 
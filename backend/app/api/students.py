@@ -5,13 +5,17 @@ Prefix (set in main.py): /api/v1/students
 
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.database import get_db
-from app.core.dependencies import require_role
-from app.core.security import hash_password, verify_password
-from app.models.admin import StudentProfile, TimetableEntry
+from app.core.database import get_async_db, get_db
+from app.core.dependencies import require_role, require_role_async
+from app.core.response_cache import response_cache
+from app.core.security import hash_password_async, verify_password_async
+from app.models.admin import Class, StudentProfile, Subject, TimetableEntry
 from app.models.extensions import AttendanceSession, SessionAttendanceRecord, SessionAttendanceStatusEnum
 from app.models.user import User
 from app.schemas.admin import TimetableEntryOut
@@ -24,18 +28,20 @@ router = APIRouter()
 # Timetable
 
 @router.get("/timetable", response_model=List[TimetableEntryOut])
-def student_timetable(
+async def student_timetable(
+    request: Request,
     view: str = Query("week", regex="^(day|week)$"),
     date: Optional[str] = Query(None, description="YYYY-MM-DD for day view"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role("student")),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role_async("student")),
 ):
     """
     GET /students/timetable
     Returns ONLY published entries for the student's class group.
+    Sends a strong ETag; a matching If-None-Match gets 304.
     """
-    results = _svc_student_tt(current_user.id, db, view=view, date_str=date)
-    return [TimetableEntryOut(**r) for r in results]
+    body = await _svc_student_tt(current_user.id, db, view=view, date_str=date)
+    return response_cache.respond(request, body)
 
 
 # Attendance
@@ -53,39 +59,54 @@ def student_attendance(
 
 
 def _build_student_summary(user_id: int, db: Session) -> StudentAttendanceSummary:
-    records = (
-        db.query(SessionAttendanceRecord)
+    """Status counts (one grouped query) plus the 30 most recent sessions (one joined query)."""
+    counts = dict(
+        db.query(SessionAttendanceRecord.status, func.count(SessionAttendanceRecord.id))
         .filter(SessionAttendanceRecord.student_id == user_id)
-        .join(AttendanceSession, AttendanceSession.id == SessionAttendanceRecord.attendance_session_id)
-        .order_by(AttendanceSession.session_date.desc())
+        .group_by(SessionAttendanceRecord.status)
         .all()
     )
-
-    total = len(records)
-    present = sum(1 for r in records if r.status == SessionAttendanceStatusEnum.PRESENT)
-    absent  = sum(1 for r in records if r.status == SessionAttendanceStatusEnum.ABSENT)
-    late    = sum(1 for r in records if r.status == SessionAttendanceStatusEnum.LATE)
-    excused = sum(1 for r in records if r.status == SessionAttendanceStatusEnum.EXCUSED)
-    unmarked = sum(1 for r in records if r.status is None)
+    total    = sum(counts.values())
+    present  = counts.get(SessionAttendanceStatusEnum.PRESENT, 0)
+    absent   = counts.get(SessionAttendanceStatusEnum.ABSENT, 0)
+    late     = counts.get(SessionAttendanceStatusEnum.LATE, 0)
+    excused  = counts.get(SessionAttendanceStatusEnum.EXCUSED, 0)
+    unmarked = counts.get(None, 0)
 
     denominator = total - excused - unmarked
     rate = round((present + late) / denominator * 100, 1) if denominator > 0 else 100.0
 
-    recent: List[StudentSessionRecord] = []
-    for rec in records[:30]:
-        sess = db.query(AttendanceSession).filter(AttendanceSession.id == rec.attendance_session_id).first()
-        if not sess:
-            continue
-        entry = db.query(TimetableEntry).filter(TimetableEntry.id == sess.timetable_entry_id).first()
-        recent.append(StudentSessionRecord(
-            session_date=sess.session_date.isoformat(),
-            class_name=entry.class_.name    if entry and entry.class_   else "—",
-            subject_name=entry.subject.name if entry and entry.subject  else "—",
-            time_slot=entry.time_slot       if entry                    else "—",
-            delivery_mode=sess.delivery_mode_snapshot,
-            status=rec.status.value if rec.status else None,
-            note=rec.note,
-        ))
+    rows = (
+        db.query(
+            SessionAttendanceRecord.status,
+            SessionAttendanceRecord.note,
+            AttendanceSession.session_date,
+            AttendanceSession.delivery_mode_snapshot,
+            TimetableEntry.time_slot,
+            Class.name,
+            Subject.name,
+        )
+        .join(AttendanceSession, AttendanceSession.id == SessionAttendanceRecord.attendance_session_id)
+        .outerjoin(TimetableEntry, TimetableEntry.id == AttendanceSession.timetable_entry_id)
+        .outerjoin(Class, Class.id == TimetableEntry.class_id)
+        .outerjoin(Subject, Subject.id == TimetableEntry.subject_id)
+        .filter(SessionAttendanceRecord.student_id == user_id)
+        .order_by(AttendanceSession.session_date.desc(), SessionAttendanceRecord.id.desc())
+        .limit(30)
+        .all()
+    )
+    recent = [
+        StudentSessionRecord(
+            session_date=session_date.isoformat(),
+            class_name=class_name or "—",
+            subject_name=subject_name or "—",
+            time_slot=time_slot or "—",
+            delivery_mode=delivery_mode,
+            status=att_status.value if att_status else None,
+            note=note,
+        )
+        for att_status, note, session_date, delivery_mode, time_slot, class_name, subject_name in rows
+    ]
 
     return StudentAttendanceSummary(
         total_sessions=total,
@@ -117,10 +138,10 @@ def student_profile(
 
 
 @router.patch("/profile/password")
-def student_change_password(
+async def student_change_password(
     payload: dict,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role("student")),
+    current_user: User = Depends(require_role("student", load_user=True)),
 ):
     """PATCH /students/profile/password — change own password."""
     old_pw = payload.get("old_password", "")
@@ -129,10 +150,10 @@ def student_change_password(
         raise HTTPException(status_code=422, detail="old_password and new_password are required.")
     if len(new_pw) < 6:
         raise HTTPException(status_code=422, detail="New password must be at least 6 characters.")
-    if not verify_password(old_pw, current_user.hashed_password):
+    if not await verify_password_async(old_pw, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Current password is incorrect.")
-    current_user.hashed_password = hash_password(new_pw)
-    db.commit()
+    current_user.hashed_password = await hash_password_async(new_pw)
+    await run_in_threadpool(db.commit)
     return {"detail": "Password updated successfully."}
 
 
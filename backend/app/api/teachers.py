@@ -7,16 +7,20 @@ import logging
 from datetime import date, datetime, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
-from sqlalchemy import case, func
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.database import get_db
-from app.core.dependencies import require_role
-from app.core.security import hash_password, verify_password
+from app.core.database import get_async_db, get_db, get_read_db
+from app.core.dependencies import require_role, require_role_async
+from app.core.upsert import upsert
+from app.core.response_cache import response_cache
+from app.core.security import hash_password_async, verify_password_async
 from app.models.admin import Class, ClassSubject, ClassSubjectTeacher, StudentProfile, TimetableEntry
 from app.models.extensions import (
-    AttendanceSession, SessionAttendanceRecord,
+    AttendanceDailyFact, AttendanceSession, SessionAttendanceRecord,
     SessionStatusEnum, SessionAttendanceStatusEnum,
 )
 from app.models.admin import TeacherProfile
@@ -26,6 +30,7 @@ from app.schemas.extensions import (
     AttendanceSessionDetail, BulkMarkRequest, OpenSessionRequest,
     StudentAttendanceRow,
 )
+from app.services import attendance_dashboard, attendance_facts, attendance_rollups
 from app.services.timetable_service import get_teacher_timetable as _svc_teacher_tt
 
 router = APIRouter()
@@ -33,6 +38,14 @@ logger = logging.getLogger(__name__)
 
 _teacher = Depends(require_role("teacher"))
 
+_records = SessionAttendanceRecord.__table__
+_RECORD_KEY = ["attendance_session_id", "student_id"]     # uq_session_student
+
+
+def _mark_set(cur, new) -> dict:
+    """ON DUPLICATE KEY UPDATE clause for a re-marked record."""
+    return {"status": new.status, "note": new.note, "marked_at": new.marked_at, "marked_by": new.marked_by}
+
 
 # Helpers
 
@@ -56,7 +69,7 @@ def _build_session_detail(session: AttendanceSession, db: Session) -> Attendance
     roster_rows: List[StudentAttendanceRow] = []
     if class_id:
         students = (
-            db.query(User)
+            db.query(User.id, User.full_name, StudentProfile.student_code)
             .join(StudentProfile, StudentProfile.user_id == User.id)
             .filter(StudentProfile.class_id == class_id, User.deleted_at == None)  # noqa: E711
             .order_by(User.full_name)
@@ -64,13 +77,12 @@ def _build_session_detail(session: AttendanceSession, db: Session) -> Attendance
         )
         # Index existing records
         rec_map = {r.student_id: r for r in session.records}
-        for stu in students:
-            sp = db.query(StudentProfile).filter(StudentProfile.user_id == stu.id).first()
-            rec = rec_map.get(stu.id)
+        for stu_id, full_name, student_code in students:
+            rec = rec_map.get(stu_id)
             roster_rows.append(StudentAttendanceRow(
-                student_id=stu.id,
-                student_name=stu.full_name,
-                student_code=sp.student_code if sp else "—",
+                student_id=stu_id,
+                student_name=full_name,
+                student_code=student_code or "—",
                 status=rec.status.value if rec and rec.status else None,
                 note=rec.note if rec else None,
                 marked_at=rec.marked_at.isoformat() if rec and rec.marked_at else None,
@@ -93,18 +105,20 @@ def _build_session_detail(session: AttendanceSession, db: Session) -> Attendance
 # Timetable
 
 @router.get("/timetable", response_model=List[TimetableEntryOut])
-def teacher_timetable(
+async def teacher_timetable(
+    request: Request,
     view: str = Query("week", regex="^(day|week)$"),
     date: Optional[str] = Query(None, description="YYYY-MM-DD for day view"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role("teacher")),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role_async("teacher")),
 ):
     """
     GET /teachers/timetable
     Returns ONLY published entries where teacher_id matches the current teacher.
+    Sends a strong ETag; a matching If-None-Match gets 304.
     """
-    results = _svc_teacher_tt(current_user.id, db, view=view, date_str=date)
-    return [TimetableEntryOut(**r) for r in results]
+    body = await _svc_teacher_tt(current_user.id, db, view=view, date_str=date)
+    return response_cache.respond(request, body)
 
 
 # Attendance
@@ -199,22 +213,25 @@ def teacher_open_session(
 
 
 def _ensure_roster(session: AttendanceSession, class_id: int, teacher_id: int, db: Session):
-    """Create null-status records for any students not yet in the roster."""
-    students = (
-        db.query(User)
-        .join(StudentProfile, StudentProfile.user_id == User.id)
+    """
+    Create null-status records for any students not yet in the roster —
+    one INSERT … ON DUPLICATE KEY UPDATE on uq_session_student, so rows that
+    already exist (or are inserted concurrently) are left untouched.
+    """
+    student_ids = [
+        uid for (uid,) in db.query(StudentProfile.user_id)
+        .join(User, User.id == StudentProfile.user_id)
         .filter(StudentProfile.class_id == class_id, User.deleted_at == None)  # noqa: E711
         .all()
-    )
-    existing_ids = {r.student_id for r in session.records}
-    for stu in students:
-        if stu.id not in existing_ids:
-            db.add(SessionAttendanceRecord(
-                attendance_session_id=session.id,
-                student_id=stu.id,
-                status=None,
-                marked_by=None,
-            ))
+    ]
+    if not student_ids:
+        return
+    stmt = upsert(_records, db.get_bind().dialect.name, _RECORD_KEY, lambda cur, new: {"student_id": cur.student_id})
+    db.execute(stmt, [
+        {"attendance_session_id": session.id, "student_id": uid, "status": None, "marked_by": None}
+        for uid in student_ids
+    ])
+    db.expire(session, ["records"])
 
 
 @router.get("/attendance/sessions/{session_id}", response_model=AttendanceSessionDetail)
@@ -240,7 +257,9 @@ def teacher_mark_attendance(
     current_user: User = _teacher,
 ):
     """PUT /teachers/attendance/sessions/{session_id}/records — bulk upsert status."""
-    session = db.query(AttendanceSession).filter(AttendanceSession.id == session_id).first()
+    # Locked so a concurrent close can't finalise the session between the
+    # status check below and the marks (and rollup deltas) being written
+    session = db.query(AttendanceSession).filter(AttendanceSession.id == session_id).with_for_update().first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     if session.created_by != current_user.id:
@@ -251,23 +270,45 @@ def teacher_mark_attendance(
     valid = {v.value for v in SessionAttendanceStatusEnum}
     now = datetime.now(timezone.utc).replace(tzinfo=None)
 
-    rec_map = {r.student_id: r for r in session.records}
+    marks = {}
     for item in payload.records:
         if item.status not in valid:
             raise HTTPException(status_code=400, detail=f"Invalid status '{item.status}'")
-        rec = rec_map.get(item.student_id)
-        if rec is None:
-            rec = SessionAttendanceRecord(
-                attendance_session_id=session_id,
-                student_id=item.student_id,
-            )
-            db.add(rec)
-        rec.status    = SessionAttendanceStatusEnum(item.status)
-        rec.note      = item.note
-        rec.marked_at = now
-        rec.marked_by = current_user.id
+        marks[item.student_id] = item      # a repeated student keeps its last entry
 
+    # Lock the rows being re-marked so concurrent requests see each other's
+    # statuses before the rollup deltas are computed
+    previous = dict(
+        db.query(SessionAttendanceRecord.student_id, SessionAttendanceRecord.status)
+        .filter(
+            SessionAttendanceRecord.attendance_session_id == session_id,
+            SessionAttendanceRecord.student_id.in_(marks),
+        )
+        .with_for_update()
+        .all()
+    )
+    rows = [
+        {
+            "attendance_session_id": session_id,
+            "student_id":            student_id,
+            "status":                SessionAttendanceStatusEnum(item.status),
+            "note":                  item.note,
+            "marked_at":             now,
+            "marked_by":             current_user.id,
+        }
+        for student_id, item in marks.items()
+    ]
+    if rows:
+        db.execute(upsert(_records, db.get_bind().dialect.name, _RECORD_KEY, _mark_set), rows)
+    db.expire(session, ["records"])
+    changes = [
+        (row["student_id"], previous.get(row["student_id"]), row["status"], session.session_date)
+        for row in rows
+    ]
+
+    attendance_rollups.apply_changes(db, changes)
     db.commit()
+    attendance_dashboard.invalidate()
     db.refresh(session)
     return _build_session_detail(session, db)
 
@@ -280,7 +321,9 @@ def teacher_close_session(
     current_user: User = _teacher,
 ):
     """POST /teachers/attendance/sessions/{session_id}/close — finalize session."""
-    session = db.query(AttendanceSession).filter(AttendanceSession.id == session_id).first()
+    # Locked so two concurrent closes can't both pass the CLOSED check and
+    # count the session into the rollups and daily facts twice
+    session = db.query(AttendanceSession).filter(AttendanceSession.id == session_id).with_for_update().first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     if session.created_by != current_user.id:
@@ -290,19 +333,24 @@ def teacher_close_session(
 
     now = datetime.now(timezone.utc).replace(tzinfo=None)
     # Mark all still-null records as ABSENT
+    changes = []
     for rec in session.records:
         if rec.status is None:
             rec.status    = SessionAttendanceStatusEnum.ABSENT
             rec.marked_at = now
             rec.marked_by = current_user.id
+            changes.append((rec.student_id, None, rec.status, session.session_date))
 
+    entry = db.query(TimetableEntry).filter(TimetableEntry.id == session.timetable_entry_id).first()
+    attendance_rollups.apply_changes(db, changes)
+    attendance_facts.record_closed_session(db, session, entry)
     session.status = SessionStatusEnum.CLOSED
     db.commit()
+    attendance_dashboard.invalidate()
     db.refresh(session)
 
     # WhatsApp: notify parents of absent/late students
     from app.api.whatsapp import notify_attendance
-    entry = db.query(TimetableEntry).filter(TimetableEntry.id == session.timetable_entry_id).first()
     subject_name = entry.subject.name if entry and entry.subject else "class"
     session_date_str = session.session_date.strftime("%b %d, %Y") if session.session_date else ""
     for rec in session.records:
@@ -325,7 +373,7 @@ def teacher_close_session(
 
 @router.get("/stats")
 def teacher_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = _teacher,
 ):
     """GET /teachers/stats — KPI counts for the teacher dashboard."""
@@ -351,34 +399,17 @@ def teacher_stats(
             .scalar()
         ) or 0
 
-    # Avg attendance rate from closed sessions created by this teacher
-    stats = (
+    # Avg attendance rate from closed sessions created by this teacher (daily facts)
+    F = AttendanceDailyFact
+    marked, attended = (
         db.query(
-            func.count(SessionAttendanceRecord.student_id).label("total"),
-            func.sum(
-                case(
-                    (
-                        SessionAttendanceRecord.status.in_([
-                            SessionAttendanceStatusEnum.PRESENT,
-                            SessionAttendanceStatusEnum.LATE,
-                        ]),
-                        1,
-                    ),
-                    else_=0,
-                )
-            ).label("present_late"),
-        )
-        .join(AttendanceSession, AttendanceSession.id == SessionAttendanceRecord.attendance_session_id)
-        .filter(
-            AttendanceSession.created_by == current_user.id,
-            AttendanceSession.status == SessionStatusEnum.CLOSED,
-            SessionAttendanceRecord.status.isnot(None),
+            func.sum(F.present_count + F.absent_count + F.late_count + F.excused_count),
+            func.sum(F.present_count + F.late_count),
         )
-        .first()
+        .filter(F.teacher_id == current_user.id)
+        .one()
     )
-    total_recs = stats.total or 0
-    present_late = stats.present_late or 0
-    avg_attendance_rate = round(present_late / total_recs * 100, 1) if total_recs > 0 else 0.0
+    avg_attendance_rate = round(attended / marked * 100, 1) if marked else 0.0
 
     return {
         "total_students": total_students,
@@ -411,10 +442,10 @@ def teacher_profile(
 
 
 @router.patch("/profile/password")
-def teacher_change_password(
+async def teacher_change_password(
     payload: dict,
     db: Session = Depends(get_db),
-    current_user: User = _teacher,
+    current_user: User = Depends(require_role("teacher", load_user=True)),
 ):
     """PATCH /teachers/profile/password — change own password."""
     old_pw = payload.get("old_password", "")
@@ -423,10 +454,10 @@ def teacher_change_password(
         raise HTTPException(status_code=422, detail="old_password and new_password are required.")
     if len(new_pw) < 6:
         raise HTTPException(status_code=422, detail="New password must be at least 6 characters.")
-    if not verify_password(old_pw, current_user.hashed_password):
+    if not await verify_password_async(old_pw, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Current password is incorrect.")
-    current_user.hashed_password = hash_password(new_pw)
-    db.commit()
+    current_user.hashed_password = await hash_password_async(new_pw)
+    await run_in_threadpool(db.commit)
     return {"detail": "Password updated successfully."}
 
 
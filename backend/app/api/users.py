@@ -11,6 +11,8 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.core.database import get_db
+from app.core.principal_cache import principal_cache
+from app.core.response_cache import CLASSES_SCOPE, response_cache
 from app.models.user import User
 from app.schemas.user import UserRead, UserUpdate
 
@@ -36,8 +38,15 @@ def update_user(user_id: int, payload: UserUpdate, db: Session = Depends(get_db)
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    renamed = payload.full_name is not None and payload.full_name != user.full_name
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(user, field, value)
     db.commit()
     db.refresh(user)
+    principal_cache.invalidate(user_id)
+    if renamed and user.role.name == "teacher":
+        # Names appear in every timetable and as class head teacher
+        from app.services.timetable_service import invalidate_timetables
+        response_cache.bump(CLASSES_SCOPE)
+        invalidate_timetables(everything=True)
     return user
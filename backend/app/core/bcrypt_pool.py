@@ -0,0 +1,83 @@
+"""
+Dedicated, bounded executor for bcrypt work.
+
+A cost-12 bcrypt call burns ~250 ms of CPU. Run inside FastAPI's shared
+sync threadpool, a burst of logins at the start of the school day takes
+every worker thread and stalls unrelated endpoints. This pool gives
+hashing its own small set of threads (the `bcrypt` package releases the
+GIL while hashing, so threads scale across cores without a process
+pool) and caps how many hashes run at once.
+
+Async callers `await pool.run(fn, ...)` and hold no threadpool slot while
+queued; sync callers use `pool.call(fn, ...)`, which blocks the calling
+thread but still respects the concurrency cap.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class BcryptPool:
+    """ThreadPoolExecutor wrapper that records queue depth and wait/run times."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="bcrypt",
+        )
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.max_queue_depth = 0
+        self.total_wait_ms = 0.0
+        self.total_run_ms = 0.0
+
+    def _wrap(self, fn, args):
+        submitted = time.perf_counter()
+
+        def _job():
+            started = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+                self.total_wait_ms += (started - submitted) * 1000
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+                    self.total_run_ms += (time.perf_counter() - started) * 1000
+
+        with self._lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        return _job
+
+    def submit(self, fn, *args) -> Future:
+        return self._executor.submit(self._wrap(fn, args))
+
+    def call(self, fn, *args):
+        """Run `fn(*args)` on the pool and block until it finishes."""
+        return self.submit(fn, *args).result()
+
+    async def run(self, fn, *args):
+        """Run `fn(*args)` on the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> dict:
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "active": self.active,
+                "completed": self.completed,
+                "max_queue_depth": self.max_queue_depth,
+                "avg_wait_ms": round(self.total_wait_ms / done, 1),
+                "avg_run_ms": round(self.total_run_ms / done, 1),
+            }
@@ -0,0 +1,168 @@
+"""
+Response compression above a size threshold.
+
+Large JSON lists (user directory, fee records, attendance) are highly
+repetitive and shrink 5-10× compressed. CompressionMiddleware compresses a
+response body when:
+
+  * it is at least RESPONSE_COMPRESSION_MIN_BYTES long,
+  * its content type is textual (JSON, text/*, CSV, JS, XML),
+  * it does not already carry a Content-Encoding, and
+  * the client sent a matching Accept-Encoding.
+
+Brotli is preferred when the `brotli` package is installed and the client
+accepts `br`, otherwise gzip. Bodies arrive in several ASGI messages
+(the log_requests middleware re-streams every response), so chunks are
+buffered until the threshold is crossed; a body that ends below it is sent
+as-is, a longer one is compressed incrementally from then on.
+"""
+
+import gzip
+import io
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+_COMPRESSIBLE = ("application/json", "text/", "application/javascript", "application/xml", "application/csv")
+
+
+def _accepted(accept_encoding: str) -> set:
+    """Codings the client accepts with q > 0."""
+    codings = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            codings.add(name.strip())
+    return codings
+
+
+class _Compressor:
+    """Incremental gzip / brotli encoder."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+            self._gz = None
+        else:
+            self._br = None
+            self._buf = io.BytesIO()
+            self._gz = gzip.GzipFile(mode="wb", fileobj=self._buf, compresslevel=gzip_level)
+
+    def feed(self, data: bytes, final: bool) -> bytes:
+        if self._br is not None:
+            out = self._br.process(data)
+            return out + (self._br.finish() if final else self._br.flush())
+        self._gz.write(data)
+        if final:
+            self._gz.close()
+        else:
+            self._gz.flush()
+        out = self._buf.getvalue()
+        self._buf.seek(0)
+        self._buf.truncate()
+        return out
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware; see the module docstring for when it compresses."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        use_brotli: bool = True,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.use_brotli = use_brotli and brotli is not None
+
+    def _choose(self, accept_encoding: str) -> Optional[str]:
+        accepted = _accepted(accept_encoding)
+        if self.use_brotli and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.minimum_size <= 0:
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None     # held while undecided
+        buffered: List[bytes] = []
+        compressor: Optional[_Compressor] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                eligible = (
+                    "content-encoding" not in headers
+                    and headers.get("content-type", "").startswith(_COMPRESSIBLE)
+                )
+                if eligible:
+                    start = message
+                else:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+            if compressor is not None:
+                await send({"type": "http.response.body", "body": compressor.feed(body, not more), "more_body": more})
+                return
+            if start is None:   # passthrough
+                await send(message)
+                return
+
+            buffered.append(body)
+            size = sum(len(b) for b in buffered)
+            if more and size < self.minimum_size:
+                return
+            pending, start = start, None
+            data = b"".join(buffered)
+            buffered.clear()
+            if not more and size < self.minimum_size:
+                await send(pending)
+                await send({"type": "http.response.body", "body": data, "more_body": False})
+                return
+
+            compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+            out = compressor.feed(data, not more)
+            pending["headers"] = list(pending.get("headers", []))
+            headers = MutableHeaders(raw=pending["headers"])
+            headers["Content-Encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(out))
+            await send(pending)
+            await send({"type": "http.response.body", "body": out, "more_body": more})
+
+        await self.app(scope, receive, send_wrapper)
@@ -31,11 +31,65 @@ class Settings(BaseSettings):
     # Fully-qualified SQLAlchemy URL (takes precedence; built from components if blank)
     DATABASE_URL: str = ""
 
+    # Async engine for the hot read routes (see get_async_db). Blank = derive from
+    # the primary DSN: mysql+pymysql → mysql+aiomysql, sqlite → sqlite+aiosqlite.
+    DATABASE_ASYNC_URL: str = ""
+
+    # Connection pool (applies to the primary, replica and async engines)
+    DB_POOL_SIZE:         int   = 10     # persistent connections per worker
+    DB_MAX_OVERFLOW:      int   = 20     # extra connections allowed under burst
+    DB_POOL_TIMEOUT:      float = 10.0   # seconds to wait for a free connection
+    DB_POOL_RECYCLE:      int   = 1800   # reconnect after this many seconds (< MySQL wait_timeout)
+    DB_POOL_USE_LIFO:     bool  = True   # reuse hot connections so idle ones can expire
+
+    # Read replica for analytics routes (see get_read_db in app/core/database.py).
+    # Leave blank — or set to the same DSN — on single-node installs.
+    DATABASE_READ_URL:                 str   = ""
+    DB_REPLICA_MAX_LAG_SECONDS:        float = 5.0    # fall back to the primary above this lag
+    DB_REPLICA_CHECK_INTERVAL_SECONDS: float = 10.0   # how often replica lag is re-measured
+    DB_READ_YOUR_WRITES_SECONDS:       float = 10.0   # pin a caller to the primary after it writes
+
+    # Per-request SQL instrumentation (see app/core/query_stats.py)
+    DB_QUERY_STATS_HEADERS:      bool = True  # emit X-DB-* response headers
+    DB_REPEATED_QUERY_THRESHOLD: int  = 10    # same statement shape this often → N+1 warning
+
     # JWT
     SECRET_KEY: str = "change-me-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30  # Reduced from 60 for security
 
+    # Authenticated-principal cache (see app/core/principal_cache.py)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60     # 0 disables the cache
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # ETag response cache for timetable / catalogue reads (see app/core/response_cache.py)
+    RESPONSE_CACHE_TTL_SECONDS: int = 300    # 0 disables the cache (ETags are still sent)
+    RESPONSE_CACHE_MAX_ENTRIES: int = 5000
+
+    # Large list responses (see app/core/serialization.py, app/core/compression.py)
+    TRUSTED_RESPONSES_VALIDATE:     bool = False   # re-check trusted bodies against their model (dev / CI)
+    RESPONSE_COMPRESSION_MIN_BYTES: int  = 1024    # 0 disables gzip / brotli
+    RESPONSE_COMPRESSION_BROTLI:    bool = True    # prefer br when the brotli package is installed
+
+    # Admin attendance dashboard aggregates (see app/services/attendance_dashboard.py)
+    ATTENDANCE_DASHBOARD_TTL_SECONDS: int = 30   # shared by all admins; 0 disables the cache
+
+    # bcrypt executor (see app/core/bcrypt_pool.py)
+    BCRYPT_MAX_CONCURRENCY: int = 0   # 0 = half the CPU cores, minimum 1
+
+    # CSV user import (see app/services/user_import.py)
+    IMPORT_CHUNK_SIZE: int = 500   # rows per executemany batch / commit
+    ID_BLOCK_SIZE:     int = 100   # student codes / staff IDs reserved per worker at a time
+
+    # Streaming CSV exports (see app/core/csv_stream.py)
+    CSV_EXPORT_BATCH_ROWS: int = 1000   # rows fetched from the server-side cursor per chunk sent
+
+    # Real-time messaging push (see app/core/realtime.py)
+    REALTIME_BROKER:               str   = "memory"   # or "package.module:Class" for a multi-worker bus
+    REALTIME_QUEUE_SIZE:           int   = 256        # events buffered per socket before it is dropped
+    REALTIME_HEARTBEAT_SECONDS:    float = 25.0       # ping idle sockets so proxies keep them open
+    REALTIME_AUTH_TIMEOUT_SECONDS: float = 10.0       # close a new socket that hasn't authenticated by then
+
     # CORS
     ALLOWED_ORIGINS: List[str] = ["http://localhost:5173", "http://127.0.0.1:5173"]
 
@@ -68,5 +122,19 @@ class Settings(BaseSettings):
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
 
+    def get_async_database_url(self) -> str:
+        """DSN for the asyncio engine, derived from the primary DSN unless set explicitly."""
+        if self.DATABASE_ASYNC_URL:
+            return self.DATABASE_ASYNC_URL
+        url = self.get_database_url()
+        scheme, rest = url.split("://", 1)
+        dialect = scheme.split("+", 1)[0]
+        driver = {"mysql": "aiomysql", "sqlite": "aiosqlite"}.get(dialect)
+        return f"{dialect}+{driver}://{rest}" if driver else url
+
+    def get_read_database_url(self) -> str:
+        """Replica DSN for read-only analytics, or the primary DSN when none is configured."""
+        return self.DATABASE_READ_URL or self.get_database_url()
+
 
 settings = Settings()
@@ -0,0 +1,64 @@
+"""
+Streaming CSV downloads.
+
+The user and fee exports used to load every row as ORM objects (plus a
+lazy load or two per row), write the whole file into a StringIO and only
+then send it — memory grew with the export and nothing reached the client
+until the last row was written. `csv_response()` instead:
+
+  * sends the header row immediately;
+  * runs one SELECT with `yield_per`, which streams rows through a
+    server-side cursor (PyMySQL SSCursor) in CSV_EXPORT_BATCH_ROWS batches;
+  * writes each batch into a small buffer and yields it as one chunk.
+
+The statement must carry everything a row needs (join / correlated
+subquery, no per-row lazy loads): while a server-side cursor is open the
+connection can't run another query.
+
+The generator opens its own session: FastAPI closes `Depends(get_db)`
+sessions before the response body is sent. Build and validate the query
+in the route (so bad parameters still get a 4xx), then hand it over.
+"""
+
+import csv
+import io
+from typing import Any, Callable, Iterator, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+
+def _rows(header: Sequence[str], stmt: Select, to_row: Callable[[Any], Sequence]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def drain() -> str:
+        chunk = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return chunk
+
+    writer.writerow(header)
+    yield drain()
+
+    batch = settings.CSV_EXPORT_BATCH_ROWS
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=batch))
+        for rows in result.partitions():
+            writer.writerows(to_row(r) for r in rows)
+            yield drain()
+    finally:
+        db.close()
+
+
+def csv_response(filename: str, header: Sequence[str], stmt: Select, to_row: Callable[[Any], Sequence]) -> StreamingResponse:
+    """Stream `stmt`'s rows, each mapped through `to_row`, as a CSV attachment named `filename`."""
+    return StreamingResponse(
+        _rows(header, stmt, to_row),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
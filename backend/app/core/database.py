@@ -4,21 +4,83 @@ Database engine, session factory, and the shared SQLAlchemy Base.
 Every model file imports `Base` from here so all tables are registered
 under the same metadata object. The `get_db` function is used as a
 FastAPI dependency to inject a database session into route handlers.
+
+The engine carries the per-request query counters from app.core.query_stats
+and the pool metrics from app.core.pool_metrics; pool sizing comes from the
+DB_POOL_* settings. `get_async_db` is the asyncio counterpart of `get_db`
+(same database, separate pool) for read-heavy `async def` routes.
+
+Read-only analytics routes use `get_read_db` instead. It hands out a
+session on the replica engine (DATABASE_READ_URL) unless:
+  * no separate replica is configured (single-node installs),
+  * the request sends `X-Read-Your-Writes: 1`,
+  * the same caller wrote through the primary in the last
+    DB_READ_YOUR_WRITES_SECONDS (recorded by the log_requests middleware), or
+  * the replica is unreachable or lagging more than DB_REPLICA_MAX_LAG_SECONDS.
+In every one of those cases the session comes from the primary.
 """
 
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from fastapi import Depends, Request, Response
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.pool_metrics import instrument_engine, timed_pool_class
+from app.core.query_stats import install_query_hooks
 
-engine = create_engine(
-    settings.get_database_url(),
-    pool_pre_ping=True,
-)
+logger = logging.getLogger("connected.db")
+
+
+def _pool_kwargs() -> dict:
+    return dict(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_use_lifo=settings.DB_POOL_USE_LIFO,
+        pool_pre_ping=True,
+    )
+
+
+def _make_engine(url: str, name: str):
+    """Engine with pool sizing from Settings, query counters and pool metrics attached."""
+    eng = create_engine(url, poolclass=timed_pool_class(name), **_pool_kwargs())
+    install_query_hooks(eng)
+    instrument_engine(eng, name)
+    return eng
+
+
+engine = _make_engine(settings.get_database_url(), "primary")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+if settings.get_read_database_url() == settings.get_database_url():
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
+else:
+    read_engine = _make_engine(settings.get_read_database_url(), "replica")
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# asyncio engine for hot read routes that should not hold a threadpool slot
+# while they wait on MySQL (aiomysql in production, aiosqlite in tests)
+async_engine = create_async_engine(
+    settings.get_async_database_url(),
+    poolclass=timed_pool_class("async", base=AsyncAdaptedQueuePool),
+    **_pool_kwargs(),
+)
+install_query_hooks(async_engine.sync_engine)
+instrument_engine(async_engine.sync_engine, "async")
+
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
 Base = declarative_base()
 
 
@@ -29,3 +91,112 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    FastAPI dependency — yields an AsyncSession for `async def` read routes.
+    Relationships are not lazy-loadable on it; eager-load everything you touch.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Read replica routing
+
+class ReplicaMonitor:
+    """Caches whether the replica is reachable and within the allowed lag."""
+
+    def __init__(self, max_lag: float, interval: float):
+        self.max_lag = max_lag
+        self.interval = interval
+        self.lag: Optional[float] = None
+        self.healthy = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _measure_lag(self) -> Optional[float]:
+        """Seconds behind the source; 0 for a non-MySQL or non-replica server, None if stopped."""
+        with read_engine.connect() as conn:
+            if read_engine.dialect.name != "mysql":
+                return 0.0
+            try:
+                row = conn.exec_driver_sql("SHOW REPLICA STATUS").mappings().first()
+            except Exception:   # MySQL < 8.0.22
+                row = conn.exec_driver_sql("SHOW SLAVE STATUS").mappings().first()
+            if row is None:
+                return 0.0
+            lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+            return None if lag is None else float(lag)
+
+    def is_usable(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.interval:
+                return self.healthy
+            self._checked_at = now
+        try:
+            lag = self._measure_lag()
+        except Exception as exc:
+            lag = None
+            logger.warning("Replica check failed, reading from primary: %s", exc)
+        healthy = lag is not None and lag <= self.max_lag
+        if not healthy and self.healthy:
+            logger.warning("Replica lag %s s exceeds %s s — reading from primary", lag, self.max_lag)
+        self.lag, self.healthy = lag, healthy
+        return healthy
+
+
+replica_monitor = ReplicaMonitor(
+    max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    interval=settings.DB_REPLICA_CHECK_INTERVAL_SECONDS,
+)
+
+# Authorization header → monotonic time of that caller's last write
+_recent_writes: Dict[str, float] = {}
+_recent_writes_lock = threading.Lock()
+
+
+def note_write(caller: Optional[str]) -> None:
+    """Pin `caller` (its Authorization header) to the primary for a few seconds."""
+    if not caller or read_engine is engine:
+        return
+    now = time.monotonic()
+    with _recent_writes_lock:
+        _recent_writes[caller] = now
+        if len(_recent_writes) > 10000:
+            cutoff = now - settings.DB_READ_YOUR_WRITES_SECONDS
+            for key in [k for k, t in _recent_writes.items() if t < cutoff]:
+                del _recent_writes[key]
+
+
+def wrote_recently(caller: Optional[str]) -> bool:
+    if not caller:
+        return False
+    with _recent_writes_lock:
+        t = _recent_writes.get(caller)
+    return t is not None and time.monotonic() - t < settings.DB_READ_YOUR_WRITES_SECONDS
+
+
+def get_read_db(request: Request, response: Response, primary: Session = Depends(get_db)):
+    """
+    FastAPI dependency for read-only routes — replica session when safe.
+    Otherwise it reuses the request's `get_db` session (already used by the
+    auth dependency), so the fallback never holds a second primary connection.
+    """
+    caller = request.headers.get("authorization")
+    use_replica = (
+        read_engine is not engine
+        and request.headers.get("x-read-your-writes") != "1"
+        and not wrote_recently(caller)
+        and replica_monitor.is_usable()
+    )
+    response.headers["X-DB-Source"] = "replica" if use_replica else "primary"
+    if not use_replica:
+        yield primary
+        return
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
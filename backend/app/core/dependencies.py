@@ -11,54 +11,156 @@ Usage:
     @router.get("/grades/{id}")
     def get_grade(id: int, record=Depends(require_ownership(Grade, "student_id"))):
         return record
+
+`get_current_user` and `require_role` return a cached, read-only `Principal`
+(id, email, full_name, role.name, is_active). Handlers that need to modify
+the user row (e.g. password changes) opt in to the ORM object:
+
+    @router.patch("/profile/password")
+    def change_password(current_user: User = Depends(require_role("teacher", load_user=True))):
+        current_user.hashed_password = ...
+
+`async def` routes that use `get_async_db` pair it with
+`get_current_user_async` / `require_role_async`, which resolve the same
+Principal without touching the sync pool or the threadpool. WebSocket
+routes (browsers can't set headers on them) pass the raw token to
+`principal_for_token` instead.
 """
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
+from app.core.principal_cache import Principal, principal_cache
 from app.core.security import decode_access_token
 from app.models.user import User
 
 bearer_scheme = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    """Decode JWT and return the active User, or raise 401."""
-    payload = decode_access_token(credentials.credentials)
+def _token_claims(token: str):
+    """(user_id, exp) from the bearer token, or raise 401."""
+    payload = decode_access_token(token)
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
-    user = db.query(User).filter(User.id == int(payload["sub"])).first()
+    return int(payload["sub"]), int(payload.get("exp", 0))
+
+
+def _cache_principal(user, exp: int) -> Principal:
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
-    if not user.is_active:
+    principal = Principal.from_user(user)
+    principal_cache.put(principal, exp)
+    return principal
+
+
+def _ensure_active(principal: Principal) -> Principal:
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Account is inactive or disabled",
         )
+    return principal
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: Session = Depends(get_db),
+) -> Principal:
+    """Decode JWT and return the active user's Principal, or raise 401."""
+    user_id, exp = _token_claims(credentials.credentials)
+    principal = principal_cache.get(user_id, exp)
+    if principal is None:
+        user = (
+            db.query(User)
+            .options(joinedload(User.role))
+            .filter(User.id == user_id)
+            .first()
+        )
+        principal = _cache_principal(user, exp)
+    return _ensure_active(principal)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """get_current_user for async routes — cache misses load the user on the async engine."""
+    return await principal_for_token(credentials.credentials, db)
+
+
+async def principal_for_token(token: str, db: AsyncSession) -> Principal:
+    """The active user's Principal for a raw JWT (e.g. a WebSocket's auth frame), or raise 401 / 403."""
+    user_id, exp = _token_claims(token)
+    principal = principal_cache.get(user_id, exp)
+    if principal is None:
+        result = await db.execute(
+            select(User).options(joinedload(User.role)).where(User.id == user_id)
+        )
+        principal = _cache_principal(result.scalars().first(), exp)
+    return _ensure_active(principal)
+
+
+def get_current_user_orm(
+    principal: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> User:
+    """Opt-in variant of get_current_user that returns the session-bound User row."""
+    user = db.query(User).filter(User.id == principal.id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
     return user
 
 
-def require_role(*allowed_roles: str):
-    """Return a dependency that enforces one of the given roles."""
+def _role_guard(principal: Principal, allowed_roles) -> Principal:
+    if principal.role.name not in allowed_roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Access denied. Required role(s): {', '.join(allowed_roles)}",
+        )
+    return principal
 
-    def _check(user: User = Depends(get_current_user)) -> User:
-        if user.role.name not in allowed_roles:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Access denied. Required role(s): {', '.join(allowed_roles)}",
-            )
-        return user
+
+def require_role(*allowed_roles: str, load_user: bool = False):
+    """
+    Return a dependency that enforces one of the given roles.
+
+    With `load_user=True` the dependency yields the ORM User instead of the
+    cached Principal (one extra query, only for handlers that write to it).
+    """
+
+    def _check(user: Principal = Depends(get_current_user)) -> Principal:
+        return _role_guard(user, allowed_roles)
+
+    if not load_user:
+        return _check
+
+    def _check_orm(
+        principal: Principal = Depends(_check),
+        db: Session = Depends(get_db),
+    ) -> User:
+        return get_current_user_orm(principal, db)
+
+    return _check_orm
+
+
+def require_role_async(*allowed_roles: str):
+    """require_role for async routes (built on get_current_user_async)."""
+
+    async def _check(user: Principal = Depends(get_current_user_async)) -> Principal:
+        return _role_guard(user, allowed_roles)
 
     return _check
 
@@ -81,7 +183,7 @@ def require_ownership(model, owner_field: str):
     def _check(
         id: int,
         db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user),
+        current_user: Principal = Depends(get_current_user),
     ):
         record = db.query(model).filter(model.id == id).first()
         if not record:
@@ -0,0 +1,62 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is fetched with `ORDER BY <sort key>, <unique id> LIMIT limit + 1`
+filtered to rows strictly after the previous page's last key, so the cost
+of page N doesn't grow with N the way OFFSET does. Routes keep returning a
+plain JSON list and put the cursor for the next page in the X-Next-Cursor
+response header; it is absent on the last page. The cursor is an opaque
+URL-safe token — clients pass it back verbatim as `?cursor=`.
+
+Lists that were unbounded before they gained a cursor page only when asked
+to (`page_size()`): without ?limit= or ?cursor= they still return every
+row, so clients that never read the header aren't silently truncated.
+"""
+
+import base64
+import json
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 200
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[list]:
+    """The key values stored in `cursor`, or None for the first page. 400 on a malformed token."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def page_size(limit: Optional[int], cursor: Optional[str]) -> Optional[int]:
+    """Rows per page for an opt-in paged list: `limit`, the default when only a cursor is given, else None (all)."""
+    if limit is None and cursor:
+        return DEFAULT_PAGE_SIZE
+    return limit
+
+
+def split_page(rows: Sequence, limit: Optional[int], key: Callable[[Any], Tuple]) -> Tuple[List, Optional[str]]:
+    """Trim rows fetched with LIMIT limit + 1 and return (page, next cursor). `limit` None: everything, no cursor."""
+    if limit is None:
+        return list(rows), None
+    page = list(rows[:limit])
+    if len(rows) <= limit:
+        return page, None
+    return page, encode_cursor(*key(page[-1]))
+
+
+def cursor_headers(next_cursor: Optional[str]) -> dict:
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
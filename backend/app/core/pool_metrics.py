@@ -0,0 +1,166 @@
+"""
+Connection-pool instrumentation for the SQLAlchemy engines.
+
+Engines are built with `poolclass=timed_pool_class(name)`, a QueuePool
+subclass that times how long each checkout waited, and
+`instrument_engine(engine, name)` attaches the pool event listeners. The
+admin `/admin/metrics` route reports, per engine:
+
+  * pool size, checked-out and overflow counts (from QueuePool itself)
+  * a histogram of checkout wait times and the number of pool timeouts
+  * age of every open DB-API connection and how long the oldest current
+    checkout has been held (a leaked session shows up here)
+
+Checkouts are also attributed to the request that made them through the
+QueryStats object in app.core.query_stats, so the log_requests middleware
+can warn when one request holds more than one connection from the same
+pool at a time (typically a handler that opens an extra `SessionLocal()`
+while its `get_db` session is still checked out).
+"""
+
+import bisect
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.core.query_stats import current_stats
+
+# Upper bounds (ms) of the wait-time histogram buckets; the last bucket is open-ended
+WAIT_BUCKETS_MS = [1, 5, 10, 50, 100, 500, 1000, 5000]
+
+
+class PoolMetrics:
+    """Counters for one engine's pool; all methods are thread-safe."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.wait_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self._opened: Dict[int, float] = {}        # id(dbapi conn) → time connected
+        self._checked_out: Dict[int, float] = {}   # id(dbapi conn) → time checked out
+
+    def record_wait(self, ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            self.wait_counts[bisect.bisect_left(WAIT_BUCKETS_MS, ms)] += 1
+            self.wait_total_ms += ms
+            self.wait_max_ms = max(self.wait_max_ms, ms)
+
+    def snapshot(self, pool) -> dict:
+        now = time.time()
+        with self._lock:
+            ages = [now - t for t in self._opened.values()]
+            held = [now - t for t in self._checked_out.values()]
+            waits = sum(self.wait_counts)
+            labels = [f"<={b}ms" for b in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+            data = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "wait_ms": {
+                    "avg": round(self.wait_total_ms / waits, 2) if waits else 0.0,
+                    "max": round(self.wait_max_ms, 2),
+                    "histogram": dict(zip(labels, self.wait_counts)),
+                },
+                "connections": {
+                    "open": len(ages),
+                    "oldest_age_s": round(max(ages), 1) if ages else 0.0,
+                    "avg_age_s": round(sum(ages) / len(ages), 1) if ages else 0.0,
+                    "longest_checkout_s": round(max(held), 2) if held else 0.0,
+                },
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "pool_size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            })
+        return data
+
+
+_metrics: Dict[str, PoolMetrics] = {}
+_instrumented: set = set()
+
+
+class _TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited. `metrics` is set per subclass."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception as exc:
+            self.metrics.record_wait((time.perf_counter() - start) * 1000,
+                                     timed_out=isinstance(exc, PoolTimeoutError))
+            raise
+        self.metrics.record_wait((time.perf_counter() - start) * 1000)
+        return conn
+
+
+def timed_pool_class(name: str, base=QueuePool):
+    """
+    A `base` pool subclass bound to the PoolMetrics for `name` (survives
+    pool.recreate()). Pass AsyncAdaptedQueuePool for asyncio engines.
+    """
+    metrics = _metrics.setdefault(name, PoolMetrics(name))
+    return type(f"TimedQueuePool_{name}", (_TimedQueuePool, base), {"metrics": metrics})
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Attach connect/checkout/checkin listeners feeding PoolMetrics[`name`] (idempotent)."""
+    if id(engine) in _instrumented:
+        return
+    _instrumented.add(id(engine))
+    metrics = _metrics.setdefault(name, PoolMetrics(name))
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, record):
+        with metrics._lock:
+            metrics.connects += 1
+            metrics._opened[id(dbapi_conn)] = time.time()
+
+    @event.listens_for(engine, "close")
+    def _on_close(dbapi_conn, record):
+        with metrics._lock:
+            metrics._opened.pop(id(dbapi_conn), None)
+            metrics._checked_out.pop(id(dbapi_conn), None)
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        with metrics._lock:
+            metrics.checkouts += 1
+            metrics._checked_out[id(dbapi_conn)] = time.time()
+        stats = current_stats()
+        if stats is not None:
+            stats.connection_acquired(name)
+            record.info["request_stats"] = stats
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        with metrics._lock:
+            metrics._checked_out.pop(id(dbapi_conn), None)
+        stats = record.info.pop("request_stats", None)
+        if stats is not None:
+            stats.connection_released(name)
+
+
+def pool_metrics(engines: Dict[str, Engine]) -> Dict[str, dict]:
+    """Snapshot of every named engine's pool, for the admin metrics route."""
+    return {
+        name: _metrics.setdefault(name, PoolMetrics(name)).snapshot(eng.pool)
+        for name, eng in engines.items()
+    }
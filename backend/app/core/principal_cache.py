@@ -0,0 +1,123 @@
+"""
+In-process cache of authenticated principals.
+
+`get_current_user` used to load the User row and then lazy-load its Role
+on every request. This module keeps an immutable snapshot of the fields
+route handlers actually read, keyed by (user id, token exp), so a warm
+request resolves the caller without touching the database.
+
+Entries expire after PRINCIPAL_CACHE_TTL_SECONDS or when the token itself
+expires, whichever is sooner. Admin actions that change a user's
+identity or access (status toggle, edit, delete, password reset) call
+`principal_cache.invalidate(user_id)`.
+
+The cache is per worker process: with several uvicorn workers, a change
+is seen immediately by the worker that made it and by the others within
+one TTL.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class RoleRef:
+    """Stand-in for the Role relationship so `principal.role.name` keeps working."""
+    name: str
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Read-only snapshot of the authenticated user."""
+    id: int
+    email: str
+    full_name: str
+    role: RoleRef
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=RoleRef(user.role.name),
+            is_active=bool(user.is_active),
+        )
+
+
+class PrincipalCache:
+    """Thread-safe TTL + LRU map of (user_id, exp) → Principal."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, int], Tuple[Principal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int, exp: int) -> Optional[Principal]:
+        key = (user_id, exp)
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[1] <= now:
+                if item is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, principal: Principal, exp: int) -> None:
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        # Never outlive the token the entry was created for
+        ttl = min(self.ttl_seconds, max(exp - time.time(), 0))
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[(principal.id, exp)] = (principal, time.monotonic() + ttl)
+            self._entries.move_to_end((principal.id, exp))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop every cached token for `user_id`."""
+        with self._lock:
+            stale = [k for k in self._entries if k[0] == user_id]
+            for k in stale:
+                del self._entries[k]
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,154 @@
+"""
+Per-request SQL instrumentation.
+
+SQLAlchemy cursor events on the engine feed a `QueryStats` object that
+lives in a context variable for the duration of one HTTP request. The
+`log_requests` middleware in main.py starts a fresh object per request,
+then reports the totals in response headers and in the request log line.
+
+Statements are grouped by "shape" (literals and bind markers stripped,
+IN-lists collapsed) so an N+1 loop shows up as one shape executed many
+times rather than as hundreds of distinct strings.
+
+Usage in tests:
+    with capture_queries() as stats:
+        client.get("/api/v1/admin/dashboard", headers=...)
+    assert stats.count <= 20
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+_PARAM_RE   = re.compile(r"%\(\w+\)s|%s|\?|:\w+")
+_STRING_RE  = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE  = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE   = re.compile(r"\s+")
+_WRITE_RE   = re.compile(r"\s*(INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+
+def normalize_statement(statement: str) -> str:
+    """Reduce a SQL string to its shape: literals/params → ?, IN-lists → (?)."""
+    shape = _STRING_RE.sub("?", statement)
+    shape = _PARAM_RE.sub("?", shape)
+    shape = _NUMBER_RE.sub("?", shape)
+    shape = _IN_LIST_RE.sub("(?)", shape)
+    return _SPACE_RE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Query count, DB time and statement-shape histogram for one unit of work."""
+
+    def __init__(self):
+        self.count = 0
+        self.writes = 0
+        self.total_ms = 0.0
+        self.connections_held: Counter = Counter()   # pool name → currently checked out
+        self.peak_connections = 0                    # most held at once from a single pool
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        shape = normalize_statement(statement)
+        with self._lock:
+            self.count += 1
+            if _WRITE_RE.match(statement):
+                self.writes += 1
+            self.total_ms += elapsed_ms
+            self.shapes[shape] += 1
+
+    def connection_acquired(self, pool: str) -> None:
+        with self._lock:
+            self.connections_held[pool] += 1
+            self.peak_connections = max(self.peak_connections, self.connections_held[pool])
+
+    def connection_released(self, pool: str) -> None:
+        with self._lock:
+            self.connections_held[pool] -= 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Shapes executed at least `threshold` times, most frequent first."""
+        with self._lock:
+            return [(s, n) for s, n in self.shapes.most_common() if n >= threshold]
+
+    @property
+    def max_repeat(self) -> int:
+        with self._lock:
+            top = self.shapes.most_common(1)
+        return top[0][1] if top else 0
+
+    def summary(self, limit: int = 5) -> str:
+        """Human-readable top-N shapes, used in budget assertion messages."""
+        with self._lock:
+            top = self.shapes.most_common(limit)
+        lines = [f"{self.count} queries, {self.total_ms:.1f}ms total"]
+        lines += [f"  {n:>5}×  {s[:160]}" for s, n in top]
+        return "\n".join(lines)
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Explicit captures (tests, CLI jobs) see every query on every thread while active.
+_captures: List[QueryStats] = []
+_captures_lock = threading.Lock()
+
+
+def start_request_stats() -> QueryStats:
+    """Bind a fresh QueryStats to the current context and return it."""
+    stats = QueryStats()
+    _current.set(stats)
+    return stats
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def capture_queries():
+    """Collect every statement executed (on any thread) while the block runs."""
+    stats = QueryStats()
+    with _captures_lock:
+        _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        with _captures_lock:
+            _captures.remove(stats)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+    if _captures:
+        with _captures_lock:
+            active = list(_captures)
+        for cap in active:
+            cap.record(statement, elapsed_ms)
+
+
+def install_query_hooks(engine: Engine) -> None:
+    """Attach the timing listeners to `engine` (idempotent)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,211 @@
+"""
+Real-time push to connected clients — per-user pub/sub channels.
+
+The messaging pages used to re-poll the conversation list and the open
+conversation every few seconds to notice new messages, which was most of
+the API's request volume during school hours. Clients now hold one
+WebSocket (GET /api/v1/messages/ws) and the server pushes events to it.
+
+Each user has a channel keyed by user id. Writers call
+`publish_after_commit(db, user_id, event)`. Events are JSON-encoded once
+per recipient and handed to the broker only when `db` commits, so a
+rolled-back send never reaches anyone. Every connected socket owns a
+`Subscription`: a bounded queue drained by the socket's task.
+
+  * `InMemoryBroker` — the default. It delivers straight to this process's
+    sockets and is enough for a single uvicorn worker. Publishing is safe
+    from the sync routes' threadpool: delivery is scheduled onto the
+    socket's event loop.
+  * Multi-worker deployments need a shared bus, because a message sent on
+    worker A must reach a socket held by worker B. Subclass `Broker`,
+    implement `publish()` to send `(user_id, data)` to the bus, and have
+    `start()` run a listener that calls `deliver_local()` for everything
+    received. Point REALTIME_BROKER at it ("package.module:ClassName").
+
+A socket that falls REALTIME_QUEUE_SIZE events behind is closed with 1013
+rather than buffering without bound. Clients reconnect and re-fetch over
+HTTP, as they do after any disconnect.
+"""
+
+import abc
+import asyncio
+import importlib
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Set
+
+from fastapi import WebSocket, WebSocketDisconnect
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.serialization import dumps
+
+logger = logging.getLogger("connected.realtime")
+
+_PENDING = "realtime_events"
+_PING = '{"type":"ping"}'
+_READY = '{"type":"ready"}'
+WS_TRY_AGAIN_LATER = 1013
+
+
+class Subscription:
+    """One socket's inbox. `deliver()` may be called from any thread."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def _put(self, data: str) -> None:
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def deliver(self, data: str) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._put, data)
+        except RuntimeError:  # the socket's loop has shut down
+            pass
+
+
+class Broker(abc.ABC):
+    """Registry of this process's subscriptions plus the publish hook each backend implements."""
+
+    def __init__(self):
+        self._subs: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> Subscription:
+        """Register a subscription for `user_id`; call from the socket's event loop."""
+        sub = Subscription(asyncio.get_running_loop(), settings.REALTIME_QUEUE_SIZE)
+        with self._lock:
+            self._subs[user_id].add(sub)
+        return sub
+
+    def unsubscribe(self, user_id: int, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(user_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[user_id]
+
+    def deliver_local(self, user_id: int, data: str) -> None:
+        """Hand `data` to every socket `user_id` has open in this process."""
+        with self._lock:
+            subs = list(self._subs.get(user_id, ()))
+        for sub in subs:
+            sub.deliver(data)
+
+    def connections(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subs.values())
+
+    @abc.abstractmethod
+    def publish(self, user_id: int, data: str) -> None:
+        """Send `data` to every socket `user_id` has open, in any process."""
+
+    async def start(self) -> None:
+        """Connect to the shared bus / start its listener (no-op for in-process brokers)."""
+
+    async def stop(self) -> None:
+        """Counterpart of `start()`."""
+
+
+class InMemoryBroker(Broker):
+    """Single-process broker: publishing is local delivery."""
+
+    def publish(self, user_id: int, data: str) -> None:
+        self.deliver_local(user_id, data)
+
+
+def _load_broker(spec: str) -> Broker:
+    if spec in ("", "memory"):
+        return InMemoryBroker()
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)()
+
+
+broker = _load_broker(settings.REALTIME_BROKER)
+
+
+# Publishing
+
+def publish_after_commit(db: Session, user_id: int, payload: Dict[str, Any]) -> None:
+    """Queue `payload` for `user_id`'s sockets; sent when `db` commits, dropped on rollback."""
+    db.info.setdefault(_PENDING, []).append((user_id, dumps(payload).decode("utf-8")))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for user_id, data in session.info.pop(_PENDING, ()):
+        try:
+            broker.publish(user_id, data)
+        except Exception:
+            logger.exception("Real-time publish to user %s failed", user_id)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_pending(session: Session, transaction) -> None:
+    # Runs after after_commit, so anything left was rolled back or closed unsent.
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+
+# Serving a socket
+
+async def receive_token(websocket: WebSocket) -> str:
+    """
+    The access token from an accepted socket's first frame,
+    {"type": "auth", "token": "<jwt>"}. Empty when the frame is missing,
+    malformed or doesn't arrive within REALTIME_AUTH_TIMEOUT_SECONDS.
+    Tokens travel in a frame rather than the URL so they stay out of access
+    logs.
+    """
+    try:
+        frame = await asyncio.wait_for(websocket.receive_json(), settings.REALTIME_AUTH_TIMEOUT_SECONDS)
+    except (asyncio.TimeoutError, WebSocketDisconnect, ValueError, KeyError):
+        return ""
+    if not isinstance(frame, dict) or frame.get("type") != "auth" or not isinstance(frame.get("token"), str):
+        return ""
+    return frame["token"]
+
+
+async def _pump(websocket: WebSocket, sub: Subscription) -> None:
+    while True:
+        try:
+            data = await asyncio.wait_for(sub.queue.get(), settings.REALTIME_HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+            data = _PING
+        if sub.overflowed:
+            logger.warning("Closing a real-time socket that fell %d events behind", sub.queue.maxsize)
+            await websocket.close(code=WS_TRY_AGAIN_LATER)
+            return
+        await websocket.send_text(data)
+
+
+async def _listen(websocket: WebSocket) -> None:
+    # Client frames (keep-alives) are ignored; this only notices the disconnect.
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+async def serve(websocket: WebSocket, user_id: int) -> None:
+    """
+    Push `user_id`'s events to an accepted socket until either side closes
+    it. Sends {"type": "ready"} once subscribed; nothing is missed after it.
+    """
+    sub = broker.subscribe(user_id)
+    tasks = []
+    try:
+        await websocket.send_text(_READY)
+        tasks = [asyncio.create_task(_pump(websocket, sub)), asyncio.create_task(_listen(websocket))]
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        broker.unsubscribe(user_id, sub)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,160 @@
+"""
+In-process cache of rendered JSON responses with strong ETags.
+
+Timetables and the subject / class catalogue change a few times per term
+but are fetched on every dashboard load. Handlers for those reads store
+the encoded body here under a request key (route + caller + query) along
+with the version *scopes* it depends on, e.g. `timetable:class:4` or
+`timetable:teacher:12`. Writers call `response_cache.bump(scope, ...)`
+after they commit, which invalidates every body built from that scope.
+
+A request whose If-None-Match equals the cached ETag gets a bodyless 304;
+any other hit is served from memory. With the principal cache warm and a
+lazily-connecting session, neither path touches the database.
+
+The ETag is a hash of the body itself, so it stays correct across worker
+processes and restarts. Version counters are per process: another worker
+sees a change immediately if its entry was never built, otherwise within
+RESPONSE_CACHE_TTL_SECONDS.
+"""
+
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.serialization import dumps
+
+# Catalogue scopes shared by the admin routes and the CSV importer
+SUBJECTS_SCOPE = "catalog:subjects"
+CLASSES_SCOPE = "catalog:classes"     # names, head teachers, student / subject counts
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    etag: str
+    body: bytes
+    scopes: Tuple[str, ...]
+    generation: int       # cache generation when the data was read
+    expires_at: float
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class ResponseCache:
+    """Thread-safe TTL + LRU map of request key → CachedBody, validated against scope versions."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self._versions: Dict[str, int] = {}   # scope → generation of its last bump
+        self._counter = itertools.count(1)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.bumps = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def generation(self) -> int:
+        """Take this before reading the data a body will be built from."""
+        with self._lock:
+            return self._generation
+
+    def _is_current(self, scopes: Iterable[str], generation: int) -> bool:
+        return all(self._versions.get(s, 0) <= generation for s in scopes)
+
+    def get(self, key: str) -> Optional[CachedBody]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item.expires_at <= now or not self._is_current(item.scopes, item.generation):
+                if item is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item
+
+    def put(self, key: str, scopes: Iterable[str], content, generation: int) -> CachedBody:
+        """
+        Encode `content` (response models or plain data) and store it,
+        unless one of `scopes` was bumped after `generation` (the data may
+        already be stale — it is returned but not cached).
+        """
+        body = dumps(jsonable_encoder(content))
+        item = CachedBody(
+            etag='"%s"' % hashlib.sha256(body).hexdigest()[:32],
+            body=body,
+            scopes=tuple(scopes),
+            generation=generation,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        if not self.enabled:
+            return item
+        with self._lock:
+            if self._is_current(item.scopes, generation):
+                self._entries[key] = item
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return item
+
+    def bump(self, *scopes: str) -> None:
+        """Invalidate every body that depends on any of `scopes`. Call after commit."""
+        with self._lock:
+            self._generation = next(self._counter)
+            for scope in scopes:
+                self._versions[scope] = self._generation
+            self.bumps += 1
+
+    def respond(self, request: Request, item: CachedBody) -> Response:
+        """304 when the client already holds this body, else the body itself."""
+        headers = {"ETag": item.etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+        if _etag_matches(request.headers.get("if-none-match"), item.etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=item.body, media_type="application/json", headers=headers)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "not_modified": self.not_modified,
+                "bumps": self.bumps,
+                "scopes": len(self._versions),
+            }
+
+
+response_cache = ResponseCache(
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+)
@@ -3,27 +3,57 @@ Password hashing and JWT token utilities.
 
 All authentication logic that touches secrets lives here so the
 rest of the app never needs to import bcrypt or jose directly.
+
+bcrypt runs on a dedicated bounded pool (app/core/bcrypt_pool.py) rather
+than FastAPI's shared threadpool. Async routes should prefer the
+`*_async` helpers so they hold no worker thread while queued.
 """
 
+import os
 from datetime import datetime, timedelta
 from typing import Optional
 
 import bcrypt
 from jose import JWTError, jwt
 
+from app.core.bcrypt_pool import BcryptPool
 from app.core.config import settings
 
+BCRYPT_ROUNDS = 12
+
+bcrypt_pool = BcryptPool(
+    max_workers=settings.BCRYPT_MAX_CONCURRENCY or max(1, (os.cpu_count() or 2) // 2)
+)
+
 
 # Password helpers
 
+def _hashpw(plain: str) -> str:
+    return bcrypt.hashpw(plain.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+
+def _checkpw(plain: str, hashed: str) -> bool:
+    return bcrypt.checkpw(plain.encode(), hashed.encode())
+
+
 def hash_password(plain: str) -> str:
     """Hash a plain-text password using bcrypt (cost factor 12)."""
-    return bcrypt.hashpw(plain.encode(), bcrypt.gensalt(rounds=12)).decode()
+    return bcrypt_pool.call(_hashpw, plain)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
     """Return True if the plain password matches the stored bcrypt hash."""
-    return bcrypt.checkpw(plain.encode(), hashed.encode())
+    return bcrypt_pool.call(_checkpw, plain, hashed)
+
+
+async def hash_password_async(plain: str) -> str:
+    """Awaitable hash_password — queues on the bcrypt pool, not the event loop."""
+    return await bcrypt_pool.run(_hashpw, plain)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """Awaitable verify_password — queues on the bcrypt pool, not the event loop."""
+    return await bcrypt_pool.run(_checkpw, plain, hashed)
 
 
 # JWT helpers
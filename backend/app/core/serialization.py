@@ -0,0 +1,73 @@
+"""
+Fast JSON path for large list responses.
+
+FastAPI normally validates a handler's return value against its
+`response_model`, runs `jsonable_encoder` over the result and encodes it
+with the stdlib `json`. For list endpoints that already shape thousands of
+plain dicts, that second validation pass costs more than the query.
+
+`trusted(rows)` returns a FastJSONResponse that skips both steps. The rows
+must already match the route's response_model and hold only JSON-native
+values (str/int/float/bool/None, lists, dicts, date/datetime, enums).
+Keep `response_model=` on the route for the OpenAPI schema. When
+TRUSTED_RESPONSES_VALIDATE is on (dev / CI), each trusted body is still
+checked against the model passed in, so shape drift fails loudly.
+
+orjson is optional; without it the stdlib encoder is used with the same
+compact output.
+"""
+
+import json
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _default(obj: Any):
+    """Types orjson doesn't encode natively."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return jsonable_encoder(obj)
+
+
+def dumps(content: Any) -> bytes:
+    """Encode `content` as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=64)
+def _adapter(model) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def trusted(content: Any, model: Optional[Any] = None, status_code: int = 200, headers: Optional[dict] = None) -> FastJSONResponse:
+    """
+    Return pre-shaped `content` without response_model validation.
+    `model` (e.g. List[AdminUserRead]) is only used when
+    TRUSTED_RESPONSES_VALIDATE is enabled.
+    """
+    if model is not None and settings.TRUSTED_RESPONSES_VALIDATE:
+        _adapter(model).validate_python(content)
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
@@ -0,0 +1,64 @@
+"""
+Dialect-aware INSERT … ON DUPLICATE KEY UPDATE.
+
+MySQL spells an upsert `ON DUPLICATE KEY UPDATE col = <expr>` and refers
+to the incoming row as `VALUES(col)`; SQLite (local dev, tests) spells it
+`ON CONFLICT (key) DO UPDATE SET col = <expr>` with `excluded.col`.
+`upsert()` builds either from one description of the update, so callers
+write the SET clause once:
+
+    stmt = upsert(table, db.get_bind().dialect.name, ["student_id"],
+                  lambda cur, new: {"present_count": cur.present_count + new.present_count})
+    db.execute(stmt, rows)   # executemany: one round trip for all rows
+"""
+
+from typing import Callable, Dict, Sequence
+
+from sqlalchemy import Table, func
+from sqlalchemy.dialects import mysql, sqlite
+
+
+def upsert(
+    table: Table,
+    dialect: str,
+    key: Sequence[str],
+    set_: Callable[[object, object], Dict[str, object]],
+):
+    """
+    INSERT into `table`; on a clash of the unique `key` columns apply
+    `set_(current, incoming)` instead, where both are column collections
+    (`current.x` is the stored value, `incoming.x` the value being inserted).
+    """
+    if dialect == "mysql":
+        stmt = mysql.insert(table)
+        return stmt.on_duplicate_key_update(**set_(table.c, stmt.inserted))
+    if dialect == "sqlite":
+        stmt = sqlite.insert(table)
+        return stmt.on_conflict_do_update(index_elements=list(key), set_=set_(table.c, stmt.excluded))
+    raise NotImplementedError(f"upsert() does not support the {dialect!r} dialect")
+
+
+def insert_missing(table: Table, dialect: str, key: Sequence[str]):
+    """
+    INSERT into `table`, skipping rows that clash on the unique `key`
+    columns. Skipped rows don't count toward the result's rowcount (a no-op
+    upsert's do), so it is the number of rows this statement added. On
+    MySQL this is INSERT IGNORE, which also downgrades other row errors to
+    warnings — only use it for rows the caller built itself.
+    """
+    if dialect == "mysql":
+        return mysql.insert(table).prefix_with("IGNORE")
+    if dialect == "sqlite":
+        return sqlite.insert(table).on_conflict_do_nothing(index_elements=list(key))
+    raise NotImplementedError(f"insert_missing() does not support the {dialect!r} dialect")
+
+
+def add_counts(columns: Sequence[str]) -> Callable[[object, object], Dict[str, object]]:
+    """SET clause that adds the incoming value of each of `columns` to the stored one."""
+    return lambda cur, new: {c: cur[c] + new[c] for c in columns}
+
+
+def later(dialect: str, a, b):
+    """The greater of two nullable values — NULL only if both are."""
+    pick = func.greatest if dialect == "mysql" else func.max
+    return pick(func.coalesce(a, b), func.coalesce(b, a))
@@ -13,7 +13,12 @@ from fastapi.staticfiles import StaticFiles
 
 from app.api import auth, users, students, teachers, parents, admin, admin_extensions, homework, assignments, messages, whatsapp, transcript_to_notes, ai_tutor
 from app.api import video, consent
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.database import note_write
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.query_stats import start_request_stats
+from app.core.realtime import broker
 from app.services.ai.transcription_service import prewarm_mms
 
 logging.basicConfig(
@@ -35,19 +40,55 @@ async def startup_event():
     """Pre-warm the MMS Creole model in a background thread at server start.
     Eliminates the 30-120 s cold-start delay on the first Creole transcription."""
     prewarm_mms()
+    await broker.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await broker.stop()
+
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     start = time.perf_counter()
+    stats = start_request_stats()
     response = await call_next(request)
     ms = (time.perf_counter() - start) * 1000
+    if stats.writes:
+        note_write(request.headers.get("authorization"))
+    repeated = stats.repeated(settings.DB_REPEATED_QUERY_THRESHOLD)
     logger.info(
-        "[%s] %s - %d  (%.0fms)",
+        "[%s] %s - %d  (%.0fms)  queries=%d db=%.0fms",
         request.method,
         request.url.path,
         response.status_code,
         ms,
+        stats.count,
+        stats.total_ms,
+        extra={
+            "http_method": request.method,
+            "http_path": request.url.path,
+            "http_status": response.status_code,
+            "duration_ms": round(ms, 1),
+            "db_queries": stats.count,
+            "db_time_ms": round(stats.total_ms, 1),
+            "db_max_repeat": stats.max_repeat,
+        },
     )
+    if stats.peak_connections > 1:
+        logger.warning(
+            "[%s] %s held %d DB connections at once — nested SessionLocal()?",
+            request.method, request.url.path, stats.peak_connections,
+        )
+    for shape, n in repeated[:3]:
+        logger.warning(
+            "Possible N+1 on [%s] %s — %d× %s",
+            request.method, request.url.path, n, shape[:200],
+        )
+    if settings.DB_QUERY_STATS_HEADERS:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.total_ms:.1f}"
+        response.headers["X-DB-Max-Repeat"] = str(stats.max_repeat)
     return response
 
 
@@ -72,6 +113,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
+)
+
+# gzip / brotli for large bodies
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES,
+    use_brotli=settings.RESPONSE_COMPRESSION_BROTLI,
 )
 
 # Register routers
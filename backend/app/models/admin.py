@@ -13,6 +13,9 @@ Tables (in migration order):
     teacher_profiles  — extends User for teachers (staff_id, bio, etc.)
     parent_students   — M:M parent ↔ student with relationship_type
     teacher_subjects  — M:M teacher ↔ subject
+
+  17_id_sequences.sql:
+    id_sequences      — block-allocated counters for student codes / staff IDs
 """
 
 from sqlalchemy import (
@@ -82,6 +85,14 @@ class TeacherProfile(Base):
     user = relationship("User", foreign_keys=[user_id])
 
 
+class IdSequence(Base):
+    """Named counter; app/services/id_allocator.py reserves ranges from it."""
+    __tablename__ = "id_sequences"
+
+    name       = Column(String(50), primary_key=True)   # "student_code" | "staff_id"
+    next_value = Column(Integer, nullable=False, default=1)
+
+
 class ParentStudent(Base):
     """Many-to-many: parent user ↔ student user."""
     __tablename__ = "parent_students"
@@ -23,6 +23,21 @@ Tables (in migration order):
     attendance_sessions      — one row per class occurrence (snapshot pattern)
     session_attendance_records — per-student status within a session
 
+  18_attendance_rollups.sql:
+    attendance_student_rollups — per-student marked-status totals + indexed rate
+
+  19_attendance_daily_facts.sql:
+    attendance_daily_facts   — closed-session status counts per day/class/subject/teacher
+
+  20_fee_ledger.sql:
+    fee_plans                — + amount_paid, balance (generated), next_due_date
+
+  21_fee_notification_dedupe.sql:
+    fee_notification_events  — + installment_id, dedupe_key (unique)
+
+  22_message_unread_counts.sql:
+    conversation_participants — + unread_count
+
   11_homework.sql:
     homework                 — teacher-created homework items
     homework_attachments     — file attachments per homework
@@ -44,7 +59,7 @@ import enum
 
 from sqlalchemy import (
     Column, Integer, String, Date, DateTime, Time, Text,
-    Enum, ForeignKey, DECIMAL, UniqueConstraint, func, Boolean, JSON, Float
+    Enum, ForeignKey, DECIMAL, UniqueConstraint, func, Boolean, JSON, Float, Computed, Index
 )
 from sqlalchemy.orm import relationship
 
@@ -107,6 +122,7 @@ class AcademicPeriod(Base):
 
 
 class FeePlan(Base):
+    """Per-student fee plan; amount_paid / balance / next_due_date are the ledger (app/services/fee_ledger.py)."""
     __tablename__ = "fee_plans"
 
     id                 = Column(Integer, primary_key=True, index=True)
@@ -116,6 +132,9 @@ class FeePlan(Base):
     base_amount        = Column(DECIMAL(10, 2), nullable=False)
     discount_amount    = Column(DECIMAL(10, 2), nullable=False, default=0)
     due_date           = Column(Date, nullable=False)
+    amount_paid        = Column(DECIMAL(10, 2), nullable=False, default=0)
+    balance            = Column(DECIMAL(10, 2), Computed("total_amount - amount_paid", persisted=True))
+    next_due_date      = Column(Date, nullable=True, index=True)
     created_at         = Column(DateTime, server_default=func.now())
     updated_at         = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
@@ -153,12 +172,14 @@ class FeeInstallment(Base):
 class FeeNotificationEvent(Base):
     __tablename__ = "fee_notification_events"
 
-    id           = Column(Integer, primary_key=True, index=True)
-    type         = Column(Enum(NotificationTypeEnum, values_callable=lambda x: [e.value for e in x]), nullable=False)
-    student_id   = Column(Integer, ForeignKey("student_profiles.id"), nullable=False)
-    fee_plan_id  = Column(Integer, ForeignKey("fee_plans.id"), nullable=True)
-    trigger_date = Column(Date, nullable=False)
-    created_at   = Column(DateTime, server_default=func.now())
+    id             = Column(Integer, primary_key=True, index=True)
+    type           = Column(Enum(NotificationTypeEnum, values_callable=lambda x: [e.value for e in x]), nullable=False)
+    student_id     = Column(Integer, ForeignKey("student_profiles.id"), nullable=False)
+    fee_plan_id    = Column(Integer, ForeignKey("fee_plans.id"), nullable=True)
+    installment_id = Column(Integer, ForeignKey("fee_installments.id", ondelete="CASCADE"), nullable=True)
+    trigger_date   = Column(Date, nullable=False)
+    dedupe_key     = Column(String(80), unique=True, nullable=True)   # app/services/fee_notifications.py
+    created_at     = Column(DateTime, server_default=func.now())
 
     student  = relationship("StudentProfile", foreign_keys=[student_id])
     fee_plan = relationship("FeePlan", foreign_keys=[fee_plan_id])
@@ -293,6 +314,51 @@ class SessionAttendanceRecord(Base):
     marker  = relationship("User", foreign_keys=[marked_by])
 
 
+_ROLLUP_TOTAL = "present_count + absent_count + late_count + excused_count"
+
+
+class AttendanceStudentRollup(Base):
+    """Running totals of a student's marked session attendance (app/services/attendance_rollups.py)."""
+    __tablename__ = "attendance_student_rollups"
+
+    student_id       = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    present_count    = Column(Integer, nullable=False, default=0)
+    absent_count     = Column(Integer, nullable=False, default=0)
+    late_count       = Column(Integer, nullable=False, default=0)
+    excused_count    = Column(Integer, nullable=False, default=0)
+    last_marked_date = Column(Date, nullable=True)
+    attendance_rate  = Column(
+        DECIMAL(5, 1),
+        Computed(
+            f"CASE WHEN {_ROLLUP_TOTAL} = 0 THEN 100.0 "
+            f"ELSE ROUND((present_count + late_count) * 100.0 / ({_ROLLUP_TOTAL}), 1) END",
+            persisted=True,
+        ),
+        index=True,
+    )
+    updated_at       = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class AttendanceDailyFact(Base):
+    """Status counts of closed sessions per day / class / subject / teacher (app/services/attendance_facts.py)."""
+    __tablename__ = "attendance_daily_facts"
+
+    session_date  = Column(Date, primary_key=True)
+    class_id      = Column(Integer, ForeignKey("classes.id", ondelete="CASCADE"), primary_key=True)
+    subject_id    = Column(Integer, ForeignKey("subjects.id", ondelete="CASCADE"), primary_key=True)
+    teacher_id    = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    present_count = Column(Integer, nullable=False, default=0)
+    absent_count  = Column(Integer, nullable=False, default=0)
+    late_count    = Column(Integer, nullable=False, default=0)
+    excused_count = Column(Integer, nullable=False, default=0)
+    updated_at    = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("idx_fact_class_date", "class_id", "session_date"),
+        Index("idx_fact_teacher_date", "teacher_id", "session_date"),
+    )
+
+
 # Homework
 
 class HomeworkStatusEnum(str, enum.Enum):
@@ -517,6 +583,7 @@ class ConversationParticipant(Base):
     conversation_id = Column(Integer, ForeignKey("conversations.id"), primary_key=True)
     user_id         = Column(Integer, ForeignKey("users.id"), primary_key=True)
     last_read_at    = Column(DateTime, nullable=True)
+    unread_count    = Column(Integer, nullable=False, default=0)
     joined_at       = Column(DateTime, server_default=func.now())
     is_active       = Column(Boolean, default=True)
 
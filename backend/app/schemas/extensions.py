@@ -66,6 +66,14 @@ class ClasswiseAttendance(BaseModel):
     rate: float
 
 
+class AttendanceDashboard(BaseModel):
+    range: str
+    stats: AttendanceStats
+    trend: List[AttendanceTrendPoint]
+    distribution: AttendanceDistribution
+    classwise: List[ClasswiseAttendance]
+
+
 class ChronicAbsentee(BaseModel):
     student_id: int
     student_name: str
@@ -551,6 +559,10 @@ class ConversationRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class UnreadCountRead(BaseModel):
+    unread_count: int
+
+
 class ConversationDetail(BaseModel):
     id: int
     type: str
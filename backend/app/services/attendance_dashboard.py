@@ -0,0 +1,148 @@
+"""
+Aggregates behind the admin attendance overview.
+
+The page shows headline stats (today, the selected range and its change
+against the previous equal period), a per-day trend, the status
+distribution and per-class rates. They used to come from four endpoints
+that each resolved the range again and fetched session-id lists into
+Python for `IN (...)` counts. `build_dashboard` computes all of them in two
+statements over attendance_facts.daily_counts() (daily fact rows before
+today, raw records for today):
+
+  1. one row of conditional sums over [previous start, today] — today,
+     range and previous-range counts plus the student total;
+  2. one UNION ALL of the range grouped by day and grouped by class.
+
+Results are shared by every admin for ATTENDANCE_DASHBOARD_TTL_SECONDS
+(keyed by range and today's date). Teacher mark / close routes call
+`invalidate()` after commit so this worker reflects them immediately;
+other workers catch up within the TTL.
+"""
+
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import case, func, literal, null, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.admin import Class, StudentProfile
+from app.services.attendance_facts import as_date, daily_counts, totals as fact_totals
+
+RANGES = ("Today", "This Week", "This Month", "This Term")
+
+_cache: Dict[Tuple[str, date], Tuple[float, dict]] = {}
+_lock = threading.Lock()
+
+
+def range_start(date_range: str, today: date) -> date:
+    """First day of a named range; unknown names mean This Week."""
+    if date_range == "Today":
+        return today
+    if date_range == "This Month":
+        return today.replace(day=1)
+    if date_range == "This Term":
+        return today.replace(month=1, day=1)
+    return today - timedelta(days=today.weekday())
+
+
+def _rate(attended, total) -> float:
+    return round((attended / total * 100), 1) if total else 0.0
+
+
+def _sum_if(condition, value):
+    return func.coalesce(func.sum(case((condition, value), else_=0)), 0)
+
+
+def _compute(db: Session, date_range: str, today: date) -> dict:
+    start = range_start(date_range, today)
+    prev_end = start - timedelta(days=1)
+    prev_start = prev_end - timedelta(days=(today - start).days)
+    daily = daily_counts(prev_start, today, today)
+    day, c = daily.c.session_date, daily.c
+    marked, attended = fact_totals(daily)
+    in_range = day >= start
+
+    totals = db.execute(
+        select(
+            select(func.count(StudentProfile.id)).scalar_subquery().label("total_students"),
+            _sum_if(day == today, c.present_count).label("present_today"),
+            _sum_if(day == today, c.absent_count).label("absent_today"),
+            _sum_if(day == today, c.late_count).label("late_today"),
+            _sum_if(in_range, marked).label("range_total"),
+            _sum_if(in_range, attended).label("range_attended"),
+            _sum_if(in_range, c.present_count).label("range_present"),
+            _sum_if(in_range, c.absent_count).label("range_absent"),
+            _sum_if(in_range, c.late_count).label("range_late"),
+            _sum_if(day < start, marked).label("prev_total"),
+            _sum_if(day < start, attended).label("prev_attended"),
+        ).select_from(daily)
+    ).one()
+
+    by_day = (
+        select(literal("day").label("kind"), day.label("day"), null().label("class_name"),
+               func.sum(marked).label("total"), func.sum(attended).label("attended"))
+        .where(in_range)
+        .group_by(day)
+    )
+    by_class = (
+        select(literal("class").label("kind"), null().label("day"), Class.name.label("class_name"),
+               func.sum(marked).label("total"), func.sum(attended).label("attended"))
+        .select_from(daily)
+        .join(Class, Class.id == c.class_id)
+        .where(in_range)
+        .group_by(Class.id, Class.name)
+    )
+    breakdown = db.execute(union_all(by_day, by_class)).all()
+    days = sorted((r for r in breakdown if r.kind == "day"), key=lambda r: r.day)
+    classes = sorted((r for r in breakdown if r.kind == "class"), key=lambda r: r.class_name)
+
+    overall_rate = _rate(totals.range_attended, totals.range_total)
+    prev_rate = (totals.prev_attended / totals.prev_total * 100) if totals.prev_total else 0.0
+    return {
+        "range": date_range,
+        "stats": {
+            "total_students": totals.total_students or 0,
+            "present_today":  int(totals.present_today),
+            "absent_today":   int(totals.absent_today),
+            "late_today":     int(totals.late_today),
+            "overall_rate":   overall_rate,
+            "trend_pct":      round(overall_rate - prev_rate, 1),
+        },
+        "trend": [{"date": as_date(r.day).strftime("%b %d"), "rate": _rate(r.attended, r.total)} for r in days],
+        "distribution": {
+            "present": int(totals.range_present),
+            "absent":  int(totals.range_absent),
+            "late":    int(totals.range_late),
+        },
+        "classwise": [{"class_name": r.class_name, "rate": _rate(r.attended, r.total)} for r in classes],
+    }
+
+
+def build_dashboard(db: Session, date_range: str, today: Optional[date] = None) -> dict:
+    """The whole overview for `date_range`, as plain data matching AttendanceDashboard."""
+    today = today or date.today()
+    if date_range not in RANGES:
+        date_range = "This Week"
+    key = (date_range, today)
+    ttl = settings.ATTENDANCE_DASHBOARD_TTL_SECONDS
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+    data = _compute(db, date_range, today)
+    if ttl > 0:
+        with _lock:
+            _cache[key] = (now + ttl, data)
+            for stale in [k for k, (expires, _) in _cache.items() if expires <= now]:
+                del _cache[stale]
+    return data
+
+
+def invalidate() -> None:
+    """Drop cached dashboards in this worker. Call after committing attendance changes."""
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,157 @@
+"""
+Daily attendance facts — attendance_daily_facts.
+
+Term-range reports used to re-aggregate every session_attendance_record
+(joined through timetable_entries) on each request. This table holds one
+row per (day, class, subject, teacher) with the status counts of that
+day's closed sessions. teacher_close_session adds a session's counts in
+the same transaction that closes it; closed sessions can't be re-marked,
+so a row only changes when another session for the same key closes.
+
+Readers call `daily_counts(start, end)`: facts for the days before today,
+plus today's raw records grouped the same way (sessions still open today
+count too). Sessions left open on an earlier day are not in the
+facts until they are closed.
+
+Sessions removed by cascade and hand edits are not tracked; rebuild all
+days or a window from the records when needed:
+
+    cd backend && python -m app.services.attendance_facts rebuild [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+"""
+
+import argparse
+import logging
+import time
+from datetime import date, timedelta
+from typing import Optional, Sequence
+
+from sqlalchemy import case, delete, func, insert, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.upsert import add_counts, upsert
+from app.models.admin import TimetableEntry
+from app.models.extensions import (
+    AttendanceDailyFact, AttendanceSession, SessionAttendanceRecord, SessionStatusEnum,
+)
+from app.services.attendance_rollups import COUNT_COLUMNS
+
+logger = logging.getLogger("connected.attendance")
+
+_facts = AttendanceDailyFact.__table__
+KEY = ["session_date", "class_id", "subject_id", "teacher_id"]
+
+
+def record_closed_session(db: Session, session: AttendanceSession, entry: TimetableEntry) -> None:
+    """Add a just-closed session's counts to its fact row. Runs in `db`'s transaction; caller commits."""
+    counts = {c: 0 for c in COUNT_COLUMNS.values()}
+    for rec in session.records:
+        if rec.status is not None:
+            counts[COUNT_COLUMNS[rec.status]] += 1
+    if not any(counts.values()):
+        return
+    row = {
+        "session_date": session.session_date,
+        "class_id":     entry.class_id,
+        "subject_id":   entry.subject_id,
+        "teacher_id":   session.created_by,
+        **counts,
+    }
+    stmt = upsert(_facts, db.get_bind().dialect.name, KEY, add_counts(list(COUNT_COLUMNS.values())))
+    db.execute(stmt, [row])
+
+
+def _raw_counts(*conditions):
+    """Records grouped into fact rows, computed from session_attendance_records."""
+    SAR = SessionAttendanceRecord
+    return (
+        select(
+            AttendanceSession.session_date.label("session_date"),
+            TimetableEntry.class_id.label("class_id"),
+            TimetableEntry.subject_id.label("subject_id"),
+            AttendanceSession.created_by.label("teacher_id"),
+            *[
+                func.coalesce(func.sum(case((SAR.status == status, 1), else_=0)), 0).label(column)
+                for status, column in COUNT_COLUMNS.items()
+            ],
+        )
+        .select_from(SAR)
+        .join(AttendanceSession, AttendanceSession.id == SAR.attendance_session_id)
+        .join(TimetableEntry, TimetableEntry.id == AttendanceSession.timetable_entry_id)
+        .where(SAR.status.isnot(None), *conditions)
+        .group_by(
+            AttendanceSession.session_date, TimetableEntry.class_id,
+            TimetableEntry.subject_id, AttendanceSession.created_by,
+        )
+    )
+
+
+def daily_counts(start: date, end: date, today: Optional[date] = None):
+    """
+    CTE of fact rows for [start, end] — columns session_date, class_id,
+    subject_id, teacher_id and one *_count per status. Days before today
+    come from the facts table, today from the raw records.
+    """
+    today = today or date.today()
+    F = AttendanceDailyFact
+    facts = select(
+        F.session_date, F.class_id, F.subject_id, F.teacher_id,
+        *[F.__table__.c[c] for c in COUNT_COLUMNS.values()],
+    ).where(F.session_date.between(start, min(end, today - timedelta(days=1))))
+    if start <= today <= end:
+        return union_all(facts, _raw_counts(AttendanceSession.session_date == today)).cte("daily_counts")
+    return facts.cte("daily_counts")
+
+
+def as_date(value) -> date:
+    """A session_date read back through daily_counts(); the UNION drops the DATE type on SQLite."""
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def totals(daily):
+    """(marked, attended) column expressions over a daily_counts() CTE."""
+    c = daily.c
+    return (
+        c.present_count + c.absent_count + c.late_count + c.excused_count,
+        c.present_count + c.late_count,
+    )
+
+
+def rebuild(db: Session, date_from: Optional[date] = None, date_to: Optional[date] = None) -> int:
+    """Recompute fact rows from closed sessions (all days, or the given window). Commits."""
+    in_window, fact_in_window = [AttendanceSession.status == SessionStatusEnum.CLOSED], []
+    if date_from:
+        in_window.append(AttendanceSession.session_date >= date_from)
+        fact_in_window.append(_facts.c.session_date >= date_from)
+    if date_to:
+        in_window.append(AttendanceSession.session_date <= date_to)
+        fact_in_window.append(_facts.c.session_date <= date_to)
+
+    db.execute(delete(_facts).where(*fact_in_window))
+    result = db.execute(insert(_facts).from_select([*KEY, *COUNT_COLUMNS.values()], _raw_counts(*in_window)))
+    db.commit()
+    logger.info("Rebuilt %d attendance fact row(s)", result.rowcount)
+    return result.rowcount
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain attendance_daily_facts")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmd = sub.add_parser("rebuild", help="Recompute fact rows from closed attendance sessions")
+    cmd.add_argument("--from", dest="date_from", type=date.fromisoformat, help="First day (YYYY-MM-DD)")
+    cmd.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Last day (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    from app.core.database import SessionLocal
+    import app.models  # noqa: F401 — register every mapper before querying
+
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        n = rebuild(db, args.date_from, args.date_to)
+    finally:
+        db.close()
+    print(f"Rebuilt {n} attendance fact row(s) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Per-student attendance rollups — attendance_student_rollups.
+
+Admin reports used to compute a student's rate with two COUNT queries
+over session_attendance_records, once per student. The teacher routes
+that change a record's status (mark, close session) now fold each
+transition into the student's rollup row with one upsert per request,
+inside the same transaction as the records, so the totals can't drift
+from a committed mark. `attendance_rate` is a stored generated column
+with an index, so "everyone below 85 %" is a single range scan.
+
+Sessions deleted through a cascade (e.g. a timetable entry removed) and
+hand edits are not tracked; rebuild from the records when needed:
+
+    cd backend && python -m app.services.attendance_rollups rebuild [--student USER_ID ...]
+"""
+
+import argparse
+import logging
+import time
+from datetime import date
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.upsert import add_counts, later, upsert
+
+from app.models.extensions import (
+    AttendanceSession, AttendanceStudentRollup, SessionAttendanceRecord, SessionAttendanceStatusEnum,
+)
+
+logger = logging.getLogger("connected.attendance")
+
+_rollups = AttendanceStudentRollup.__table__
+
+COUNT_COLUMNS = {
+    SessionAttendanceStatusEnum.PRESENT: "present_count",
+    SessionAttendanceStatusEnum.ABSENT:  "absent_count",
+    SessionAttendanceStatusEnum.LATE:    "late_count",
+    SessionAttendanceStatusEnum.EXCUSED: "excused_count",
+}
+
+# (student user id, status before, status after, session date)
+StatusChange = Tuple[int, Optional[SessionAttendanceStatusEnum], Optional[SessionAttendanceStatusEnum], date]
+
+
+def _increment_upsert(dialect: str):
+    """INSERT … that adds the given counts to an existing row instead of failing."""
+    add = add_counts(list(COUNT_COLUMNS.values()))
+    return upsert(_rollups, dialect, ["student_id"], lambda cur, new: {
+        **add(cur, new),
+        "last_marked_date": later(dialect, cur.last_marked_date, new.last_marked_date),
+    })
+
+
+def apply_changes(db: Session, changes: Iterable[StatusChange]) -> int:
+    """
+    Fold status transitions into the rollups. Runs in `db`'s transaction —
+    call before the caller's commit. Returns the number of students touched.
+    """
+    deltas: Dict[int, dict] = {}
+    for student_id, old, new, day in changes:
+        if old == new:
+            continue
+        row = deltas.setdefault(
+            student_id,
+            {"student_id": student_id, "last_marked_date": None, **{c: 0 for c in COUNT_COLUMNS.values()}},
+        )
+        if old is not None:
+            row[COUNT_COLUMNS[old]] -= 1
+        if new is not None:
+            row[COUNT_COLUMNS[new]] += 1
+            if row["last_marked_date"] is None or day > row["last_marked_date"]:
+                row["last_marked_date"] = day
+    if deltas:
+        db.execute(_increment_upsert(db.get_bind().dialect.name), list(deltas.values()))
+    return len(deltas)
+
+
+def rates_for(db: Session, user_ids: Iterable[int]) -> Dict[int, float]:
+    """Attendance rate (%) per student user id; students with nothing marked get 100.0."""
+    ids = set(user_ids)
+    if not ids:
+        return {}
+    found = dict(
+        db.query(AttendanceStudentRollup.student_id, AttendanceStudentRollup.attendance_rate)
+        .filter(AttendanceStudentRollup.student_id.in_(ids))
+        .all()
+    )
+    return {uid: float(found[uid]) if found.get(uid) is not None else 100.0 for uid in ids}
+
+
+def rebuild(db: Session, student_ids: Optional[Sequence[int]] = None) -> int:
+    """Recompute rollups from session_attendance_records (all students, or just `student_ids`). Commits."""
+    SAR = SessionAttendanceRecord
+    counts = [
+        func.coalesce(func.sum(case((SAR.status == status, 1), else_=0)), 0).label(column)
+        for status, column in COUNT_COLUMNS.items()
+    ]
+    source = (
+        select(SAR.student_id, *counts, func.max(AttendanceSession.session_date).label("last_marked_date"))
+        .join(AttendanceSession, AttendanceSession.id == SAR.attendance_session_id)
+        .where(SAR.status.isnot(None))
+        .group_by(SAR.student_id)
+    )
+    wipe = delete(_rollups)
+    if student_ids is not None:
+        source = source.where(SAR.student_id.in_(student_ids))
+        wipe = wipe.where(_rollups.c.student_id.in_(student_ids))
+
+    columns = ["student_id", *COUNT_COLUMNS.values(), "last_marked_date"]
+    db.execute(wipe)
+    result = db.execute(insert(_rollups).from_select(columns, source))
+    db.commit()
+    logger.info("Rebuilt %d attendance rollup row(s)", result.rowcount)
+    return result.rowcount
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain attendance_student_rollups")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmd = sub.add_parser("rebuild", help="Recompute rollups from session_attendance_records")
+    cmd.add_argument("--student", type=int, action="append", help="Only this student user id (repeatable)")
+    args = parser.parse_args(argv)
+
+    from app.core.database import SessionLocal
+    import app.models  # noqa: F401 — register every mapper before querying
+
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        n = rebuild(db, args.student)
+    finally:
+        db.close()
+    print(f"Rebuilt {n} attendance rollup row(s) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
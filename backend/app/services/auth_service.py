@@ -1,6 +1,7 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.security import hash_password, verify_password_async, create_access_token
 from app.models.user import User
 from app.schemas.user import LoginRequest, Token, UserCreate, UserInToken
 
@@ -19,10 +20,23 @@ def register_user(db: Session, payload: UserCreate) -> User:
     return user
 
 
-def authenticate_user(db: Session, payload: LoginRequest) -> Token | None:
-    """Return a JWT token (with user info) if credentials are valid, else None."""
-    user = db.query(User).filter(User.email == payload.email, User.is_active == True).first()
-    if not user or not verify_password(payload.password, user.hashed_password):
+def _active_user_by_email(db: Session, email: str) -> User | None:
+    return (
+        db.query(User)
+        .options(joinedload(User.role))
+        .filter(User.email == email, User.is_active == True)  # noqa: E712
+        .first()
+    )
+
+
+async def authenticate_user(db: Session, payload: LoginRequest) -> Token | None:
+    """Return a JWT token (with user info) if credentials are valid, else None.
+
+    The user lookup runs on the sync threadpool; the bcrypt check waits on the
+    dedicated bcrypt pool so a login burst cannot starve other endpoints.
+    """
+    user = await run_in_threadpool(_active_user_by_email, db, payload.email)
+    if not user or not await verify_password_async(payload.password, user.hashed_password):
         return None
     token = create_access_token(subject=str(user.id), role=user.role.name)
     return Token(
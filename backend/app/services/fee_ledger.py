@@ -0,0 +1,104 @@
+"""
+Denormalized fee ledger — fee_plans.amount_paid / balance / next_due_date.
+
+Fee stats, the admin dashboard and the notification scan used to load every
+FeePlan and walk its payments (and installments) in Python to work out what
+was paid and what is owed. The plan row now carries the answer:
+
+  amount_paid   — sum of the plan's fee_payments, kept by `apply_payment()`
+                  as an atomic `amount_paid = amount_paid + x` in the same
+                  transaction that inserts the payment;
+  balance       — generated column, total_amount - amount_paid, so edits to
+                  base / discount amounts are reflected without a write here;
+  next_due_date — the date the overdue checks compare against: the earliest
+                  installment, or the plan's own due_date when it has none.
+                  Payments aren't allocated to installments, so it only
+                  changes when the schedule or due_date does.
+
+Payments deleted or edited outside the API are not tracked; reconcile the
+columns from fee_payments / fee_installments when needed:
+
+    cd backend && python -m app.services.fee_ledger reconcile
+"""
+
+import argparse
+import logging
+import time
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.extensions import FeeInstallment, FeePayment, FeePlan
+
+logger = logging.getLogger("connected.fees")
+
+
+def next_due_date(due_date: date, installment_dates: Iterable[date]) -> date:
+    """A plan's next_due_date: its first installment, else its own due_date."""
+    return min(installment_dates, default=due_date)
+
+
+def apply_payment(plan: FeePlan, amount: Decimal) -> None:
+    """Add a payment to the plan's ledger. Flushed as an atomic increment with `db`'s transaction; caller commits."""
+    plan.amount_paid = FeePlan.amount_paid + amount
+
+
+def _paid_expr():
+    return (
+        select(func.coalesce(func.sum(FeePayment.amount_paid), 0))
+        .where(FeePayment.fee_plan_id == FeePlan.id)
+        .scalar_subquery()
+    )
+
+
+def _due_expr():
+    return func.coalesce(
+        select(func.min(FeeInstallment.due_date))
+        .where(FeeInstallment.fee_plan_id == FeePlan.id)
+        .scalar_subquery(),
+        FeePlan.due_date,
+    )
+
+
+def reconcile(db: Session, plan_ids: Optional[Sequence[int]] = None) -> int:
+    """Rewrite ledger columns that disagree with payments / installments (all plans or `plan_ids`). Commits."""
+    paid, due = _paid_expr(), _due_expr()
+    stmt = (
+        update(FeePlan)
+        .where(or_(FeePlan.amount_paid != paid, FeePlan.next_due_date.is_distinct_from(due)))
+        .values(amount_paid=paid, next_due_date=due)
+        .execution_options(synchronize_session=False)
+    )
+    if plan_ids is not None:
+        stmt = stmt.where(FeePlan.id.in_(plan_ids))
+    result = db.execute(stmt)
+    db.commit()
+    if result.rowcount:
+        logger.warning("Reconciled %d fee plan ledger row(s)", result.rowcount)
+    return result.rowcount
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain the fee_plans ledger columns")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmd = sub.add_parser("reconcile", help="Recompute amount_paid / next_due_date from payments and installments")
+    cmd.add_argument("plan_ids", nargs="*", type=int, help="Only these fee plans (default: all)")
+    args = parser.parse_args(argv)
+
+    from app.core.database import SessionLocal
+    import app.models  # noqa: F401 — register every mapper before querying
+
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        n = reconcile(db, args.plan_ids or None)
+    finally:
+        db.close()
+    print(f"Reconciled {n} fee plan(s) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Fee reminder scan — Upcoming Due / Due Today / Overdue events.
+
+The scan used to walk every plan and installment in Python, add one
+FeeNotificationEvent at a time, and insert the same reminders again each
+time it was triggered on the same day. `scan()` is now set-based:
+
+  1. one SELECT that classifies each installment of an owing plan (or the
+     plan's own due_date when it has no installments) due within the next
+     7 days or earlier, and keeps only those whose dedupe key is not in
+     fee_notification_events yet;
+  2. one executemany INSERT of those rows per reminder type found.
+
+The dedupe key is (plan, installment, type, trigger_date), stored as
+fee_notification_events.dedupe_key under a unique index. The INSERT skips
+a clashing row, so two overlapping runs can't double-insert either, and
+the counts returned are the rows each INSERT actually added. Running it
+every hour therefore adds each reminder once per day. Payment receipts
+have no dedupe key.
+
+Run it from cron without going through the API:
+
+    cd backend && python -m app.services.fee_notifications scan
+"""
+
+import argparse
+import logging
+import time
+from datetime import date, timedelta
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy import String, case, cast, exists, func, select
+from sqlalchemy.orm import Session
+
+from app.core.upsert import insert_missing
+from app.models.extensions import FeeInstallment, FeeNotificationEvent, FeePlan, NotificationTypeEnum
+
+logger = logging.getLogger("connected.fees")
+
+_events = FeeNotificationEvent.__table__
+
+COUNT_KEYS = {
+    NotificationTypeEnum.Upcoming_Due: "upcoming",
+    NotificationTypeEnum.Due_Today:    "due_today",
+    NotificationTypeEnum.Overdue:      "overdue",
+}
+UPCOMING_DAYS = 7
+
+
+def dedupe_key(plan_id: int, installment_id: Optional[int], kind: NotificationTypeEnum, trigger_date: date) -> str:
+    """The key `scan()` stores for a reminder; installment 0 means the plan-level due date."""
+    return f"{plan_id}:{installment_id or 0}:{kind.value}:{trigger_date.isoformat()}"
+
+
+def _new_reminders(today: date):
+    due = func.coalesce(FeeInstallment.due_date, FeePlan.due_date)
+    horizon = today + timedelta(days=UPCOMING_DAYS)
+    kind = case(
+        (due == today, NotificationTypeEnum.Due_Today.value),
+        (due > today, NotificationTypeEnum.Upcoming_Due.value),
+        else_=NotificationTypeEnum.Overdue.value,
+    )
+    key = (
+        cast(FeePlan.id, String) + ":" + cast(func.coalesce(FeeInstallment.id, 0), String)
+        + ":" + kind + ":" + today.isoformat()
+    )
+    return (
+        select(
+            FeePlan.id.label("fee_plan_id"),
+            FeePlan.student_id,
+            FeeInstallment.id.label("installment_id"),
+            kind.label("kind"),
+            key.label("dedupe_key"),
+        )
+        .select_from(FeePlan)
+        .outerjoin(FeeInstallment, FeeInstallment.fee_plan_id == FeePlan.id)
+        .where(
+            FeePlan.balance > 0,
+            FeePlan.next_due_date <= horizon,
+            due <= horizon,
+            ~exists().where(_events.c.dedupe_key == key),
+        )
+    )
+
+
+def scan(db: Session, today: Optional[date] = None) -> Dict[str, int]:
+    """Insert today's reminders that don't exist yet and return how many of each type were added. Commits."""
+    today = today or date.today()
+    batches = {}
+    for r in db.execute(_new_reminders(today)):
+        kind = NotificationTypeEnum(r.kind)
+        batches.setdefault(kind, []).append({
+            "type":           kind,
+            "student_id":     r.student_id,
+            "fee_plan_id":    r.fee_plan_id,
+            "installment_id": r.installment_id,
+            "trigger_date":   today,
+            "dedupe_key":     r.dedupe_key,
+        })
+    counts = {name: 0 for name in COUNT_KEYS.values()}
+    stmt = insert_missing(_events, db.get_bind().dialect.name, ["dedupe_key"])
+    for kind, rows in batches.items():
+        # Counted from the insert, not the SELECT: an overlapping run may
+        # have added some of these reminders in between
+        counts[COUNT_KEYS[kind]] = db.execute(stmt, rows).rowcount
+    db.commit()
+    logger.info("Fee reminder scan for %s: %s", today, counts)
+    return counts
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Fee reminder notifications")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmd = sub.add_parser("scan", help="Insert today's Upcoming Due / Due Today / Overdue events (idempotent)")
+    cmd.add_argument("--date", type=date.fromisoformat, help="Scan as of this day (YYYY-MM-DD, default today)")
+    args = parser.parse_args(argv)
+
+    from app.core.database import SessionLocal
+    import app.models  # noqa: F401 — register every mapper before querying
+
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        counts = scan(db, args.date)
+    finally:
+        db.close()
+    print(f"Inserted {sum(counts.values())} reminder(s) {counts} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Block-based allocator for student codes (ST0001) and staff IDs (TCH001).
+
+The old helpers counted student_profiles / teacher_profiles on every
+insert — a full scan per user under import, and two admins creating users
+at the same moment got the same code. Now each worker process reserves a
+block of ID_BLOCK_SIZE values from the `id_sequences` row with
+SELECT … FOR UPDATE in its own short transaction, then hands them out from
+memory. Blocks never overlap across workers; values left unused when a
+worker restarts are simply skipped (codes may have gaps, never duplicates).
+
+A sequence row is created on first use, starting after the highest code
+already present in the profile table.
+"""
+
+import threading
+from typing import Dict, List, Tuple
+
+from sqlalchemy import Integer, cast, func, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.admin import IdSequence, StudentProfile, TeacherProfile
+
+# name → (model column holding the code, prefix, zero-pad width)
+SEQUENCES = {
+    "student_code": (StudentProfile.student_code, "ST", 4),
+    "staff_id":     (TeacherProfile.staff_id,     "TCH", 3),
+}
+
+_seq = IdSequence.__table__
+
+
+class IdAllocator:
+    """Per-process cache of reserved [next, end) ranges, one per sequence."""
+
+    def __init__(self, block_size: int):
+        self.block_size = max(1, block_size)
+        self._blocks: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def _initial_value(self, conn: Connection, name: str) -> int:
+        column, prefix, _ = SEQUENCES[name]
+        numeric = cast(func.substr(column, len(prefix) + 1), Integer)
+        highest = conn.execute(
+            select(func.max(numeric)).where(column.like(f"{prefix}%"))
+        ).scalar()
+        return (highest or 0) + 1
+
+    def reserve(self, name: str, count: int) -> Tuple[int, int]:
+        """Atomically claim `count` values from the DB; returns [start, end)."""
+        while True:
+            with engine.begin() as conn:
+                current = conn.execute(
+                    select(_seq.c.next_value).where(_seq.c.name == name).with_for_update()
+                ).scalar()
+                if current is not None:
+                    conn.execute(
+                        update(_seq).where(_seq.c.name == name)
+                        .values(next_value=current + count)
+                    )
+                    return current, current + count
+            # First use: create the row; if another worker beat us, loop and lock theirs
+            try:
+                with engine.begin() as conn:
+                    start = self._initial_value(conn, name)
+                    conn.execute(_seq.insert().values(name=name, next_value=start + count))
+                    return start, start + count
+            except IntegrityError:
+                continue
+
+    def next_value(self, name: str) -> int:
+        with self._lock:
+            nxt, end = self._blocks.get(name, (0, 0))
+            if nxt >= end:
+                nxt, end = self.reserve(name, self.block_size)
+            self._blocks[name] = (nxt + 1, end)
+            return nxt
+
+    def take(self, name: str, count: int) -> List[str]:
+        """`count` formatted codes from one dedicated reservation (used by CSV import)."""
+        if count <= 0:
+            return []
+        start, end = self.reserve(name, count)
+        return [self.format(name, v) for v in range(start, end)]
+
+    @staticmethod
+    def format(name: str, value: int) -> str:
+        _, prefix, width = SEQUENCES[name]
+        return f"{prefix}{value:0{width}d}"
+
+    def student_code(self) -> str:
+        return self.format("student_code", self.next_value("student_code"))
+
+    def staff_id(self) -> str:
+        return self.format("staff_id", self.next_value("staff_id"))
+
+
+id_allocator = IdAllocator(block_size=settings.ID_BLOCK_SIZE)
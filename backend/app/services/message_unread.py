@@ -0,0 +1,134 @@
+"""
+Per-participant unread counters — conversation_participants.unread_count.
+
+The inbox used to COUNT each conversation's messages newer than the
+caller's last_read_at on every poll, and the messaging pages poll every few
+seconds. The participant row now carries the number:
+
+  * `message_sent()` — in the sending transaction, `unread_count + 1` for
+    every other participant, and 0 (with last_read_at = now) for the
+    sender, who has obviously read the conversation;
+  * `mark_read()`    — resets the reader's row to 0 with last_read_at = now.
+
+Both are single UPDATEs evaluated by the database, so concurrent senders
+can't lose an increment. The counter follows the rule the old COUNT used
+(messages from others, not deleted, after last_read_at) except that a
+message landing in the same DATETIME second as a read, but after it, stays
+counted instead of being lost; `reconcile()` accepts either reading of such
+a message. Messages inserted or soft-deleted outside the API make the
+counter drift, so recount when needed:
+
+    cd backend && python -m app.services.message_unread reconcile
+"""
+
+import argparse
+import logging
+import time
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.extensions import ConversationParticipant, Message
+
+logger = logging.getLogger("connected.messages")
+
+_CP = ConversationParticipant
+
+
+def _read(db: Session, conversation_id: int, user_id: int) -> None:
+    db.execute(
+        update(_CP)
+        .where(_CP.conversation_id == conversation_id, _CP.user_id == user_id)
+        .values(unread_count=0, last_read_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def message_sent(db: Session, conversation_id: int, sender_id: int) -> Dict[int, int]:
+    """
+    Count a new message as unread for everyone but the sender and mark it
+    read for the sender. Returns {user_id: unread_count} for the active
+    participants after the change (for real-time pushes). Caller commits.
+    """
+    db.execute(
+        update(_CP)
+        .where(_CP.conversation_id == conversation_id, _CP.user_id != sender_id)
+        .values(unread_count=_CP.unread_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    _read(db, conversation_id, sender_id)
+    return dict(db.execute(
+        select(_CP.user_id, _CP.unread_count)
+        .where(_CP.conversation_id == conversation_id, _CP.is_active == True)  # noqa: E712
+    ).all())
+
+
+def mark_read(db: Session, conversation_id: int, user_id: int) -> None:
+    """Zero `user_id`'s counter and move their last_read_at to now. Caller commits."""
+    _read(db, conversation_id, user_id)
+
+
+def _unread_expr(same_second: bool):
+    """Messages from others after the participant's last_read_at; `same_second` also counts ones stamped at it."""
+    after = Message.created_at >= _CP.last_read_at if same_second else Message.created_at > _CP.last_read_at
+    return (
+        select(func.count(Message.id))
+        .where(
+            Message.conversation_id == _CP.conversation_id,
+            Message.sender_id != _CP.user_id,
+            Message.is_deleted == False,  # noqa: E712
+            or_(_CP.last_read_at.is_(None), after),
+        )
+        .scalar_subquery()
+    )
+
+
+def reconcile(db: Session, conversation_ids: Optional[Sequence[int]] = None) -> int:
+    """
+    Recount participant rows whose unread_count disagrees with messages (all
+    or `conversation_ids`). Commits.
+
+    A message stamped in the same second as last_read_at may have arrived
+    before the read (the live counter zeroed it) or after it (the live
+    counter kept it); the timestamps can't tell. So a count between the
+    recount without and with those messages is left alone, and one outside
+    that range is moved to the nearer end.
+    """
+    low, high = _unread_expr(same_second=False), _unread_expr(same_second=True)
+    stmt = (
+        update(_CP)
+        .where(or_(_CP.unread_count < low, _CP.unread_count > high))
+        .values(unread_count=case((_CP.unread_count < low, low), else_=high))
+        .execution_options(synchronize_session=False)
+    )
+    if conversation_ids is not None:
+        stmt = stmt.where(_CP.conversation_id.in_(conversation_ids))
+    result = db.execute(stmt)
+    db.commit()
+    if result.rowcount:
+        logger.warning("Reconciled %d conversation participant unread count(s)", result.rowcount)
+    return result.rowcount
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain conversation_participants.unread_count")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmd = sub.add_parser("reconcile", help="Recount unread messages per participant from messages")
+    cmd.add_argument("conversation_ids", nargs="*", type=int, help="Only these conversations (default: all)")
+    args = parser.parse_args(argv)
+
+    from app.core.database import SessionLocal
+    import app.models  # noqa: F401 — register every mapper before querying
+
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        n = reconcile(db, args.conversation_ids or None)
+    finally:
+        db.close()
+    print(f"Reconciled {n} participant row(s) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
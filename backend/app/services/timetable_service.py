@@ -1,14 +1,22 @@
 """
 Timetable service layer — business logic for timetable CRUD, publish, and filtered queries.
+
+Student and teacher timetable reads are served through app.core.response_cache,
+keyed per caller and invalidated by class / teacher scope. Every write path
+here (and the admin bulk rewrites) calls `invalidate_timetables` after commit.
 """
 
-from datetime import time as dt_time
+from datetime import datetime, time as dt_time
 from typing import List, Optional
 
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 
+from app.core.response_cache import CachedBody, response_cache
 from app.models.admin import TimetableEntry, StudentProfile, TeacherProfile, ClassSubject
+from app.schemas.admin import TimetableEntryOut
 
 DAY_MAP = {"Monday": 0, "Tuesday": 1, "Wednesday": 2, "Thursday": 3, "Friday": 4}
 
@@ -45,6 +53,34 @@ def _entry_to_out(e: TimetableEntry) -> dict:
     }
 
 
+# Cache scopes
+
+TIMETABLE_SCOPE = "timetable"   # every timetable body; for rewrites that can't name their teachers
+
+
+def class_scope(class_id: int) -> str:
+    return f"timetable:class:{class_id}"
+
+
+def teacher_scope(teacher_id: int) -> str:
+    return f"timetable:teacher:{teacher_id}"
+
+
+def student_scope(user_id: int) -> str:
+    """Bumped when a student moves class (their timetable key doesn't name the class)."""
+    return f"timetable:student:{user_id}"
+
+
+def invalidate_timetables(class_ids=(), teacher_ids=(), everything: bool = False) -> None:
+    """Drop cached timetables for the given classes / teachers. Call after commit."""
+    scopes = [class_scope(c) for c in class_ids if c is not None]
+    scopes += [teacher_scope(t) for t in teacher_ids if t is not None]
+    if everything:
+        scopes.append(TIMETABLE_SCOPE)
+    if scopes:
+        response_cache.bump(*scopes)
+
+
 # Admin CRUD
 
 def create_entry_admin(payload, db: Session) -> dict:
@@ -72,6 +108,7 @@ def create_entry_admin(payload, db: Session) -> dict:
     )
     db.add(entry)
     db.commit()
+    invalidate_timetables([entry.class_id], [entry.teacher_id])
     db.refresh(entry)
     return _entry_to_out(entry)
 
@@ -81,6 +118,7 @@ def update_entry_admin(entry_id: int, payload, db: Session) -> dict:
     entry = db.query(TimetableEntry).filter(TimetableEntry.id == entry_id).first()
     if not entry:
         raise HTTPException(status_code=404, detail="Timetable entry not found.")
+    old_teacher_id = entry.teacher_id
 
     if payload.subject_id is not None:
         entry.subject_id = payload.subject_id
@@ -101,6 +139,7 @@ def update_entry_admin(entry_id: int, payload, db: Session) -> dict:
         entry.online_link = payload.online_link
 
     db.commit()
+    invalidate_timetables([entry.class_id], [old_teacher_id, entry.teacher_id])
     db.refresh(entry)
     return _entry_to_out(entry)
 
@@ -110,8 +149,10 @@ def delete_entry_admin(entry_id: int, db: Session) -> None:
     entry = db.query(TimetableEntry).filter(TimetableEntry.id == entry_id).first()
     if not entry:
         raise HTTPException(status_code=404, detail="Timetable entry not found.")
+    class_id, teacher_id = entry.class_id, entry.teacher_id
     db.delete(entry)
     db.commit()
+    invalidate_timetables([class_id], [teacher_id])
 
 
 # Publish
@@ -160,60 +201,75 @@ def publish_timetable_for_class(class_id: int, db: Session) -> int:
     for entry in drafts:
         entry.is_published = True
         count += 1
+    teacher_ids = {entry.teacher_id for entry in drafts}
     db.commit()
+    invalidate_timetables([class_id], teacher_ids)
     return count
 
 
-# Student query
+# Student / teacher queries (async — served by get_async_db)
 
-def get_student_timetable(user_id: int, db: Session, view: str = "week", date_str: Optional[str] = None) -> List[dict]:
-    """
-    Fetch published timetable entries for the student's class.
-    `user_id` is the User.id from the JWT.
-    """
-    profile = db.query(StudentProfile).filter(StudentProfile.user_id == user_id).first()
-    if not profile or not profile.class_id:
-        return []
+# Everything _entry_to_out touches, so no lazy load is attempted on the AsyncSession
+_ENTRY_LOAD = (
+    joinedload(TimetableEntry.class_),
+    joinedload(TimetableEntry.subject),
+    joinedload(TimetableEntry.teacher),
+    joinedload(TimetableEntry.location),
+)
 
-    q = (
-        db.query(TimetableEntry)
-        .filter(
-            TimetableEntry.class_id == profile.class_id,
-            TimetableEntry.is_published == True,  # noqa: E712
-        )
-    )
 
-    # Day filtering
+def _published_entries(view: str, date_str: Optional[str]):
+    """Base SELECT of published entries, optionally narrowed to one weekday."""
+    stmt = (
+        select(TimetableEntry)
+        .options(*_ENTRY_LOAD)
+        .where(TimetableEntry.is_published == True)  # noqa: E712
+        .order_by(TimetableEntry.day_of_week, TimetableEntry.time_slot)
+    )
     if view == "day" and date_str:
-        from datetime import datetime
-        day_obj = datetime.strptime(date_str, "%Y-%m-%d")
-        day_name = day_obj.strftime("%A")  # Monday, Tuesday, etc.
-        q = q.filter(TimetableEntry.day == day_name)
+        day_name = datetime.strptime(date_str, "%Y-%m-%d").strftime("%A")  # Monday, Tuesday, etc.
+        stmt = stmt.where(TimetableEntry.day == day_name)
+    return stmt
 
-    entries = q.order_by(TimetableEntry.day_of_week, TimetableEntry.time_slot).all()
-    return [_entry_to_out(e) for e in entries if e.subject is not None]
 
+def _render(key: str, scopes, entries, generation: int) -> CachedBody:
+    out = [TimetableEntryOut(**_entry_to_out(e)) for e in entries if e.subject is not None]
+    return response_cache.put(key, scopes, out, generation)
 
-# Teacher query
 
-def get_teacher_timetable(user_id: int, db: Session, view: str = "week", date_str: Optional[str] = None) -> List[dict]:
+async def get_student_timetable(user_id: int, db: AsyncSession, view: str = "week", date_str: Optional[str] = None) -> CachedBody:
+    """
+    Published timetable entries for the student's class, as a cached body.
+    `user_id` is the User.id from the JWT. A warm hit runs no query.
     """
-    Fetch published timetable entries assigned to the teacher.
+    key = f"timetable:student:{user_id}:{view}:{date_str or ''}"
+    hit = response_cache.get(key)
+    if hit is not None:
+        return hit
+    generation = response_cache.generation()
+    class_id = (await db.execute(
+        select(StudentProfile.class_id).where(StudentProfile.user_id == user_id)
+    )).scalar()
+    scopes = [student_scope(user_id), TIMETABLE_SCOPE]
+    if not class_id:
+        return response_cache.put(key, scopes, [], generation)
+
+    scopes.append(class_scope(class_id))
+    stmt = _published_entries(view, date_str).where(TimetableEntry.class_id == class_id)
+    entries = (await db.execute(stmt)).scalars().all()
+    return _render(key, scopes, entries, generation)
+
+
+async def get_teacher_timetable(user_id: int, db: AsyncSession, view: str = "week", date_str: Optional[str] = None) -> CachedBody:
+    """
+    Published timetable entries assigned to the teacher, as a cached body.
     `user_id` is the User.id from the JWT (teacher_id in timetable_entries references users.id).
     """
-    q = (
-        db.query(TimetableEntry)
-        .filter(
-            TimetableEntry.teacher_id == user_id,
-            TimetableEntry.is_published == True,  # noqa: E712
-        )
-    )
-
-    if view == "day" and date_str:
-        from datetime import datetime
-        day_obj = datetime.strptime(date_str, "%Y-%m-%d")
-        day_name = day_obj.strftime("%A")
-        q = q.filter(TimetableEntry.day == day_name)
-
-    entries = q.order_by(TimetableEntry.day_of_week, TimetableEntry.time_slot).all()
-    return [_entry_to_out(e) for e in entries if e.subject is not None]
+    key = f"timetable:teacher:{user_id}:{view}:{date_str or ''}"
+    hit = response_cache.get(key)
+    if hit is not None:
+        return hit
+    generation = response_cache.generation()
+    stmt = _published_entries(view, date_str).where(TimetableEntry.teacher_id == user_id)
+    entries = (await db.execute(stmt)).scalars().all()
+    return _render(key, [teacher_scope(user_id), TIMETABLE_SCOPE], entries, generation)
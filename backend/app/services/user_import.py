@@ -0,0 +1,306 @@
+"""
+Streaming CSV user import — backs POST /admin/users/import and
+POST /admin/import/{role}.
+
+The old importers read the whole upload into memory and paid several
+queries plus a full bcrypt hash per row. This pipeline instead:
+
+  * streams rows from a spooled temp file with csv.DictReader
+  * prefetches existing emails, roles, classes and subjects once
+  * reserves student codes / staff IDs in one block per chunk
+  * hashes the default password once per job (every imported account gets
+    the same well-known default and must change it anyway)
+  * inserts users, profiles and teacher-subject links in executemany
+    chunks, committing after each chunk
+
+Progress and per-row errors are recorded on an ImportJob that the admin
+UI can poll via GET /admin/import/jobs/{job_id}. Jobs live in memory in
+the worker process that ran them; the last IMPORT_JOB_HISTORY are kept.
+"""
+
+import csv
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.response_cache import CLASSES_SCOPE, response_cache
+from app.core.security import hash_password
+from app.models.admin import Class, StudentProfile, Subject, TeacherProfile, TeacherSubject
+from app.models.user import Role, User
+from app.services.id_allocator import id_allocator
+
+logger = logging.getLogger("connected.import")
+
+IMPORT_JOB_HISTORY = 50
+
+
+@dataclass
+class ImportJob:
+    id: str
+    kind: str                      # "users" or the role name for /import/{role}
+    status: str = "queued"         # queued | running | completed | failed
+    processed: int = 0
+    created: int = 0
+    skipped: int = 0
+    details: List[dict] = field(default_factory=list)
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def skip(self, line: int, reason: str, email: Optional[str] = None) -> None:
+        entry = {"line": line, "status": "skipped", "reason": reason}
+        if email:
+            entry["email"] = email
+        self.details.append(entry)
+        self.skipped += 1
+
+    def to_dict(self, include_details: bool = True) -> dict:
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "processed": self.processed,
+            "created": self.created,
+            "skipped": self.skipped,
+            "error": self.error,
+            "elapsed_s": round((self.finished_at or time.time()) - self.started_at, 2)
+            if self.started_at else None,
+        }
+        if include_details:
+            data["errors"] = [d for d in self.details if d["status"] != "created"]
+        return data
+
+
+class ImportJobRegistry:
+    """Bounded in-memory map of job id → ImportJob."""
+
+    def __init__(self, max_jobs: int):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, kind: str) -> ImportJob:
+        job = ImportJob(id=uuid.uuid4().hex, kind=kind)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+import_jobs = ImportJobRegistry(IMPORT_JOB_HISTORY)
+
+
+# Helpers
+
+def _generate_email(first_name: str, last_name: str, role: str) -> str:
+    return f"{first_name.strip().lower()}{last_name.strip()[0].lower()}@{role}.connected.com"
+
+
+def _unique_email(base_email: str, taken: set) -> str:
+    """Same suffix scheme as admin._unique_email, checked against the prefetched set."""
+    email = base_email
+    local, domain = base_email.split("@")
+    counter = 1
+    while email in taken:
+        email = f"{local}{counter}@{domain}"
+        counter += 1
+    return email
+
+
+def _iter_csv(path: str) -> Iterable[dict]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+
+class _Prefetch:
+    """Lookup tables loaded once per job instead of once per row."""
+
+    def __init__(self, db: Session):
+        self.emails = {e.lower() for (e,) in db.query(User.email)}
+        self.roles = {name: rid for rid, name in db.query(Role.id, Role.name)}
+        self.classes = {name: cid for cid, name in db.query(Class.id, Class.name)}
+        self.subjects = {name.lower(): sid for sid, name in db.query(Subject.id, Subject.name)}
+
+
+# Row parsing
+
+def _parse_generic(row: dict, line: int, pre: _Prefetch, job: ImportJob) -> Optional[dict]:
+    """Columns: full_name, email, role, class (optional). Email is required."""
+    email = (row.get("email") or "").strip().lower()
+    if not email:
+        job.skip(line, "Missing email")
+        return None
+    if email in pre.emails:
+        job.skip(line, "Email already exists", email)
+        return None
+    role_name = (row.get("role") or "student").strip().lower()
+    if role_name not in pre.roles:
+        job.skip(line, f"Unknown role '{role_name}'", email)
+        return None
+    return {
+        "line": line,
+        "email": email,
+        "full_name": (row.get("full_name") or "").strip(),
+        "role": role_name,
+        "class_name": (row.get("class") or "").strip(),
+    }
+
+
+def _parse_for_role(row: dict, line: int, role: str, pre: _Prefetch, job: ImportJob) -> Optional[dict]:
+    """Columns: full_name, email (optional), class / bio / subjects depending on role."""
+    full_name = (row.get("full_name") or "").strip()
+    if not full_name:
+        job.skip(line, "Missing full_name")
+        return None
+    email = (row.get("email") or "").strip().lower()
+    if not email:
+        parts = full_name.split()
+        fname, lname = parts[0], parts[-1] if len(parts) > 1 else parts[0]
+        email = _unique_email(_generate_email(fname, lname, role), pre.emails)
+    elif email in pre.emails:
+        job.skip(line, "Email already exists", email)
+        return None
+    subjects = [s.strip() for s in (row.get("subjects") or "").split(",") if s.strip()]
+    return {
+        "line": line,
+        "email": email,
+        "full_name": full_name,
+        "role": role,
+        "class_name": (row.get("class") or "").strip(),
+        "teacher_profile": True,
+        "bio": (row.get("bio") or "").strip() or None,
+        "subjects": subjects,
+    }
+
+
+# Chunk insert
+
+def _flush_chunk(db: Session, chunk: List[dict], pre: _Prefetch, hashed: str, job: ImportJob) -> None:
+    """Insert one chunk of parsed rows with a handful of executemany statements."""
+    # Codes are reserved (in their own transaction) before this session writes
+    is_student = [r["role"] == "student" for r in chunk]
+    is_teacher = [r["role"] == "teacher" and bool(r.get("teacher_profile")) for r in chunk]
+    student_codes = iter(id_allocator.take("student_code", sum(is_student)))
+    staff_ids = iter(id_allocator.take("staff_id", sum(is_teacher)))
+
+    db.execute(insert(User), [
+        {
+            "email": r["email"],
+            "full_name": r["full_name"],
+            "hashed_password": hashed,
+            "role_id": pre.roles[r["role"]],
+            "is_active": True,
+        }
+        for r in chunk
+    ])
+    emails = [r["email"] for r in chunk]
+    ids = dict(db.query(User.email, User.id).filter(User.email.in_(emails)).all())
+
+    students, teachers, links = [], [], []
+    for r, student, teacher in zip(chunk, is_student, is_teacher):
+        uid = ids[r["email"]]
+        if student:
+            students.append({
+                "user_id": uid,
+                "student_code": next(student_codes),
+                "class_id": pre.classes.get(r["class_name"]) if r["class_name"] else None,
+            })
+        elif teacher:
+            teachers.append({"user_id": uid, "staff_id": next(staff_ids), "bio": r["bio"]})
+            for sid in {pre.subjects[s.lower()] for s in r["subjects"] if s.lower() in pre.subjects}:
+                links.append({"teacher_id": uid, "subject_id": sid})
+
+    if students:
+        db.execute(insert(StudentProfile), students)
+    if teachers:
+        db.execute(insert(TeacherProfile), teachers)
+    if links:
+        db.execute(insert(TeacherSubject), links)
+    db.commit()
+
+    for r in chunk:
+        job.details.append({"line": r["line"], "status": "created", "email": r["email"]})
+    job.created += len(chunk)
+
+
+def run_import(job_id: str, path: str, role: Optional[str], default_password: str) -> None:
+    """
+    Run an import job to completion. `role=None` is the generic importer
+    (role comes from each row); otherwise every row is created with `role`.
+    Removes `path` when done.
+    """
+    job = import_jobs.get(job_id)
+    if job is None:
+        return
+    job.status = "running"
+    job.started_at = time.time()
+    chunk_size = max(1, settings.IMPORT_CHUNK_SIZE)
+    db = SessionLocal()
+    try:
+        pre = _Prefetch(db)
+        db.rollback()   # end the prefetch transaction before the long write phase
+        hashed = hash_password(default_password)
+
+        chunk: List[dict] = []
+        for line, row in enumerate(_iter_csv(path), start=2):
+            job.processed += 1
+            if role is None:
+                parsed = _parse_generic(row, line, pre, job)
+            else:
+                parsed = _parse_for_role(row, line, role, pre, job)
+            if parsed is None:
+                continue
+            pre.emails.add(parsed["email"])   # duplicates later in the same file are skipped
+            chunk.append(parsed)
+            if len(chunk) >= chunk_size:
+                _flush_chunk_safe(db, chunk, pre, hashed, job)
+                chunk = []
+        if chunk:
+            _flush_chunk_safe(db, chunk, pre, hashed, job)
+
+        job.status = "completed"
+    except Exception as exc:
+        db.rollback()
+        job.status = "failed"
+        job.error = str(exc)
+        logger.exception("Import job %s failed", job_id)
+    finally:
+        db.close()
+        if job.created:
+            response_cache.bump(CLASSES_SCOPE)   # student counts per class
+        job.finished_at = time.time()
+        if os.path.exists(path):
+            os.remove(path)
+        logger.info(
+            "Import job %s (%s) %s: %d created, %d skipped in %.1fs",
+            job.id, job.kind, job.status, job.created, job.skipped,
+            job.finished_at - job.started_at,
+        )
+
+
+def _flush_chunk_safe(db: Session, chunk: List[dict], pre: _Prefetch, hashed: str, job: ImportJob) -> None:
+    """A chunk that fails (e.g. an email taken concurrently) is rolled back and its rows reported."""
+    try:
+        _flush_chunk(db, chunk, pre, hashed, job)
+    except SQLAlchemyError as exc:
+        db.rollback()
+        reason = f"Chunk insert failed: {exc.__class__.__name__}"
+        for r in chunk:
+            job.skip(r["line"], reason, r["email"])
+        logger.warning("Import job %s: chunk of %d rows rolled back: %s", job.id, len(chunk), exc)
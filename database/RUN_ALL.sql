@@ -39,6 +39,12 @@ SOURCE migrations/13_ai_tutor.sql;          -- RAG Tutor, Chapters, Documents, C
 SOURCE migrations/14_video_conferencing.sql; -- Meetings, Recordings, Emotion Logs, Analytics
 SOURCE migrations/15_consent_management.sql; -- GDPR Consent Records + Audit Logs
 SOURCE migrations/16_whatsapp_webhook.sql;  -- WhatsApp Delivery Log + Opt-Out Registry
+SOURCE migrations/17_id_sequences.sql;      -- Block-allocated student code / staff ID counters
+SOURCE migrations/18_attendance_rollups.sql; -- Per-student attendance totals + indexed rate
+SOURCE migrations/19_attendance_daily_facts.sql; -- Daily attendance counts per class / subject / teacher
+SOURCE migrations/20_fee_ledger.sql;        -- Paid / balance / next-due columns on fee_plans
+SOURCE migrations/21_fee_notification_dedupe.sql; -- Idempotent fee reminder scan key
+SOURCE migrations/22_message_unread_counts.sql; -- Per-participant unread message counters
 
 --  SEED DATA
 
@@ -0,0 +1,23 @@
+-- ============================================================
+--  ConnectEd — 17: ID Sequences
+--  Domain: id_sequences
+--  Depends on: 03_profiles.sql
+--
+--  Counters for human-readable codes (ST0001, TCH001). Each API
+--  worker reserves a block of values with SELECT … FOR UPDATE and
+--  hands them out from memory (app/services/id_allocator.py), so
+--  creating a user no longer scans student_profiles / teacher_profiles
+--  and concurrent admins cannot be given the same code.
+--
+--  Rows are created by the allocator on first use, starting after the
+--  highest code already in the profile tables (so seeds that insert
+--  ST0001 directly are respected).
+-- ============================================================
+
+USE connected_app;
+
+CREATE TABLE IF NOT EXISTS id_sequences (
+    name       VARCHAR(50) NOT NULL,
+    next_value INT         NOT NULL DEFAULT 1,
+    PRIMARY KEY (name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
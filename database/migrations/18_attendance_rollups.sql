@@ -0,0 +1,58 @@
+-- ============================================================
+--  ConnectEd — 18: Attendance Rollups
+--  Domain: attendance_student_rollups
+--  Depends on: 05_attendance.sql
+--
+--  One row per student with running totals of their marked session
+--  attendance. Kept current by the teacher mark / close-session routes
+--  in the same transaction as the records themselves, so admin reports
+--  read a rate with one indexed lookup instead of two COUNT(*) scans per
+--  student. attendance_rate mirrors the old computation: PRESENT + LATE
+--  over every marked status (EXCUSED included); 100 with nothing marked.
+--
+--  Rebuild from session_attendance_records at any time with:
+--      cd backend && python -m app.services.attendance_rollups rebuild
+-- ============================================================
+
+USE connected_app;
+
+CREATE TABLE IF NOT EXISTS attendance_student_rollups (
+    student_id       INT  NOT NULL,
+    present_count    INT  NOT NULL DEFAULT 0,
+    absent_count     INT  NOT NULL DEFAULT 0,
+    late_count       INT  NOT NULL DEFAULT 0,
+    excused_count    INT  NOT NULL DEFAULT 0,
+    last_marked_date DATE NULL,
+    attendance_rate  DECIMAL(5,1) GENERATED ALWAYS AS (
+        CASE
+            WHEN present_count + absent_count + late_count + excused_count = 0 THEN 100.0
+            ELSE ROUND((present_count + late_count) * 100.0
+                       / (present_count + absent_count + late_count + excused_count), 1)
+        END
+    ) STORED,
+    updated_at       DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (student_id),
+    CONSTRAINT fk_rollup_student FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_rollup_rate (attendance_rate)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Backfill from existing session records (no-op on a fresh install)
+INSERT INTO attendance_student_rollups
+    (student_id, present_count, absent_count, late_count, excused_count, last_marked_date)
+SELECT
+    r.student_id,
+    SUM(r.status = 'PRESENT'),
+    SUM(r.status = 'ABSENT'),
+    SUM(r.status = 'LATE'),
+    SUM(r.status = 'EXCUSED'),
+    MAX(s.session_date)
+FROM session_attendance_records r
+JOIN attendance_sessions s ON s.id = r.attendance_session_id
+WHERE r.status IS NOT NULL
+GROUP BY r.student_id
+ON DUPLICATE KEY UPDATE
+    present_count    = VALUES(present_count),
+    absent_count     = VALUES(absent_count),
+    late_count       = VALUES(late_count),
+    excused_count    = VALUES(excused_count),
+    last_marked_date = VALUES(last_marked_date);
@@ -0,0 +1,60 @@
+-- ============================================================
+--  ConnectEd — 19: Attendance Daily Facts
+--  Domain: attendance_daily_facts
+--  Depends on: 05_attendance.sql
+--
+--  One row per (day, class, subject, teacher) with the status counts of
+--  every CLOSED attendance session taught that day. teacher_id is the
+--  session's creator. The close-session route adds each session's counts
+--  as it closes (closed sessions can't be re-marked), so term-range trend,
+--  class-wise and teacher reports scan a few rows per school day instead
+--  of every session_attendance_record. Readers take "today" from the raw
+--  records, which also covers sessions that are still open.
+--
+--  Rebuild (all days or a window) from the records at any time with:
+--      cd backend && python -m app.services.attendance_facts rebuild [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+-- ============================================================
+
+USE connected_app;
+
+CREATE TABLE IF NOT EXISTS attendance_daily_facts (
+    session_date  DATE NOT NULL,
+    class_id      INT  NOT NULL,
+    subject_id    INT  NOT NULL,
+    teacher_id    INT  NOT NULL,
+    present_count INT  NOT NULL DEFAULT 0,
+    absent_count  INT  NOT NULL DEFAULT 0,
+    late_count    INT  NOT NULL DEFAULT 0,
+    excused_count INT  NOT NULL DEFAULT 0,
+    updated_at    DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (session_date, class_id, subject_id, teacher_id),
+    CONSTRAINT fk_fact_class   FOREIGN KEY (class_id)   REFERENCES classes(id)  ON DELETE CASCADE,
+    CONSTRAINT fk_fact_subject FOREIGN KEY (subject_id) REFERENCES subjects(id) ON DELETE CASCADE,
+    CONSTRAINT fk_fact_teacher FOREIGN KEY (teacher_id) REFERENCES users(id)    ON DELETE CASCADE,
+    INDEX idx_fact_class_date   (class_id, session_date),
+    INDEX idx_fact_teacher_date (teacher_id, session_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Backfill from existing closed sessions (no-op on a fresh install)
+INSERT INTO attendance_daily_facts
+    (session_date, class_id, subject_id, teacher_id,
+     present_count, absent_count, late_count, excused_count)
+SELECT
+    s.session_date,
+    t.class_id,
+    t.subject_id,
+    s.created_by,
+    SUM(r.status = 'PRESENT'),
+    SUM(r.status = 'ABSENT'),
+    SUM(r.status = 'LATE'),
+    SUM(r.status = 'EXCUSED')
+FROM attendance_sessions s
+JOIN timetable_entries t ON t.id = s.timetable_entry_id
+JOIN session_attendance_records r ON r.attendance_session_id = s.id
+WHERE s.status = 'CLOSED' AND r.status IS NOT NULL
+GROUP BY s.session_date, t.class_id, t.subject_id, s.created_by
+ON DUPLICATE KEY UPDATE
+    present_count = VALUES(present_count),
+    absent_count  = VALUES(absent_count),
+    late_count    = VALUES(late_count),
+    excused_count = VALUES(excused_count);
@@ -0,0 +1,43 @@
+-- ============================================================
+--  ConnectEd — 20: Fee Ledger Columns
+--  Domain: fee_plans (amount_paid, balance, next_due_date)
+--  Depends on: 06_fees.sql
+--
+--  Denormalizes each plan's paid / owed position onto fee_plans so fee
+--  stats, the admin dashboard and the notification scan are single
+--  aggregates instead of loading every plan's payments and installments.
+--  amount_paid is incremented in the transaction that records a payment;
+--  balance is generated from total_amount - amount_paid; next_due_date is
+--  the earliest installment's due date, or the plan's due_date when it
+--  has no installments.
+--
+--  The ALTERs are skipped when the columns already exist, so re-running
+--  is safe. Reconcile the columns from fee_payments at any time with:
+--      cd backend && python -m app.services.fee_ledger reconcile
+-- ============================================================
+
+USE connected_app;
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.COLUMNS
+      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'fee_plans' AND COLUMN_NAME = 'amount_paid') = 0,
+    'ALTER TABLE fee_plans
+        ADD COLUMN amount_paid   DECIMAL(10,2) NOT NULL DEFAULT 0.00 AFTER due_date,
+        ADD COLUMN balance       DECIMAL(10,2) GENERATED ALWAYS AS (total_amount - amount_paid) STORED AFTER amount_paid,
+        ADD COLUMN next_due_date DATE NULL AFTER balance,
+        ADD INDEX idx_feeplan_next_due (next_due_date)',
+    'SELECT ''fee_plans ledger columns already present'' AS status'
+);
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Backfill from existing payments and installments (no-op on a fresh install)
+UPDATE fee_plans fp
+SET fp.amount_paid = (
+        SELECT COALESCE(SUM(p.amount_paid), 0) FROM fee_payments p WHERE p.fee_plan_id = fp.id
+    ),
+    fp.next_due_date = COALESCE(
+        (SELECT MIN(i.due_date) FROM fee_installments i WHERE i.fee_plan_id = fp.id),
+        fp.due_date
+    );
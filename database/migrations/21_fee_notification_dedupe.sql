@@ -0,0 +1,33 @@
+-- ============================================================
+--  ConnectEd — 21: Fee Notification Dedupe Key
+--  Domain: fee_notification_events (installment_id, dedupe_key)
+--  Depends on: 06_fees.sql, 20_fee_ledger.sql
+--
+--  The reminder scan (Upcoming Due / Due Today / Overdue) keys every event
+--  on (plan, installment, type, trigger_date) and only inserts keys that
+--  aren't here yet, so it can run hourly without duplicating reminders.
+--  installment_id is the installment that triggered the event (NULL for
+--  plan-level reminders and payment receipts); dedupe_key is NULL for
+--  payment receipts. Existing rows keep a NULL key and are not backfilled.
+--
+--  The ALTER is skipped when the columns already exist, so re-running is
+--  safe. Run the scan from cron with:
+--      cd backend && python -m app.services.fee_notifications scan
+-- ============================================================
+
+USE connected_app;
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.COLUMNS
+      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'fee_notification_events' AND COLUMN_NAME = 'dedupe_key') = 0,
+    'ALTER TABLE fee_notification_events
+        ADD COLUMN installment_id INT         NULL AFTER fee_plan_id,
+        ADD COLUMN dedupe_key     VARCHAR(80) NULL AFTER trigger_date,
+        ADD UNIQUE KEY uq_notif_dedupe (dedupe_key),
+        ADD CONSTRAINT fk_notif_installment
+            FOREIGN KEY (installment_id) REFERENCES fee_installments(id) ON DELETE CASCADE',
+    'SELECT ''fee_notification_events dedupe columns already present'' AS status'
+);
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
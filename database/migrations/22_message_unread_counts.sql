@@ -0,0 +1,38 @@
+-- ============================================================
+--  ConnectEd — 22: Message Unread Counters
+--  Domain: conversation_participants (unread_count)
+--  Depends on: 10_messaging.sql
+--
+--  Stores each participant's unread message count on their participant
+--  row so the inbox reads it instead of counting messages on every poll.
+--  Sending a message increments it for the other participants in the
+--  same transaction; marking the conversation read (or sending) resets
+--  the sender's / reader's row to 0.
+--
+--  The ALTER is skipped when the column already exists, so re-running is
+--  safe. Reconcile the counters from messages at any time with:
+--      cd backend && python -m app.services.message_unread reconcile
+-- ============================================================
+
+USE connected_app;
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.COLUMNS
+      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'conversation_participants' AND COLUMN_NAME = 'unread_count') = 0,
+    'ALTER TABLE conversation_participants
+        ADD COLUMN unread_count INT NOT NULL DEFAULT 0 AFTER last_read_at',
+    'SELECT ''conversation_participants unread_count already present'' AS status'
+);
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Backfill: messages from others, not deleted, since the participant last read
+UPDATE conversation_participants cp
+SET cp.unread_count = (
+        SELECT COUNT(*) FROM messages m
+        WHERE m.conversation_id = cp.conversation_id
+          AND m.sender_id <> cp.user_id
+          AND m.is_deleted = 0
+          AND (cp.last_read_at IS NULL OR m.created_at > cp.last_read_at)
+    );
@@ -10,8 +10,7 @@ import {
   XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer,
 } from "recharts";
 import {
-  adminGetAttendanceStats, adminGetAttendanceTrend, adminGetAttendanceDistribution,
-  adminGetClasswiseAttendance, adminGetAttendanceRecords, adminGetClasses,
+  adminGetAttendanceDashboard, adminGetAttendanceRecords, adminGetClasses,
   type AttendanceStats, type AttendanceTrendPoint, type AttendanceDistribution,
   type ClasswiseAttendance, type AttendanceRecordRead, type AdminClass,
 } from "@/app/utils/api";
@@ -44,16 +43,11 @@ export default function AdminAttendanceOverview() {
     setLoading(true);
     setError(null);
     try {
-      const [s, t, d, cw] = await Promise.all([
-        adminGetAttendanceStats(dateRange),
-        adminGetAttendanceTrend(dateRange),
-        adminGetAttendanceDistribution(dateRange),
-        adminGetClasswiseAttendance(dateRange),
-      ]);
-      setStats(s);
-      setTrend(t);
-      setDistribution(d);
-      setClasswise(cw);
+      const dashboard = await adminGetAttendanceDashboard(dateRange);
+      setStats(dashboard.stats);
+      setTrend(dashboard.trend);
+      setDistribution(dashboard.distribution);
+      setClasswise(dashboard.classwise);
     } catch {
       setError("Failed to load attendance analytics.");
     } finally {
@@ -17,6 +17,7 @@ import {
   msgMarkRead,
   msgGetContacts,
   msgStartConversation,
+  msgOpenSocket,
   type MsgConversation,
   type MsgMessage,
   type MsgContact,
@@ -66,7 +67,7 @@ export default function StudentMessages() {
   const [contactSearch, setContactSearch] = useState("");
 
   const messagesEndRef = useRef<HTMLDivElement>(null);
-  // Track selected ID in a ref so polling callbacks always see the latest value
+  // Track selected ID in a ref so socket callbacks always see the latest value
   const selectedIdRef = useRef<number | null>(null);
   useEffect(() => { selectedIdRef.current = selected?.id ?? null; }, [selected?.id]);
 
@@ -78,7 +79,7 @@ export default function StudentMessages() {
         data.map((c) => (c.id === selectedIdRef.current ? { ...c, unread_count: 0 } : c))
       );
     } catch {
-      // silently ignore poll errors
+      // silently ignore fetch errors
     }
   }, []);
 
@@ -88,11 +89,39 @@ export default function StudentMessages() {
     loadConversations().finally(() => setLoadingConvos(false));
   }, [loadConversations]);
 
-  // Poll for new conversations every 5s
-  useEffect(() => {
-    const interval = setInterval(loadConversations, 5000);
-    return () => clearInterval(interval);
-  }, [loadConversations]);
+  // Live updates over the messaging socket. "ready" arrives on the first
+  // connect and after every reconnect, so it re-fetches whatever was missed.
+  useEffect(
+    () =>
+      msgOpenSocket((event) => {
+        const openId = selectedIdRef.current;
+        if (event.type === "ready") {
+          loadConversations();
+          if (openId === null) return;
+          msgGetConversation(openId)
+            .then((detail) => {
+              if (selectedIdRef.current === openId) setMessages(detail.messages);
+            })
+            .catch(() => {});
+        } else if (event.type === "message") {
+          const msg = event.message;
+          if (msg.conversation_id === openId) {
+            setMessages((prev) => (prev.some((m) => m.id === msg.id) ? prev : [...prev, msg]));
+            if (!msg.is_mine) msgMarkRead(openId).catch(() => {});
+          }
+          loadConversations();
+        } else if (event.type === "unread") {
+          setConversations((prev) =>
+            prev.map((c) =>
+              c.id === event.conversation_id
+                ? { ...c, unread_count: c.id === openId ? 0 : event.unread_count }
+                : c
+            )
+          );
+        }
+      }),
+    [loadConversations]
+  );
 
   // Load messages when a conversation is selected
   useEffect(() => {
@@ -104,21 +133,6 @@ export default function StudentMessages() {
     msgMarkRead(selected.id).catch(() => {});
   }, [selected?.id]);
 
-  // Poll messages every 3s — also marks as read so last_read_at stays current
-  useEffect(() => {
-    if (!selected) return;
-    const interval = setInterval(async () => {
-      try {
-        const detail = await msgGetConversation(selected.id);
-        setMessages(detail.messages);
-        await msgMarkRead(selected.id);
-      } catch {
-        // ignore
-      }
-    }, 3000);
-    return () => clearInterval(interval);
-  }, [selected?.id]);
-
   // Scroll to bottom when messages change
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -129,7 +143,7 @@ export default function StudentMessages() {
     setSending(true);
     try {
       const msg = await msgSendMessage(selected.id, input.trim());
-      setMessages((prev) => [...prev, msg]);
+      setMessages((prev) => (prev.some((m) => m.id === msg.id) ? prev : [...prev, msg]));
       setInput("");
       await loadConversations();
     } catch {
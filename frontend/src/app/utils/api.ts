@@ -438,6 +438,18 @@ export interface AttendanceRecordRead {
   history: AttendanceDayRecord[];
 }
 
+export interface AttendanceDashboard {
+  range: string;
+  stats: AttendanceStats;
+  trend: AttendanceTrendPoint[];
+  distribution: AttendanceDistribution;
+  classwise: ClasswiseAttendance[];
+}
+
+export async function adminGetAttendanceDashboard(range = "This Week"): Promise<AttendanceDashboard> {
+  const { data } = await api.get<AttendanceDashboard>("/admin/attendance/dashboard", { params: { range } });
+  return data;
+}
 export async function adminGetAttendanceStats(range = "This Week"): Promise<AttendanceStats> {
   const { data } = await api.get<AttendanceStats>("/admin/attendance/stats", { params: { range } });
   return data;
@@ -1387,6 +1399,55 @@ export async function msgMarkRead(convId: number): Promise<void> {
   await api.patch(`/messages/conversations/${convId}/read`);
 }
 
+// Real-time messaging socket
+
+const MSG_SOCKET_URL = BASE_URL.replace(/^http/, "ws") + "/messages/ws";
+const WS_POLICY_VIOLATION = 1008;
+
+export type MsgSocketEvent =
+  | { type: "ready" }
+  | { type: "ping" }
+  | { type: "message"; message: MsgMessage }
+  | { type: "read"; conversation_id: number; user_id: number }
+  | { type: "unread"; conversation_id: number; unread_count: number };
+
+// Opens /messages/ws and authenticates with the first frame (the token never
+// goes in the URL). Reconnects with backoff after a drop; "ready" arrives after
+// every (re)connect, which is when callers should re-fetch to catch up.
+// Returns a function that closes the socket for good.
+export function msgOpenSocket(onEvent: (event: MsgSocketEvent) => void): () => void {
+  let socket: WebSocket | null = null;
+  let stopped = false;
+  let attempt = 0;
+  let retryTimer: ReturnType<typeof setTimeout> | undefined;
+
+  const connect = () => {
+    const token = localStorage.getItem("access_token");
+    if (stopped || !token) return;
+    const ws = new WebSocket(MSG_SOCKET_URL);
+    socket = ws;
+    ws.onopen = () => ws.send(JSON.stringify({ type: "auth", token }));
+    ws.onmessage = (e) => {
+      const event = JSON.parse(e.data) as MsgSocketEvent;
+      if (event.type === "ready") attempt = 0;
+      onEvent(event);
+    };
+    ws.onclose = (e) => {
+      socket = null;
+      // 1008: token rejected — the next HTTP call's 401 sends the user to login
+      if (stopped || e.code === WS_POLICY_VIOLATION) return;
+      retryTimer = setTimeout(connect, Math.min(30000, 1000 * 2 ** attempt++));
+    };
+  };
+  connect();
+
+  return () => {
+    stopped = true;
+    clearTimeout(retryTimer);
+    socket?.close();
+  };
+}
+
 // Profile Types & API
 
 export interface TeacherProfileData {
@@ -0,0 +1,110 @@
+"""
+Benchmark — Concurrency Headroom of async vs. sync Routes
+Fires N simultaneous clients at the async-engine routes (auth/me, timetables,
+student homework/assignments) and at comparable sync routes that still run
+in the threadpool, then reports throughput and latency percentiles.
+
+Runs against the live server at http://127.0.0.1:8000:
+    python tests/bench_async_concurrency.py [clients] [requests_per_client]
+"""
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+import httpx
+
+BASE     = "http://127.0.0.1:8000/api/v1"
+PASSWORD = "12345"
+
+STUDENT_EMAIL = "alice.wang@student.connected.com"
+TEACHER_EMAIL = "emmaak@teacher.connected.com"
+
+ASYNC_ROUTES = [
+    ("student", "/auth/me"),
+    ("student", "/students/timetable"),
+    ("teacher", "/teachers/timetable"),
+    ("student", "/homework/student"),
+    ("student", "/assignments/student"),
+]
+SYNC_ROUTES = [
+    ("student", "/students/attendance"),
+    ("student", "/students/profile"),
+    ("teacher", "/teachers/attendance/my-classes"),
+]
+
+
+async def login(client, email):
+    r = await client.post(f"{BASE}/auth/login", json={"email": email, "password": PASSWORD})
+    return r.json().get("access_token") if r.status_code == 200 else None
+
+
+async def run_series(label, routes, tokens, n_clients, per_client):
+    """n_clients tasks each issue per_client requests round-robin over `routes`."""
+    limits = httpx.Limits(max_connections=n_clients, max_keepalive_connections=n_clients)
+    times, errors = [], 0
+    async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+        async def worker(i):
+            nonlocal errors
+            for j in range(per_client):
+                role, path = routes[(i + j) % len(routes)]
+                start = time.perf_counter()
+                try:
+                    r = await client.get(f"{BASE}{path}",
+                                         headers={"Authorization": f"Bearer {tokens[role]}"})
+                    if r.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                times.append((time.perf_counter() - start) * 1000)
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(n_clients)))
+        wall = time.perf_counter() - wall_start
+
+    ordered = sorted(times)
+    return {
+        "label": label,
+        "requests": len(times),
+        "errors": errors,
+        "wall_s": round(wall, 2),
+        "req_per_s": round(len(times) / wall, 1),
+        "avg_ms": round(statistics.mean(times), 1),
+        "p50_ms": round(ordered[len(ordered) // 2], 1),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1], 1),
+        "p99_ms": round(ordered[int(len(ordered) * 0.99) - 1], 1),
+    }
+
+
+async def main(n_clients, per_client):
+    async with httpx.AsyncClient(timeout=60) as client:
+        tokens = {
+            "student": await login(client, STUDENT_EMAIL),
+            "teacher": await login(client, TEACHER_EMAIL),
+        }
+        # Warm the principal cache and both pools
+        for role, path in ASYNC_ROUTES + SYNC_ROUTES:
+            await client.get(f"{BASE}{path}", headers={"Authorization": f"Bearer {tokens[role]}"})
+
+    results = [
+        await run_series("async routes (AsyncSession)", ASYNC_ROUTES, tokens, n_clients, per_client),
+        await run_series("sync routes (threadpool)", SYNC_ROUTES, tokens, n_clients, per_client),
+    ]
+
+    print(f"{n_clients} simultaneous clients × {per_client} requests\n")
+    print(f"{'Series':<30} {'Req':<6} {'Err':<5} {'Req/s':<8} {'Avg':<8} {'P50':<8} {'P95':<8} {'P99'}")
+    print("-" * 90)
+    for s in results:
+        print(f"{s['label']:<30} {s['requests']:<6} {s['errors']:<5} {s['req_per_s']:<8} "
+              f"{s['avg_ms']:<8} {s['p50_ms']:<8} {s['p95_ms']:<8} {s['p99_ms']}")
+
+    with open("tests/reports/async_concurrency_results.json", "w") as f:
+        json.dump({"clients": n_clients, "per_client": per_client, "series": results}, f, indent=2)
+    print("\nRaw results saved to tests/reports/async_concurrency_results.json")
+
+
+if __name__ == "__main__":
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    per     = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    asyncio.run(main(clients, per))
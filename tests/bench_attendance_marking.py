@@ -0,0 +1,115 @@
+"""
+Benchmark — Concurrent Bulk Attendance Marking
+Opens one attendance session for a class of the demo teacher (up to 40
+students on the roster) and fires N simultaneous PUT
+/teachers/attendance/sessions/{id}/records requests, each re-marking the
+whole roster with random statuses. Marking is one INSERT … ON DUPLICATE
+KEY UPDATE per request, so concurrent writers must neither fail on the
+uq_session_student key nor leave the roster partially marked.
+
+Runs against the live server at http://127.0.0.1:8000:
+    python tests/bench_attendance_marking.py [requests] [roster_size]
+"""
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+import httpx
+
+BASE     = "http://127.0.0.1:8000/api/v1"
+PASSWORD = "12345"
+
+TEACHER_EMAIL = "emmaak@teacher.connected.com"
+STATUSES      = ["PRESENT", "ABSENT", "LATE", "EXCUSED"]
+
+
+async def login(client, email):
+    r = await client.post(f"{BASE}/auth/login", json={"email": email, "password": PASSWORD})
+    return r.json().get("access_token") if r.status_code == 200 else None
+
+
+async def open_session(client, headers):
+    """First class/date in the next two weeks the teacher has a timetable entry for."""
+    classes = (await client.get(f"{BASE}/teachers/attendance/my-classes", headers=headers)).json()
+    for cls in classes:
+        for offset in range(14):
+            day = date.today() + timedelta(days=offset)
+            r = await client.post(f"{BASE}/teachers/attendance/open", headers=headers,
+                                  json={"class_id": cls["id"], "session_date": day.isoformat()})
+            if r.status_code == 200 and r.json()["status"] == "OPEN":
+                return r.json()
+    return None
+
+
+async def main(n_requests, roster_size):
+    limits = httpx.Limits(max_connections=n_requests, max_keepalive_connections=n_requests)
+    async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+        token = await login(client, TEACHER_EMAIL)
+        headers = {"Authorization": f"Bearer {token}"}
+        session = await open_session(client, headers)
+        if not session:
+            print("No open-able session found for the demo teacher")
+            return
+        roster = [row["student_id"] for row in session["roster"]][:roster_size]
+        url = f"{BASE}/teachers/attendance/sessions/{session['session_id']}/records"
+
+        times, errors, queries = [], {}, []
+
+        async def mark(i):
+            payload = {"records": [{"student_id": sid, "status": random.choice(STATUSES), "note": f"run {i}"}
+                                   for sid in roster]}
+            start = time.perf_counter()
+            try:
+                r = await client.put(url, headers=headers, json=payload)
+                if r.status_code != 200:
+                    errors[r.status_code] = errors.get(r.status_code, 0) + 1
+                elif "X-DB-Query-Count" in r.headers:
+                    queries.append(int(r.headers["X-DB-Query-Count"]))
+            except httpx.HTTPError:
+                errors["conn"] = errors.get("conn", 0) + 1
+            times.append((time.perf_counter() - start) * 1000)
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(mark(i) for i in range(n_requests)))
+        wall = time.perf_counter() - wall_start
+
+        final = (await client.get(f"{BASE}/teachers/attendance/sessions/{session['session_id']}",
+                                  headers=headers)).json()
+        marked = sum(1 for row in final["roster"] if row["student_id"] in roster and row["status"])
+
+    ordered = sorted(times)
+    result = {
+        "session_id": session["session_id"],
+        "roster": len(roster),
+        "requests": n_requests,
+        "errors": errors,
+        "wall_s": round(wall, 2),
+        "req_per_s": round(n_requests / wall, 1),
+        "rows_per_s": round(n_requests * len(roster) / wall, 1),
+        "p50_ms": round(ordered[len(ordered) // 2], 1),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1], 1),
+        "max_ms": round(ordered[-1], 1),
+        "queries_per_request": round(statistics.mean(queries), 1) if queries else None,
+        "final_marked": marked,
+    }
+
+    print(f"{n_requests} concurrent marks of a {len(roster)}-student roster (session {session['session_id']})\n")
+    print(f"{'Req/s':<8} {'Rows/s':<9} {'P50':<8} {'P95':<8} {'Max':<9} {'Queries':<9} {'Errors':<12} {'Marked'}")
+    print("-" * 80)
+    print(f"{result['req_per_s']:<8} {result['rows_per_s']:<9} {result['p50_ms']:<8} {result['p95_ms']:<8} "
+          f"{result['max_ms']:<9} {result['queries_per_request']!s:<9} {json.dumps(errors):<12} "
+          f"{marked}/{len(roster)}")
+
+    with open("tests/reports/attendance_marking_results.json", "w") as f:
+        json.dump(result, f, indent=2)
+    print("\nRaw results saved to tests/reports/attendance_marking_results.json")
+
+
+if __name__ == "__main__":
+    requests_n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    roster_n   = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    asyncio.run(main(requests_n, roster_n))
@@ -0,0 +1,190 @@
+"""
+Benchmark — Streaming CSV Exports
+Downloads the user and fee CSV exports from the live server at
+http://127.0.0.1:8000 as a stream and reports time to first byte, total
+time, rows and size. With --pid (the uvicorn worker serving the requests)
+it samples the worker's resident set every 10 ms during each download and
+reports the peak growth over the pre-request baseline: it stays flat for a
+streamed export and grows with the row count for one built in memory.
+
+--seed N first inserts N synthetic students, each with a fee plan, straight
+into the configured database (emails @bench.connected.com) so the exports
+are large enough to matter; --cleanup removes them again.
+
+    python tests/bench_csv_export.py [--pid PID] [--seed 50000] [--cleanup]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import httpx
+
+BASE     = "http://127.0.0.1:8000/api/v1"
+PASSWORD = "12345"
+
+ADMIN_EMAIL  = "yuktae@admin.connected.com"
+BENCH_DOMAIN = "bench.connected.com"
+
+EXPORTS = [
+    "/admin/export/student",
+    "/admin/export/teacher",
+    "/admin/export/parent",
+    "/admin/fees/export/csv",
+]
+
+
+# Synthetic data
+
+def seed(n, batch=5000):
+    from sqlalchemy import insert, select
+    from app.core.database import SessionLocal
+    import app.models  # noqa: F401
+    from app.models.admin import Class, StudentProfile
+    from app.models.extensions import FeePlan
+    from app.models.user import Role, User
+
+    db = SessionLocal()
+    try:
+        role_id = db.execute(select(Role.id).where(Role.name == "student")).scalar_one()
+        class_ids = db.execute(select(Class.id)).scalars().all() or [None]
+        due = date.today() + timedelta(days=30)
+        for start in range(0, n, batch):
+            ids = range(start, min(start + batch, n))
+            db.execute(insert(User), [
+                {"email": f"bench{i}@{BENCH_DOMAIN}", "hashed_password": "!", "full_name": f"Bench Student {i}",
+                 "role_id": role_id, "is_active": True}
+                for i in ids
+            ])
+            user_ids = dict(db.execute(
+                select(User.email, User.id).where(User.email.in_([f"bench{i}@{BENCH_DOMAIN}" for i in ids]))
+            ).all())
+            db.execute(insert(StudentProfile), [
+                {"user_id": user_ids[f"bench{i}@{BENCH_DOMAIN}"], "class_id": class_ids[i % len(class_ids)],
+                 "student_code": f"BX{i:06d}", "phone": "0000000", "address": f"{i} Bench Street"}
+                for i in ids
+            ])
+            profile_ids = db.execute(
+                select(StudentProfile.id).where(StudentProfile.user_id.in_(user_ids.values()))
+            ).scalars().all()
+            db.execute(insert(FeePlan), [
+                {"student_id": pid, "base_amount": 1200, "discount_amount": 0, "total_amount": 1200,
+                 "amount_paid": 0, "due_date": due, "next_due_date": due}
+                for pid in profile_ids
+            ])
+            db.commit()
+            print(f"  seeded {min(start + batch, n)}/{n}", end="\r")
+        print()
+    finally:
+        db.close()
+
+
+def cleanup():
+    from sqlalchemy import delete, select
+    from app.core.database import SessionLocal
+    import app.models  # noqa: F401
+    from app.models.admin import StudentProfile
+    from app.models.extensions import FeePlan
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        users = select(User.id).where(User.email.like(f"%@{BENCH_DOMAIN}"))
+        profiles = select(StudentProfile.id).where(StudentProfile.user_id.in_(users))
+        db.execute(delete(FeePlan).where(FeePlan.student_id.in_(profiles)))
+        db.execute(delete(StudentProfile).where(StudentProfile.user_id.in_(users)))
+        n = db.execute(delete(User).where(User.email.like(f"%@{BENCH_DOMAIN}"))).rowcount
+        db.commit()
+        print(f"Removed {n} bench students")
+    finally:
+        db.close()
+
+
+# Server memory
+
+def rss_kb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, pid):
+        super().__init__(daemon=True)
+        self.pid, self.peak, self.running = pid, 0, True
+
+    def run(self):
+        while self.running:
+            self.peak = max(self.peak, rss_kb(self.pid))
+            time.sleep(0.01)
+
+
+# Downloads
+
+def download(client, path, headers, pid):
+    baseline = rss_kb(pid) if pid else None
+    sampler = RssSampler(pid) if pid else None
+    if sampler:
+        sampler.start()
+    start = time.perf_counter()
+    ttfb, size, lines = None, 0, 0
+    with client.stream("GET", f"{BASE}{path}", headers=headers) as r:
+        for chunk in r.iter_bytes():
+            if ttfb is None:
+                ttfb = time.perf_counter() - start
+            size += len(chunk)
+            lines += chunk.count(b"\n")
+        status = r.status_code
+    total = time.perf_counter() - start
+    if sampler:
+        sampler.running = False
+        sampler.join()
+    return {
+        "path": path,
+        "status": status,
+        "rows": max(lines - 1, 0),
+        "mb": round(size / 1e6, 2),
+        "ttfb_ms": round((ttfb or total) * 1000, 1),
+        "total_s": round(total, 2),
+        "rss_growth_mb": round((sampler.peak - baseline) / 1024, 1) if sampler else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pid", type=int, help="uvicorn worker PID to sample memory from")
+    parser.add_argument("--seed", type=int, default=0, help="insert N synthetic students with fee plans first")
+    parser.add_argument("--cleanup", action="store_true", help="remove the synthetic students and exit")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+    if args.seed:
+        seed(args.seed)
+
+    with httpx.Client(timeout=600) as client:
+        r = client.post(f"{BASE}/auth/login", json={"email": ADMIN_EMAIL, "password": PASSWORD})
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}", "Accept-Encoding": "identity"}
+        results = [download(client, path, headers, args.pid) for path in EXPORTS]
+
+    print(f"\n{'Export':<26} {'Status':<7} {'Rows':<8} {'MB':<7} {'TTFB ms':<9} {'Total s':<8} {'RSS +MB'}")
+    print("-" * 78)
+    for res in results:
+        print(f"{res['path']:<26} {res['status']:<7} {res['rows']:<8} {res['mb']:<7} "
+              f"{res['ttfb_ms']:<9} {res['total_s']:<8} {res['rss_growth_mb']!s}")
+
+    with open("tests/reports/csv_export_results.json", "w") as f:
+        json.dump(results, f, indent=2)
+    print("\nRaw results saved to tests/reports/csv_export_results.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark — Whole-School Fee Plan Generation
+Creates a throwaway academic period on the live server at
+http://127.0.0.1:8000 and calls POST /admin/fees/plans/bulk for the whole
+school (class_id omitted) with a three-installment schedule, then calls it
+again, when every student is skipped as a duplicate. Reports wall time,
+plans / installments created and the X-DB-Query-Count header for both runs.
+Plans and the period are deleted afterwards.
+
+--seed N first inserts N synthetic students (see bench_csv_export.py) so
+the school is large enough; remove them with
+`python tests/bench_csv_export.py --cleanup`.
+
+    python tests/bench_fee_plans_bulk.py [--seed 5000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import httpx
+
+from bench_csv_export import seed
+
+BASE     = "http://127.0.0.1:8000/api/v1"
+PASSWORD = "12345"
+
+ADMIN_EMAIL = "yuktae@admin.connected.com"
+
+
+def generate(client, headers, period_id):
+    due = date.today() + timedelta(days=90)
+    payload = {
+        "base_amount": "1200.00",
+        "discount_amount": "0.00",
+        "due_date": due.isoformat(),
+        "academic_period_id": period_id,
+        "installments": [
+            {"amount": "400.00", "due_date": (due - timedelta(days=60)).isoformat()},
+            {"amount": "400.00", "due_date": (due - timedelta(days=30)).isoformat()},
+            {"amount": "400.00", "due_date": due.isoformat()},
+        ],
+    }
+    start = time.perf_counter()
+    r = client.post(f"{BASE}/admin/fees/plans/bulk", headers=headers, json=payload)
+    wall = time.perf_counter() - start
+    body = r.json()
+    return {
+        "status": r.status_code,
+        "created": body.get("created"),
+        "skipped": body.get("skipped"),
+        "installments": (body.get("created") or 0) * len(payload["installments"]),
+        "wall_s": round(wall, 2),
+        "queries": int(r.headers["X-DB-Query-Count"]) if "X-DB-Query-Count" in r.headers else None,
+    }
+
+
+def remove_period(period_id):
+    from sqlalchemy import delete
+    from app.core.database import SessionLocal
+    import app.models  # noqa: F401
+    from app.models.extensions import AcademicPeriod, FeeInstallment, FeePlan
+
+    db = SessionLocal()
+    try:
+        plans = FeePlan.__table__.select().with_only_columns(FeePlan.id).where(FeePlan.academic_period_id == period_id)
+        db.execute(delete(FeeInstallment).where(FeeInstallment.fee_plan_id.in_(plans)))
+        db.execute(delete(FeePlan).where(FeePlan.academic_period_id == period_id))
+        db.execute(delete(AcademicPeriod).where(AcademicPeriod.id == period_id))
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed", type=int, default=0, help="insert N synthetic students first")
+    args = parser.parse_args()
+    if args.seed:
+        seed(args.seed)
+
+    with httpx.Client(timeout=600) as client:
+        r = client.post(f"{BASE}/auth/login", json={"email": ADMIN_EMAIL, "password": PASSWORD})
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        today = date.today()
+        r = client.post(f"{BASE}/admin/fees/academic-periods", headers=headers, json={
+            "name": f"Bench {int(time.time())}",
+            "start_date": today.isoformat(),
+            "end_date": (today + timedelta(days=180)).isoformat(),
+        })
+        period_id = r.json()["id"]
+        try:
+            runs = {"first": generate(client, headers, period_id), "rerun": generate(client, headers, period_id)}
+        finally:
+            remove_period(period_id)
+
+    print(f"\n{'Run':<7} {'Status':<7} {'Created':<9} {'Skipped':<9} {'Installments':<13} {'Wall s':<8} {'Queries'}")
+    print("-" * 64)
+    for name, res in runs.items():
+        print(f"{name:<7} {res['status']:<7} {res['created']!s:<9} {res['skipped']!s:<9} "
+              f"{res['installments']:<13} {res['wall_s']:<8} {res['queries']!s}")
+
+    with open("tests/reports/fee_plans_bulk_results.json", "w") as f:
+        json.dump(runs, f, indent=2)
+    print("\nRaw results saved to tests/reports/fee_plans_bulk_results.json")
+
+
+if __name__ == "__main__":
+    main()
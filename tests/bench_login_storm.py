@@ -0,0 +1,120 @@
+"""
+Benchmark — Login Storm vs. Other Routes
+Fires a burst of concurrent logins (the 8am rush) and measures the latency
+of an unrelated sync endpoint before and during the burst.
+
+Runs against the live server at http://127.0.0.1:8000:
+    python tests/bench_login_storm.py [n_logins] [concurrency]
+"""
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BASE     = "http://127.0.0.1:8000/api/v1"
+PASSWORD = "12345"
+
+ADMIN_EMAIL   = "yuktae@admin.connected.com"
+STUDENT_EMAIL = "alice.wang@student.connected.com"
+PROBE_PATH    = "/students/timetable"   # unrelated sync route hit during the storm
+
+
+def login(email):
+    r = requests.post(f"{BASE}/auth/login", json={"email": email, "password": PASSWORD}, timeout=60)
+    return r.json().get("access_token") if r.status_code == 200 else None
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def probe(headers, stop: threading.Event, out: list, interval=0.05):
+    """Hit PROBE_PATH repeatedly until `stop` is set, recording latency (ms)."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        requests.get(f"{BASE}{PROBE_PATH}", headers=headers, timeout=60)
+        out.append((time.perf_counter() - start) * 1000)
+        time.sleep(interval)
+
+
+def summarize(label, times):
+    if not times:
+        return {"label": label, "n": 0}
+    ordered = sorted(times)
+    return {
+        "label": label,
+        "n": len(times),
+        "avg_ms": round(statistics.mean(times), 1),
+        "p50_ms": round(ordered[len(ordered) // 2], 1),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1], 1),
+        "max_ms": round(ordered[-1], 1),
+    }
+
+
+if __name__ == "__main__":
+    n_logins    = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    admin_tok   = login(ADMIN_EMAIL)
+    student_tok = login(STUDENT_EMAIL)
+    probe_headers = auth(student_tok)
+
+    # Baseline: probe route with no login traffic
+    baseline: list = []
+    stop = threading.Event()
+    t = threading.Thread(target=probe, args=(probe_headers, stop, baseline))
+    t.start()
+    time.sleep(3)
+    stop.set()
+    t.join()
+
+    # Storm: same probe while n_logins run with `concurrency` clients
+    during: list = []
+    login_times: list = []
+    stop = threading.Event()
+    t = threading.Thread(target=probe, args=(probe_headers, stop, during))
+    t.start()
+
+    def _one_login(_):
+        start = time.perf_counter()
+        requests.post(f"{BASE}/auth/login",
+                      json={"email": STUDENT_EMAIL, "password": PASSWORD}, timeout=120)
+        login_times.append((time.perf_counter() - start) * 1000)
+
+    storm_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(_one_login, range(n_logins)))
+    storm_s = time.perf_counter() - storm_start
+    stop.set()
+    t.join()
+
+    pool_stats = requests.get(f"{BASE}/admin/bcrypt-pool", headers=auth(admin_tok), timeout=15).json()
+
+    results = {
+        "n_logins": n_logins,
+        "concurrency": concurrency,
+        "storm_seconds": round(storm_s, 2),
+        "logins_per_sec": round(n_logins / storm_s, 1),
+        "probe_baseline": summarize(f"GET {PROBE_PATH} (idle)", baseline),
+        "probe_during_storm": summarize(f"GET {PROBE_PATH} (during storm)", during),
+        "login": summarize("POST /auth/login", login_times),
+        "bcrypt_pool": pool_stats,
+    }
+
+    print(f"Login storm: {n_logins} logins, {concurrency} concurrent clients, "
+          f"{results['storm_seconds']}s ({results['logins_per_sec']}/s)\n")
+    print(f"{'Series':<45} {'N':<6} {'Avg':<9} {'P50':<9} {'P95':<9} {'Max'}")
+    print("-" * 90)
+    for key in ("probe_baseline", "probe_during_storm", "login"):
+        s = results[key]
+        print(f"{s['label']:<45} {s.get('n', 0):<6} {s.get('avg_ms', '-'):<9} "
+              f"{s.get('p50_ms', '-'):<9} {s.get('p95_ms', '-'):<9} {s.get('max_ms', '-')}")
+    print(f"\nbcrypt pool: {pool_stats}")
+
+    with open("tests/reports/login_storm_results.json", "w") as f:
+        json.dump(results, f, indent=2)
+    print("\nRaw results saved to tests/reports/login_storm_results.json")
@@ -0,0 +1,164 @@
+"""
+Benchmark — Real-Time Message Push
+Opens --clients WebSockets (default 2000) to the live server's
+/api/v1/messages/ws as the seed student, as if they had that many tabs
+open (each socket is its own subscription), then has the seed teacher send
+--messages messages to that student over HTTP, one every --interval
+seconds. Reports connect time, sockets connected, events delivered
+(clients × messages expected) and push latency, from the send request
+starting to the event arriving on a socket: p50 / p95 / p99 / max.
+With --pid (the uvicorn worker) it also reports the worker's RSS growth
+while the sockets are held.
+
+Needs the `websockets` package (installed with uvicorn[standard]) and an
+open-file limit above the client count on both ends (ulimit -n 8192).
+
+    python tests/bench_realtime.py [--clients 2000] [--messages 20] [--pid PID]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import statistics
+import time
+
+import httpx
+import websockets
+
+from bench_csv_export import rss_kb
+
+BASE     = "http://127.0.0.1:8000/api/v1"
+WS_URL   = "ws://127.0.0.1:8000/api/v1/messages/ws"
+PASSWORD = "12345"
+
+TEACHER_EMAIL = "emmaak@teacher.connected.com"
+STUDENT_EMAIL = "alice.wang@student.connected.com"
+
+
+async def login(client, email):
+    r = await client.post(f"{BASE}/auth/login", json={"email": email, "password": PASSWORD})
+    r.raise_for_status()
+    token = r.json()["access_token"]
+    claims = json.loads(base64.urlsafe_b64decode(token.split(".")[1] + "=="))
+    return token, int(claims["sub"])
+
+
+class Listener:
+    """One socket: records when each bench message arrives."""
+
+    def __init__(self, sent, latencies):
+        self.sent, self.latencies = sent, latencies
+        self.ws = None
+
+    async def connect(self, token):
+        self.ws = await websockets.connect(WS_URL, open_timeout=120, max_queue=None)
+        await self.ws.send(json.dumps({"type": "auth", "token": token}))
+        ready = json.loads(await asyncio.wait_for(self.ws.recv(), 120))
+        if ready["type"] != "ready":
+            raise RuntimeError(f"socket not ready: {ready}")
+
+    async def run(self):
+        async for raw in self.ws:
+            event = json.loads(raw)
+            if event["type"] == "message":
+                start = self.sent.get(event["message"]["content"])
+                if start is not None:
+                    self.latencies.append(time.perf_counter() - start)
+
+
+def pct(values, p):
+    return round(sorted(values)[min(len(values) - 1, int(len(values) * p))] * 1000, 1) if values else None
+
+
+async def bench(args):
+    sent, latencies = {}, []
+    async with httpx.AsyncClient(timeout=60) as client:
+        teacher_token, _ = await login(client, args.teacher)
+        student_token, student_id = await login(client, args.student)
+        teacher = {"Authorization": f"Bearer {teacher_token}"}
+        r = await client.post(f"{BASE}/messages/conversations", headers=teacher, json={"other_user_id": student_id})
+        r.raise_for_status()
+        conv_id = r.json()["id"]
+
+        baseline = rss_kb(args.pid) if args.pid else None
+        listeners = [Listener(sent, latencies) for _ in range(args.clients)]
+        gate = asyncio.Semaphore(200)
+
+        async def connect(listener):
+            async with gate:
+                await listener.connect(student_token)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(connect(l) for l in listeners), return_exceptions=True)
+        connect_s = time.perf_counter() - start
+        open_listeners = [l for l, res in zip(listeners, results) if not isinstance(res, Exception)]
+        tasks = [asyncio.create_task(l.run()) for l in open_listeners]
+        held_rss = rss_kb(args.pid) if args.pid else None
+
+        run_tag = int(time.time())
+        send_ms = []
+        for i in range(args.messages):
+            content = f"bench {run_tag} #{i}"
+            sent[content] = time.perf_counter()
+            r = await client.post(f"{BASE}/messages/conversations/{conv_id}/send", headers=teacher,
+                                  json={"content": content})
+            send_ms.append((time.perf_counter() - sent[content]) * 1000)
+            r.raise_for_status()
+            await asyncio.sleep(args.interval)
+
+        expected = len(open_listeners) * args.messages
+        deadline = time.perf_counter() + args.drain_timeout
+        while len(latencies) < expected and time.perf_counter() < deadline:
+            await asyncio.sleep(0.1)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*(l.ws.close() for l in open_listeners), return_exceptions=True)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await client.patch(f"{BASE}/messages/conversations/{conv_id}/read",
+                           headers={"Authorization": f"Bearer {student_token}"})
+
+    return {
+        "clients": args.clients,
+        "connected": len(open_listeners),
+        "connect_s": round(connect_s, 2),
+        "messages": args.messages,
+        "expected_deliveries": expected,
+        "delivered": len(latencies),
+        "send_ms_p50": round(statistics.median(send_ms), 1),
+        "latency_ms_p50": pct(latencies, 0.50),
+        "latency_ms_p95": pct(latencies, 0.95),
+        "latency_ms_p99": pct(latencies, 0.99),
+        "latency_ms_max": round(max(latencies) * 1000, 1) if latencies else None,
+        "rss_growth_mb": round((held_rss - baseline) / 1024, 1) if args.pid else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=2000, help="WebSockets to hold open")
+    parser.add_argument("--messages", type=int, default=20, help="messages the teacher sends")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between messages")
+    parser.add_argument("--drain-timeout", type=float, default=30, help="seconds to wait for stragglers")
+    parser.add_argument("--pid", type=int, help="uvicorn worker PID to sample memory from")
+    parser.add_argument("--teacher", default=TEACHER_EMAIL)
+    parser.add_argument("--student", default=STUDENT_EMAIL)
+    args = parser.parse_args()
+
+    res = asyncio.run(bench(args))
+
+    print(f"\n{'Clients':<9} {'Connected':<10} {'Connect s':<10} {'Delivered':<18} "
+          f"{'p50 ms':<8} {'p95 ms':<8} {'p99 ms':<8} {'max ms':<8} {'RSS +MB'}")
+    print("-" * 92)
+    print(f"{res['clients']:<9} {res['connected']:<10} {res['connect_s']:<10} "
+          f"{res['delivered']}/{res['expected_deliveries']:<12} {res['latency_ms_p50']!s:<8} "
+          f"{res['latency_ms_p95']!s:<8} {res['latency_ms_p99']!s:<8} {res['latency_ms_max']!s:<8} "
+          f"{res['rss_growth_mb']!s}")
+
+    with open("tests/reports/realtime_results.json", "w") as f:
+        json.dump(res, f, indent=2)
+    print("\nRaw results saved to tests/reports/realtime_results.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark — JSON Serialization and Compression of Large Lists
+Part 1 (in-process): time the default FastAPI path (build Pydantic models,
+response_model re-validation, jsonable_encoder, stdlib json) against the
+trusted orjson path for N synthetic AdminUserRead / FeeStudentRead rows.
+
+Part 2 (live server at http://127.0.0.1:8000): fetch the large list
+endpoints with Accept-Encoding identity / gzip / br and report latency and
+bytes on the wire.
+
+    python tests/bench_serialization.py [rows]
+"""
+import json
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import requests
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.serialization import dumps, orjson
+from app.schemas.admin import AdminUserRead
+from app.schemas.extensions import FeeStudentRead
+
+BASE     = "http://127.0.0.1:8000/api/v1"
+PASSWORD = "12345"
+
+ADMIN_EMAIL   = "yuktae@admin.connected.com"
+STUDENT_EMAIL = "alice.wang@student.connected.com"
+
+LIVE_ROUTES = [
+    ("admin",   "/admin/users"),
+    ("admin",   "/admin/fees/students"),
+    ("admin",   "/admin/attendance/records"),
+    ("student", "/assignments/student"),
+]
+ENCODINGS = ["identity", "gzip", "br"]
+
+
+# Part 1 — in-process serialization
+
+def user_rows(n):
+    return [
+        {"id": i, "full_name": f"Student Number {i}", "email": f"student{i}@student.connected.com",
+         "role": "student", "class_name": f"Grade {i % 12 + 1}-A", "is_active": True}
+        for i in range(n)
+    ]
+
+
+def fee_rows(n):
+    return [
+        {"fee_plan_id": i, "student_id": i, "student_code": f"ST{i:04d}", "name": f"Student Number {i}",
+         "class_name": "Grade 7-A", "base_amount": 1200.0, "discount_amount": 100.0, "total_fee": 1100.0,
+         "amount_paid": 550.0, "outstanding_balance": 550.0, "status": "partial", "due_date": "2026-01-31",
+         "is_overdue": False, "academic_period": "2025/26",
+         "installments": [{"id": i * 2 + k, "amount": 550.0, "due_date": "2026-01-31", "is_overdue": False}
+                          for k in range(2)],
+         "payment_history": [{"id": i, "date": "2025-09-01", "amount": 550.0,
+                              "payment_method": "CARD", "transaction_id": f"TX{i}"}]}
+        for i in range(n)
+    ]
+
+
+def default_path(model, rows):
+    """What a handler returning [Model(**r)] with response_model=List[Model] costs."""
+    objs = [model(**r) for r in rows]
+    validated = TypeAdapter(List[model]).validate_python(objs, from_attributes=True)
+    content = jsonable_encoder(validated)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def trusted_path(model, rows):
+    return dumps(rows)
+
+
+def time_it(fn, *args, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(*args)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), len(body)
+
+
+def in_process(n):
+    results = []
+    for label, model, rows in [("AdminUserRead", AdminUserRead, user_rows(n)),
+                               ("FeeStudentRead", FeeStudentRead, fee_rows(n))]:
+        base_ms, size = time_it(default_path, model, rows)
+        fast_ms, _ = time_it(trusted_path, model, rows)
+        results.append({
+            "model": label, "rows": n, "bytes": size,
+            "default_ms": round(base_ms, 1), "trusted_ms": round(fast_ms, 1),
+            "speedup": round(base_ms / fast_ms, 1) if fast_ms else None,
+        })
+    return results
+
+
+# Part 2 — live endpoints
+
+def login(email):
+    r = requests.post(f"{BASE}/auth/login", json={"email": email, "password": PASSWORD}, timeout=60)
+    return r.json().get("access_token") if r.status_code == 200 else None
+
+
+def fetch(path, token, encoding, repeat=5):
+    times, wire, served = [], 0, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        r = requests.get(f"{BASE}{path}", stream=True, timeout=120,
+                         headers={"Authorization": f"Bearer {token}", "Accept-Encoding": encoding})
+        raw = r.raw.read(decode_content=False)
+        times.append((time.perf_counter() - start) * 1000)
+        wire, served = len(raw), r.headers.get("content-encoding", "identity")
+    return {"path": path, "requested": encoding, "served": served,
+            "wire_bytes": wire, "p50_ms": round(statistics.median(times), 1)}
+
+
+def live():
+    tokens = {"admin": login(ADMIN_EMAIL), "student": login(STUDENT_EMAIL)}
+    if not tokens["admin"]:
+        return []
+    return [fetch(path, tokens[role], enc) for role, path in LIVE_ROUTES for enc in ENCODINGS]
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print(f"orjson: {'yes' if orjson else 'no (stdlib fallback)'}\n")
+
+    part1 = in_process(n)
+    print(f"{'Model':<16} {'Rows':<7} {'Bytes':<10} {'Default ms':<12} {'Trusted ms':<12} {'Speedup'}")
+    print("-" * 70)
+    for r in part1:
+        print(f"{r['model']:<16} {r['rows']:<7} {r['bytes']:<10} {r['default_ms']:<12} {r['trusted_ms']:<12} {r['speedup']}×")
+
+    try:
+        part2 = live()
+    except requests.ConnectionError:
+        part2 = []
+        print("\nServer not reachable — skipping live endpoints")
+    if part2:
+        print(f"\n{'Endpoint':<30} {'Asked':<10} {'Served':<10} {'Wire bytes':<12} {'P50 ms'}")
+        print("-" * 75)
+        for r in part2:
+            print(f"{r['path']:<30} {r['requested']:<10} {r['served']:<10} {r['wire_bytes']:<12} {r['p50_ms']}")
+
+    with open("tests/reports/serialization_results.json", "w") as f:
+        json.dump({"in_process": part1, "live": part2}, f, indent=2)
+    print("\nRaw results saved to tests/reports/serialization_results.json")
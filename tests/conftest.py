@@ -9,19 +9,22 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 import pytest
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
-from app.core.database import get_db, Base
+from app.core.database import get_db, get_read_db, Base
 from app.core.config import settings
+from app.core.query_stats import capture_queries, install_query_hooks
 
 # ── Real DB fixtures ───────────────────────────────────────────────────────────
 
 REAL_DB_URL = settings.get_database_url()
 
 real_engine = create_engine(REAL_DB_URL, pool_pre_ping=True)
+install_query_hooks(real_engine)
 RealSession = sessionmaker(autocommit=False, autoflush=False, bind=real_engine)
 
 
@@ -42,15 +45,65 @@ def real_db():
     db.close()
 
 
+@pytest.fixture
+def dry_run():
+    """
+    Real DB session whose commit() only flushes, rolled back when the block
+    exits. For running rebuild / reconcile jobs (which commit) to compare
+    their result with what the API maintained, without writing it.
+
+        with dry_run() as db:
+            assert fee_ledger.reconcile(db, [plan_id]) == 0
+    """
+    @contextmanager
+    def _dry_run():
+        db = RealSession()
+        db.commit = db.flush
+        try:
+            yield db
+        finally:
+            db.rollback()
+            db.close()
+
+    return _dry_run
+
+
 @pytest.fixture(scope="module")
 def client():
     """TestClient using the real database."""
     app.dependency_overrides[get_db] = get_real_db
+    app.dependency_overrides[get_read_db] = get_real_db
     with TestClient(app, raise_server_exceptions=False) as c:
         yield c
     app.dependency_overrides.clear()
 
 
+# ── Query budget ──────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def query_budget():
+    """
+    Fail the test when the wrapped block issues more than `max_queries`
+    statements, or repeats one statement shape more than `max_repeat` times.
+
+        with query_budget(10):
+            client.get("/api/v1/auth/me", headers=auth_header(token))
+    """
+    @contextmanager
+    def _budget(max_queries: int, max_repeat: int = None):
+        with capture_queries() as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"Query budget exceeded: {stats.count} > {max_queries}\n{stats.summary()}"
+        )
+        if max_repeat is not None:
+            assert stats.max_repeat <= max_repeat, (
+                f"Repeated statement budget exceeded: {stats.max_repeat} > {max_repeat}\n{stats.summary()}"
+            )
+
+    return _budget
+
+
 # ── Known test credentials (from seed file: password=12345) ───────────────────
 
 ADMIN_EMAIL    = "yuktae@admin.connected.com"
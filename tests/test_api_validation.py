@@ -7,7 +7,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 import pytest
 from conftest import (
-    client, admin_token, teacher_token, student_token, parent_token, auth_header,
+    client, admin_token, teacher_token, student_token, parent_token, auth_header, ADMIN_EMAIL,
 )
 
 # Known IDs from seed data
@@ -177,3 +177,16 @@ class TestMessagingEndpointValidation:
             headers=auth_header(teacher_token),
         )
         assert r.status_code == 422
+
+
+class TestUserImportValidation:
+    def test_background_import_is_pollable(self, client, admin_token):
+        """UT-VAL-24: POST /admin/users/import?background=true → 202 + job_id; the job reports per-row errors."""
+        csv = "full_name,email,role,class\n" + "".join(f"Dup {i},{ADMIN_EMAIL},student,\n" for i in range(3))
+        r = client.post("/api/v1/admin/users/import?background=true",
+                        headers=auth_header(admin_token), files={"file": ("import.csv", csv.encode())})
+        assert r.status_code == 202
+        job = client.get(f"/api/v1/admin/import/jobs/{r.json()['job_id']}",
+                         headers=auth_header(admin_token)).json()
+        assert job["status"] == "completed"
+        assert [e["line"] for e in job["errors"]] == [2, 3, 4]
@@ -0,0 +1,154 @@
+"""
+Test suite: Attendance
+Covers: rollups and daily facts maintained by marking / closing sessions,
+the chronic absentee report's paging, the dashboard's legacy endpoints and
+bulk record upserts.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import calendar
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import delete, select
+
+from conftest import client, admin_token, teacher_token, auth_header, dry_run, TEACHER_EMAIL
+from app.core.database import SessionLocal
+from app.models.admin import TimetableEntry
+from app.models.extensions import (
+    AttendanceDailyFact, AttendanceSession, AttendanceStudentRollup, SessionAttendanceRecord,
+)
+from app.models.user import User
+from app.services import attendance_facts, attendance_rollups
+
+
+@pytest.fixture(scope="module")
+def closed_session(client, teacher_token):
+    """
+    A session on a far-future date opened, marked, re-marked and closed
+    through the teacher API. Yields (session_date, roster student ids); the
+    session is deleted and its students' rollups / the day's facts rebuilt
+    afterwards.
+    """
+    db = SessionLocal()
+    entry = (
+        db.query(TimetableEntry)
+        .join(User, User.id == TimetableEntry.teacher_id)
+        .filter(User.email == TEACHER_EMAIL)
+        .first()
+    )
+    if entry is None:
+        db.close()
+        pytest.skip("seed teacher has no timetable entries")
+    first = date(2099, 1, 1)
+    session_date = first + timedelta((list(calendar.day_name).index(entry.day) - first.weekday()) % 7)
+
+    headers = auth_header(teacher_token)
+    opened = client.post("/api/v1/teachers/attendance/open", headers=headers,
+                         json={"class_id": entry.class_id, "session_date": session_date.isoformat()})
+    assert opened.status_code == 200, opened.text
+    session_id = opened.json()["session_id"]
+    student_ids = [row["student_id"] for row in opened.json()["roster"]]
+    try:
+        if not student_ids:
+            pytest.skip("seed teacher's class has no students")
+        url = f"/api/v1/teachers/attendance/sessions/{session_id}"
+        marks = [{"student_id": sid, "status": s} for sid, s in zip(student_ids, ("PRESENT", "LATE", "EXCUSED"))]
+        assert client.put(f"{url}/records", headers=headers, json={"records": marks}).status_code == 200
+        remark = [{"student_id": student_ids[0], "status": "ABSENT"}]    # PRESENT -> ABSENT moves a count
+        assert client.put(f"{url}/records", headers=headers, json={"records": remark}).status_code == 200
+        assert client.post(f"{url}/close", headers=headers).status_code == 200   # the rest become ABSENT
+        yield session_date, student_ids
+    finally:
+        db.execute(delete(SessionAttendanceRecord).where(SessionAttendanceRecord.attendance_session_id == session_id))
+        db.execute(delete(AttendanceSession).where(AttendanceSession.id == session_id))
+        db.commit()
+        attendance_rollups.rebuild(db, student_ids)
+        attendance_facts.rebuild(db, session_date, session_date)
+        db.close()
+
+
+# ── UT-ATT-01: Incremental Rollups & Facts ────────────────────────────────────
+
+class TestIncrementalAggregates:
+    def test_rollups_match_rebuild(self, closed_session, dry_run):
+        """UT-ATT-01: Rollups kept by marking and closing a session equal a rebuild from its records."""
+        _, student_ids = closed_session
+        rollups = select(
+            AttendanceStudentRollup.student_id, AttendanceStudentRollup.present_count,
+            AttendanceStudentRollup.absent_count, AttendanceStudentRollup.late_count,
+            AttendanceStudentRollup.excused_count, AttendanceStudentRollup.last_marked_date,
+        ).where(AttendanceStudentRollup.student_id.in_(student_ids))
+
+        with dry_run() as db:
+            maintained = sorted(db.execute(rollups).all())
+            attendance_rollups.rebuild(db, student_ids)
+            assert sorted(db.execute(rollups).all()) == maintained
+
+    def test_facts_match_rebuild(self, closed_session, dry_run):
+        """UT-ATT-02: The daily fact written on close equals a rebuild of that day from closed sessions."""
+        session_date, _ = closed_session
+        F = AttendanceDailyFact
+        facts = select(
+            F.class_id, F.subject_id, F.teacher_id,
+            F.present_count, F.absent_count, F.late_count, F.excused_count,
+        ).where(F.session_date == session_date)
+
+        with dry_run() as db:
+            maintained = sorted(db.execute(facts).all())
+            assert maintained
+            attendance_facts.rebuild(db, session_date, session_date)
+            assert sorted(db.execute(facts).all()) == maintained
+
+
+# ── UT-ATT-03: Chronic Absentee Report ────────────────────────────────────────
+
+class TestChronicReport:
+    def test_chronic_keyset_pages(self, client, admin_token):
+        """UT-ATT-03: Without ?limit the report is whole; following X-Next-Cursor yields it exactly once, in order."""
+        headers = auth_header(admin_token)
+        url = "/api/v1/admin/attendance/chronic?threshold=101"
+        unpaged = client.get(url, headers=headers)
+        assert "X-Next-Cursor" not in unpaged.headers
+        full = unpaged.json()
+        paged, cursor = [], None
+        while True:
+            r = client.get(url + "&limit=2" + (f"&cursor={cursor}" if cursor else ""), headers=headers)
+            assert r.status_code == 200
+            paged += r.json()
+            cursor = r.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert paged == full
+        bad = client.get(url + "&cursor=not-a-cursor", headers=headers)
+        assert bad.status_code == 400
+
+
+# ── UT-ATT-04: Dashboard ──────────────────────────────────────────────────────
+
+class TestDashboard:
+    def test_legacy_endpoints_match_dashboard(self, client, admin_token):
+        """UT-ATT-04: /stats, /trend, /distribution and /classwise return the dashboard's sections."""
+        headers = auth_header(admin_token)
+        dash = client.get("/api/v1/admin/attendance/dashboard?range=This Month", headers=headers).json()
+        for section, path in [("stats", "stats"), ("trend", "trend"),
+                              ("distribution", "distribution"), ("classwise", "classwise")]:
+            r = client.get(f"/api/v1/admin/attendance/{path}?range=This Month", headers=headers)
+            assert r.status_code == 200
+            assert r.json() == dash[section]
+
+
+# ── UT-ATT-05: Bulk Upsert ────────────────────────────────────────────────────
+
+class TestBulkUpsert:
+    def test_upsert_dialects(self):
+        """UT-ATT-05: Bulk marking compiles to ON DUPLICATE KEY UPDATE on MySQL and ON CONFLICT on SQLite."""
+        from sqlalchemy.dialects import mysql, sqlite
+        from app.api.teachers import _RECORD_KEY, _mark_set, _records
+        from app.core.upsert import upsert
+
+        my = str(upsert(_records, "mysql", _RECORD_KEY, _mark_set).compile(dialect=mysql.dialect()))
+        assert "ON DUPLICATE KEY UPDATE" in my and "VALUES(status)" in my
+        lite = str(upsert(_records, "sqlite", _RECORD_KEY, _mark_set).compile(dialect=sqlite.dialect()))
+        assert "ON CONFLICT (attendance_session_id, student_id) DO UPDATE" in lite
@@ -10,11 +10,12 @@ from jose import jwt
 
 from conftest import (
     client, admin_token, teacher_token, student_token, parent_token,
-    auth_header, ADMIN_EMAIL, TEACHER_EMAIL, STUDENT_EMAIL, TEST_PASSWORD,
-    DELETED_STUDENT_EMAIL,
+    auth_header, ADMIN_EMAIL, TEACHER_EMAIL, STUDENT_EMAIL, PARENT_EMAIL, TEST_PASSWORD,
+    DELETED_STUDENT_EMAIL, query_budget,
 )
 from app.core.security import hash_password, verify_password, create_access_token, decode_access_token
 from app.core.config import settings
+from app.core.principal_cache import PrincipalCache, Principal, RoleRef
 
 
 # ── UT-AUTH-01: Password Hashing ───────────────────────────────────────────────
@@ -152,3 +153,90 @@ class TestProtectedEndpoints:
         """UT-AUTH-20: GET /auth/me with malformed Authorization header → 403."""
         r = client.get("/api/v1/auth/me", headers={"Authorization": "NotBearer token"})
         assert r.status_code == 403
+
+
+# ── UT-AUTH-05: Principal Cache ───────────────────────────────────────────────
+
+class TestPrincipalCache:
+    def test_warm_request_skips_user_lookup(self, client, admin_token, query_budget):
+        """UT-AUTH-21: Second GET /auth/me with the same token issues no queries."""
+        client.get("/api/v1/auth/me", headers=auth_header(admin_token))
+        with query_budget(0):
+            r = client.get("/api/v1/auth/me", headers=auth_header(admin_token))
+        assert r.status_code == 200
+
+    def test_invalidate_drops_all_tokens_for_user(self):
+        """UT-AUTH-22: invalidate(user_id) evicts every cached token for that user."""
+        import time
+        cache = PrincipalCache(ttl_seconds=60, max_entries=10)
+        p = Principal(id=7, email="x@y.z", full_name="X", role=RoleRef("teacher"), is_active=True)
+        exp = int(time.time()) + 600
+        cache.put(p, exp)
+        cache.put(p, exp + 1)
+        assert cache.get(7, exp) == p
+        cache.invalidate(7)
+        assert cache.get(7, exp) is None
+        assert cache.get(7, exp + 1) is None
+        assert cache.stats()["invalidations"] == 1
+
+
+# ── UT-AUTH-06: Bcrypt Pool ───────────────────────────────────────────────────
+
+class TestBcryptPool:
+    def test_async_helpers_match_sync(self):
+        """UT-AUTH-23: hash_password_async/verify_password_async round-trip."""
+        import asyncio
+        from app.core.security import hash_password_async, verify_password_async
+        h = asyncio.run(hash_password_async("poolpass"))
+        assert verify_password("poolpass", h)
+        assert asyncio.run(verify_password_async("poolpass", h)) is True
+        assert asyncio.run(verify_password_async("wrong", h)) is False
+
+    def test_pool_caps_concurrency(self):
+        """UT-AUTH-24: No more than max_workers jobs run at once."""
+        import threading, time
+        from app.core.bcrypt_pool import BcryptPool
+        pool = BcryptPool(max_workers=2)
+        peak, lock, running = [0], threading.Lock(), [0]
+
+        def job():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+
+        for f in [pool.submit(job) for _ in range(8)]:
+            f.result()
+        assert peak[0] <= 2
+        assert pool.stats()["completed"] == 8
+
+
+# ── UT-AUTH-07: Password Change ───────────────────────────────────────────────
+
+class TestPasswordChange:
+    def test_parent_change_password(self, client, parent_token):
+        """UT-AUTH-25: PATCH /parents/profile/password re-hashes the password; the new one logs in."""
+        url, headers = "/api/v1/parents/profile/password", auth_header(parent_token)
+        r = client.patch(url, headers=headers, json={"old_password": TEST_PASSWORD, "new_password": "changed-123"})
+        try:
+            assert r.status_code == 200, r.text
+            login = client.post("/api/v1/auth/login", json={"email": PARENT_EMAIL, "password": "changed-123"})
+            assert login.status_code == 200
+        finally:
+            # The seed password is shorter than the route allows, so restore the hash directly.
+            from app.core.database import SessionLocal
+            from app.models.user import User
+            db = SessionLocal()
+            try:
+                db.query(User).filter(User.email == PARENT_EMAIL).update({"hashed_password": hash_password(TEST_PASSWORD)})
+                db.commit()
+            finally:
+                db.close()
+
+    def test_parent_change_password_wrong_old(self, client, parent_token):
+        """UT-AUTH-26: A wrong current password is rejected with 400 and nothing changes."""
+        r = client.patch("/api/v1/parents/profile/password", headers=auth_header(parent_token),
+                         json={"old_password": "not-it", "new_password": "changed-123"})
+        assert r.status_code == 400
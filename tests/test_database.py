@@ -0,0 +1,47 @@
+"""
+Test suite: Database Engines & Pools
+Covers: read-replica routing, pool metrics and the async engine's DSN.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from conftest import client, admin_token, auth_header
+from app.core import database
+from app.core.config import settings
+
+
+# ── UT-DB-01: Read Routing ────────────────────────────────────────────────────
+
+class TestReadRouting:
+    def test_read_your_writes_window(self, monkeypatch):
+        """UT-DB-01: A caller that just wrote is pinned to the primary; others are not."""
+        monkeypatch.setattr(database, "read_engine", object())   # pretend a replica exists
+        database.note_write("Bearer writer")
+        assert database.wrote_recently("Bearer writer")
+        assert not database.wrote_recently("Bearer reader")
+        assert not database.wrote_recently(None)
+
+
+# ── UT-DB-02: Pool Metrics ────────────────────────────────────────────────────
+
+class TestPoolMetrics:
+    def test_metrics_endpoint(self, client, admin_token):
+        """UT-DB-02: GET /admin/metrics reports pool occupancy and a wait histogram."""
+        r = client.get("/api/v1/admin/metrics", headers=auth_header(admin_token))
+        assert r.status_code == 200
+        primary = r.json()["db_pools"]["primary"]
+        for key in ("checked_out", "overflow", "pool_size", "wait_ms", "connections"):
+            assert key in primary
+        assert primary["wait_ms"]["histogram"]
+
+
+# ── UT-DB-03: Async Engine ────────────────────────────────────────────────────
+
+class TestAsyncEngine:
+    def test_async_url_derivation(self, monkeypatch):
+        """UT-DB-03: The async DSN swaps in the asyncio driver for MySQL and SQLite."""
+        monkeypatch.setattr(settings, "DATABASE_ASYNC_URL", "")
+        monkeypatch.setattr(settings, "DATABASE_URL", "mysql+pymysql://u:p@h:3306/db")
+        assert settings.get_async_database_url() == "mysql+aiomysql://u:p@h:3306/db"
+        monkeypatch.setattr(settings, "DATABASE_URL", "sqlite:///./t.db")
+        assert settings.get_async_database_url() == "sqlite+aiosqlite:///./t.db"
@@ -0,0 +1,144 @@
+"""
+Test suite: Fees
+Covers: the fee_plans ledger columns maintained by the API, the reminder
+scan's idempotency, the fee students list's paging and bulk plan creation.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from datetime import date
+
+from sqlalchemy import delete, func, insert, select
+
+from conftest import client, admin_token, auth_header, dry_run, STUDENT_EMAIL
+from app.core.database import SessionLocal
+from app.models.admin import StudentProfile
+from app.models.extensions import AcademicPeriod, FeeInstallment, FeeNotificationEvent, FeePayment, FeePlan
+from app.models.user import User
+from app.api import admin_extensions
+from app.services import fee_ledger
+
+
+# ── UT-FEE-01: Ledger ─────────────────────────────────────────────────────────
+
+class TestLedger:
+    def test_ledger_matches_payments(self, client, admin_token, dry_run):
+        """UT-FEE-01: amount_paid / next_due_date kept by plan edits and payments agree with a reconcile."""
+        db = SessionLocal()
+        profile_id = (
+            db.query(StudentProfile.id)
+            .join(User, User.id == StudentProfile.user_id)
+            .filter(User.email == STUDENT_EMAIL)
+            .scalar()
+        )
+        period = AcademicPeriod(name="UT-FEE-01", start_date=date(2099, 1, 1), end_date=date(2099, 12, 31))
+        db.add(period)
+        db.commit()
+        headers = auth_header(admin_token)
+        try:
+            r = client.post("/api/v1/admin/fees/plans", headers=headers, json={
+                "student_id": profile_id, "base_amount": "900.00", "due_date": "2099-12-31",
+                "academic_period_id": period.id,
+                "installments": [{"amount": "300.00", "due_date": "2099-03-31"},
+                                 {"amount": "600.00", "due_date": "2099-09-30"}],
+            })
+            assert r.status_code == 201, r.text
+            plan_id = db.scalar(select(FeePlan.id).where(FeePlan.academic_period_id == period.id))
+            assert client.patch(f"/api/v1/admin/fees/plans/{plan_id}", headers=headers,
+                                json={"due_date": "2099-11-30"}).status_code == 200
+            for amount in ("250.00", "125.50"):
+                assert client.post("/api/v1/admin/fees/payments", headers=headers,
+                                   json={"fee_plan_id": plan_id, "amount_paid": amount}).status_code == 201
+
+            with dry_run() as dry:
+                assert fee_ledger.reconcile(dry, [plan_id]) == 0
+                plan = dry.get(FeePlan, plan_id)
+                assert (float(plan.amount_paid), plan.next_due_date) == (375.5, date(2099, 3, 31))
+        finally:
+            plans = select(FeePlan.id).where(FeePlan.academic_period_id == period.id)
+            for model in (FeePayment, FeeInstallment, FeeNotificationEvent):
+                db.execute(delete(model).where(model.fee_plan_id.in_(plans)))
+            db.execute(delete(FeePlan).where(FeePlan.academic_period_id == period.id))
+            db.execute(delete(AcademicPeriod).where(AcademicPeriod.id == period.id))
+            db.commit()
+            db.close()
+
+
+# ── UT-FEE-02: Reminder Scan ──────────────────────────────────────────────────
+
+class TestReminderScan:
+    def test_notification_scan_idempotent(self, client, admin_token):
+        """UT-FEE-02: A same-day re-run of the fee reminder scan inserts nothing."""
+        url = "/api/v1/admin/fees/notifications/trigger"
+        assert client.post(url, headers=auth_header(admin_token)).status_code == 200
+        r = client.post(url, headers=auth_header(admin_token))
+        assert r.status_code == 200
+        body = r.json()
+        assert (body["upcoming"], body["due_today"], body["overdue"]) == (0, 0, 0)
+
+
+# ── UT-FEE-03: Fee Students List ──────────────────────────────────────────────
+
+class TestFeeStudents:
+    def test_fee_students_keyset_pages(self, client, admin_token):
+        """UT-FEE-03: Without ?limit /fees/students is whole; following X-Next-Cursor yields it exactly once, in order."""
+        headers = auth_header(admin_token)
+        unpaged = client.get("/api/v1/admin/fees/students", headers=headers)
+        assert "X-Next-Cursor" not in unpaged.headers
+        full = unpaged.json()
+        paged, cursor = [], None
+        while True:
+            r = client.get("/api/v1/admin/fees/students?limit=2" + (f"&cursor={cursor}" if cursor else ""),
+                           headers=headers)
+            assert r.status_code == 200
+            paged += r.json()
+            cursor = r.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert paged == full
+
+
+# ── UT-FEE-04: Bulk Plans ─────────────────────────────────────────────────────
+
+class TestBulkPlans:
+    def test_bulk_installments_only_on_its_plans(self, client, admin_token, monkeypatch):
+        """UT-FEE-04: A plan added for the same student and period before the read-back gets none of the bulk installments."""
+        db = SessionLocal()
+        class_id = db.scalar(select(StudentProfile.class_id).where(StudentProfile.class_id.is_not(None)).limit(1))
+        period = AcademicPeriod(name="UT-FEE-04", start_date=date(2099, 1, 1), end_date=date(2099, 12, 31))
+        db.add(period)
+        db.commit()
+
+        read_back = admin_extensions._inserted_plan_ids
+
+        def with_rival(session, last_id, student_ids, plan):
+            session.execute(insert(FeePlan).values(
+                student_id=student_ids[0], academic_period_id=period.id, base_amount=50, discount_amount=0,
+                total_amount=50, due_date=date(2099, 6, 30), amount_paid=0, next_due_date=date(2099, 6, 30),
+            ))
+            return read_back(session, last_id, student_ids, plan)
+
+        monkeypatch.setattr(admin_extensions, "_inserted_plan_ids", with_rival)
+        try:
+            r = client.post("/api/v1/admin/fees/plans/bulk", headers=auth_header(admin_token), json={
+                "class_id": class_id, "base_amount": "900.00", "due_date": "2099-12-31",
+                "academic_period_id": period.id,
+                "installments": [{"amount": "300.00", "due_date": "2099-03-31"},
+                                 {"amount": "600.00", "due_date": "2099-09-30"}],
+            })
+            assert r.status_code == 201, r.text
+            installments = db.execute(
+                select(FeePlan.total_amount, func.count(FeeInstallment.id))
+                .outerjoin(FeeInstallment, FeeInstallment.fee_plan_id == FeePlan.id)
+                .where(FeePlan.academic_period_id == period.id)
+                .group_by(FeePlan.id, FeePlan.total_amount)
+            ).all()
+            assert sorted((float(total), n) for total, n in installments) == \
+                [(50.0, 0)] + [(900.0, 2)] * r.json()["created"]
+        finally:
+            plans = select(FeePlan.id).where(FeePlan.academic_period_id == period.id)
+            db.execute(delete(FeeInstallment).where(FeeInstallment.fee_plan_id.in_(plans)))
+            db.execute(delete(FeePlan).where(FeePlan.academic_period_id == period.id))
+            db.execute(delete(AcademicPeriod).where(AcademicPeriod.id == period.id))
+            db.commit()
+            db.close()
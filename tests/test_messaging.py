@@ -0,0 +1,127 @@
+"""
+Test suite: Messaging
+Covers: inbox paging, per-participant unread counters and the real-time
+WebSocket push.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from contextlib import contextmanager
+
+import pytest
+
+from conftest import client, teacher_token, student_token, auth_header, dry_run, query_budget, TEACHER_EMAIL
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.services import message_unread
+
+
+@pytest.fixture(scope="module")
+def teacher_id(client, student_token):
+    """The seed teacher's user id; skips unless they are one of the seed student's contacts."""
+    db = SessionLocal()
+    try:
+        user_id = db.query(User.id).filter(User.email == TEACHER_EMAIL).scalar()
+    finally:
+        db.close()
+    contacts = client.get("/api/v1/messages/contacts", headers=auth_header(student_token)).json()
+    if not any(c["id"] == user_id for c in contacts):
+        pytest.skip("seed teacher doesn't teach the seed student's class")
+    return user_id
+
+
+# ── UT-MSG-01: Inbox ──────────────────────────────────────────────────────────
+
+class TestInbox:
+    def test_conversation_list_keyset_pages(self, client, teacher_token):
+        """UT-MSG-01: Without ?limit the inbox is whole; following X-Next-Cursor yields it exactly once, newest first."""
+        headers = auth_header(teacher_token)
+        unpaged = client.get("/api/v1/messages/conversations", headers=headers)
+        assert "X-Next-Cursor" not in unpaged.headers
+        full = unpaged.json()
+        paged, cursor = [], None
+        while True:
+            r = client.get("/api/v1/messages/conversations?limit=2" + (f"&cursor={cursor}" if cursor else ""),
+                           headers=headers)
+            assert r.status_code == 200
+            paged += r.json()
+            cursor = r.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert paged == full
+        assert [c["updated_at"] for c in full] == sorted((c["updated_at"] for c in full), reverse=True)
+
+
+# ── UT-MSG-02: Unread Counters ────────────────────────────────────────────────
+
+class TestUnreadCounters:
+    def test_unread_counter_on_send_and_read(self, client, teacher_token, student_token, teacher_id, query_budget):
+        """UT-MSG-02: Sending bumps the recipient's stored unread count, reading clears it, and the badge is one query."""
+        teacher, student = auth_header(teacher_token), auth_header(student_token)
+        before = client.get("/api/v1/messages/unread-count", headers=teacher).json()["unread_count"]
+        conv = client.post("/api/v1/messages/conversations", headers=student,
+                           json={"other_user_id": teacher_id, "initial_message": "UT-MSG-02"}).json()
+        with query_budget(3, max_repeat=1):
+            r = client.get("/api/v1/messages/unread-count", headers=teacher)
+        assert r.json()["unread_count"] == before + 1
+
+        assert client.patch(f"/api/v1/messages/conversations/{conv['id']}/read", headers=teacher).status_code == 204
+        inbox = client.get("/api/v1/messages/conversations", headers=teacher).json()
+        assert next(c for c in inbox if c["id"] == conv["id"])["unread_count"] == 0
+
+    def test_unread_counters_match_messages(self, client, teacher_token, student_token, teacher_id, dry_run):
+        """UT-MSG-03: Counters kept by sending and reading agree with a recount of the conversation's messages."""
+        teacher, student = auth_header(teacher_token), auth_header(student_token)
+        conv = client.post("/api/v1/messages/conversations", headers=student,
+                           json={"other_user_id": teacher_id, "initial_message": "UT-MSG-03 a"}).json()
+        for content in ("UT-MSG-03 b", "UT-MSG-03 c"):
+            assert client.post(f"/api/v1/messages/conversations/{conv['id']}/send", headers=teacher,
+                               json={"content": content}).status_code == 200
+        assert client.patch(f"/api/v1/messages/conversations/{conv['id']}/read", headers=student).status_code == 204
+        # Likely in the same second as the read: counted live, and reconcile must accept that
+        assert client.post(f"/api/v1/messages/conversations/{conv['id']}/send", headers=teacher,
+                           json={"content": "UT-MSG-03 d"}).status_code == 200
+
+        with dry_run() as db:
+            assert message_unread.reconcile(db, [conv["id"]]) == 0
+
+
+# ── UT-MSG-04: Real-Time Push ─────────────────────────────────────────────────
+
+@contextmanager
+def socket(client, token):
+    """A messaging socket authenticated with `token` and subscribed (its "ready" event consumed)."""
+    with client.websocket_connect("/api/v1/messages/ws") as ws:
+        ws.send_json({"type": "auth", "token": token})
+        assert ws.receive_json() == {"type": "ready"}
+        yield ws
+
+
+class TestRealtime:
+    @pytest.mark.parametrize("frame", [{"type": "auth", "token": "not-a-jwt"}, {"token": "x"}, "hello"])
+    def test_socket_rejects_bad_auth(self, client, frame):
+        """UT-MSG-04: The messaging socket closes with 1008 unless the first frame carries a valid messaging-role token."""
+        from starlette.websockets import WebSocketDisconnect
+
+        with pytest.raises(WebSocketDisconnect) as exc:
+            with client.websocket_connect("/api/v1/messages/ws") as ws:
+                ws.send_json(frame)
+                ws.receive_text()
+        assert exc.value.code == 1008
+
+    def test_send_pushes_message_and_unread(self, client, teacher_token, student_token, teacher_id):
+        """UT-MSG-05: A sent message, the recipient's unread count and the read receipt arrive on the sockets."""
+        student = auth_header(student_token)
+        with socket(client, teacher_token) as teacher_ws, socket(client, student_token) as student_ws:
+            conv = client.post("/api/v1/messages/conversations", headers=student,
+                               json={"other_user_id": teacher_id, "initial_message": "UT-MSG-05"}).json()
+            event = teacher_ws.receive_json()
+            assert event["type"] == "message"
+            assert event["message"]["content"] == "UT-MSG-05" and not event["message"]["is_mine"]
+            event = teacher_ws.receive_json()
+            assert event["type"] == "unread" and event["conversation_id"] == conv["id"]
+            assert event["unread_count"] >= 1
+
+            client.patch(f"/api/v1/messages/conversations/{conv['id']}/read", headers=auth_header(teacher_token))
+            events = [student_ws.receive_json() for _ in range(3)]
+            assert {"type": "read", "conversation_id": conv["id"], "user_id": teacher_id} in events
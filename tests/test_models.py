@@ -139,3 +139,22 @@ class TestStudentProfileModel:
         if profile:
             cls = real_db.query(Class).filter(Class.id == profile.class_id).first()
             assert cls is not None
+
+
+class TestIdSequence:
+    def test_reservations_never_overlap(self):
+        """UT-MODEL-13: Two id_sequences reservations return disjoint ranges."""
+        from app.services.id_allocator import IdAllocator
+        alloc = IdAllocator(block_size=5)
+        a_start, a_end = alloc.reserve("staff_id", 2)
+        b_start, b_end = alloc.reserve("staff_id", 2)
+        assert a_end - a_start == 2
+        assert b_start >= a_end
+
+    def test_codes_start_after_existing(self, real_db):
+        """UT-MODEL-14: Allocated student codes are never already in student_profiles."""
+        from app.services.id_allocator import IdAllocator
+        codes = IdAllocator(block_size=3).take("student_code", 3)
+        assert len(set(codes)) == 3 and all(c.startswith("ST") for c in codes)
+        taken = real_db.query(StudentProfile).filter(StudentProfile.student_code.in_(codes)).count()
+        assert taken == 0
@@ -0,0 +1,253 @@
+"""
+Test suite: SQL query budgets
+Covers: statement-shape normalisation, X-DB-* response headers, and
+per-endpoint query ceilings so N+1 regressions fail CI.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from conftest import (
+    client, admin_token, teacher_token, student_token, auth_header, query_budget,
+    ADMIN_EMAIL,
+)
+from app.core.query_stats import normalize_statement
+
+
+class TestStatementShape:
+    def test_bind_params_collapse(self):
+        """UT-QB-01: Different bind values normalise to the same shape."""
+        a = normalize_statement("SELECT * FROM users WHERE users.id = %(id_1)s")
+        b = normalize_statement("SELECT * FROM users WHERE users.id = 42")
+        assert a == b
+
+    def test_in_list_collapses(self):
+        """UT-QB-02: IN-lists of any length normalise to a single (?)."""
+        a = normalize_statement("SELECT 1 FROM t WHERE id IN (%(id_1_1)s, %(id_1_2)s)")
+        b = normalize_statement("SELECT 1 FROM t WHERE id IN (%(id_1_1)s)")
+        assert a == b
+
+
+class TestQueryHeaders:
+    def test_headers_present(self, client, student_token):
+        """UT-QB-03: Responses carry X-DB-Query-Count and X-DB-Time-Ms."""
+        r = client.get("/api/v1/auth/me", headers=auth_header(student_token))
+        assert r.status_code == 200
+        assert int(r.headers["X-DB-Query-Count"]) >= 1
+        assert float(r.headers["X-DB-Time-Ms"]) >= 0
+
+
+class TestEndpointBudgets:
+    def test_auth_me_budget(self, client, student_token, query_budget):
+        """UT-QB-04: GET /auth/me stays within 3 queries."""
+        with query_budget(3):
+            r = client.get("/api/v1/auth/me", headers=auth_header(student_token))
+        assert r.status_code == 200
+
+    def test_teacher_stats_budget(self, client, teacher_token, query_budget):
+        """UT-QB-05: GET /teachers/stats stays within 6 queries."""
+        with query_budget(6):
+            r = client.get("/api/v1/teachers/stats", headers=auth_header(teacher_token))
+        assert r.status_code == 200
+
+    def test_attendance_trend_budget(self, client, admin_token, query_budget):
+        """UT-QB-06: GET /admin/attendance/trend is a single aggregate."""
+        with query_budget(4, max_repeat=2):
+            r = client.get("/api/v1/admin/attendance/trend", headers=auth_header(admin_token))
+        assert r.status_code == 200
+
+
+class TestImportBudget:
+    def _csv(self, n):
+        # Every row uses an existing email so nothing is written to the DB
+        lines = ["full_name,email,role,class"]
+        lines += [f"Dup {i},{ADMIN_EMAIL},student," for i in range(n)]
+        return ("import.csv", "\n".join(lines).encode())
+
+    def test_import_query_count_is_flat(self, client, admin_token, query_budget):
+        """UT-QB-07: CSV import issues the same handful of queries for 5 or 500 rows."""
+        for n in (5, 500):
+            with query_budget(12, max_repeat=2):
+                r = client.post("/api/v1/admin/users/import",
+                                headers=auth_header(admin_token), files={"file": self._csv(n)})
+            assert r.status_code == 200
+            assert r.json()["skipped"] == n
+
+
+class TestReadRouting:
+    def test_writes_are_counted(self):
+        """UT-QB-09: QueryStats counts INSERT/UPDATE/DELETE separately from reads."""
+        from app.core.query_stats import QueryStats
+        stats = QueryStats()
+        stats.record("SELECT 1", 0.1)
+        stats.record("  update users SET full_name = %(x)s", 0.1)
+        stats.record("INSERT INTO t VALUES (1)", 0.1)
+        assert (stats.count, stats.writes) == (3, 2)
+
+
+class TestPoolMetrics:
+    def test_peak_connections_per_pool(self):
+        """UT-QB-12: Only connections held from the same pool count toward the peak."""
+        from app.core.query_stats import QueryStats
+        stats = QueryStats()
+        stats.connection_acquired("primary")
+        stats.connection_acquired("replica")
+        assert stats.peak_connections == 1
+        stats.connection_acquired("primary")
+        assert stats.peak_connections == 2
+
+
+class TestAsyncRoutes:
+    def test_student_timetable_budget(self, client, student_token, query_budget):
+        """UT-QB-14: Async GET /students/timetable eager-loads — no per-entry lookups."""
+        with query_budget(3, max_repeat=1):
+            r = client.get("/api/v1/students/timetable", headers=auth_header(student_token))
+        assert r.status_code == 200
+
+
+class TestAttendanceRollups:
+    def test_chronic_report_single_query(self, client, admin_token, query_budget):
+        """UT-QB-19: GET /admin/attendance/chronic reads rates from the rollup in one query."""
+        with query_budget(3, max_repeat=1):
+            r = client.get("/api/v1/admin/attendance/chronic?threshold=101", headers=auth_header(admin_token))
+        assert r.status_code == 200
+        rates = [row["attendance_rate"] for row in r.json()]
+        assert rates == sorted(rates)
+
+    def test_chronic_windowed_report_single_query(self, client, admin_token, query_budget):
+        """UT-QB-21: A date-filtered chronic report is one grouped HAVING query, not one per student."""
+        with query_budget(3, max_repeat=1):
+            r = client.get(
+                "/api/v1/admin/attendance/chronic?threshold=101&date_from=2020-01-01&date_to=2100-12-31",
+                headers=auth_header(admin_token),
+            )
+        assert r.status_code == 200
+
+    def test_attendance_records_page_is_batched(self, client, admin_token, query_budget):
+        """UT-QB-23: GET /admin/attendance/records fetches rates and histories once per page."""
+        with query_budget(5, max_repeat=1):
+            r = client.get("/api/v1/admin/attendance/records?limit=100", headers=auth_header(admin_token))
+        assert r.status_code == 200
+        for row in r.json():
+            assert len(row["history"]) <= 10
+
+
+class TestAttendanceDashboard:
+    def test_dashboard_two_statements(self, client, admin_token, query_budget):
+        """UT-QB-24: GET /admin/attendance/dashboard aggregates everything in at most two statements."""
+        from app.services import attendance_dashboard
+        attendance_dashboard.invalidate()
+        with query_budget(3, max_repeat=1):
+            r = client.get("/api/v1/admin/attendance/dashboard?range=This Term", headers=auth_header(admin_token))
+        assert r.status_code == 200
+        assert set(r.json()) == {"range", "stats", "trend", "distribution", "classwise"}
+
+
+class TestAttendanceFacts:
+    def test_teacher_stats_reads_facts(self, client, teacher_token, query_budget):
+        """UT-QB-27: GET /teachers/stats stays within a fixed budget regardless of term length."""
+        with query_budget(4, max_repeat=1):
+            r = client.get("/api/v1/teachers/stats", headers=auth_header(teacher_token))
+        assert r.status_code == 200
+        assert 0.0 <= r.json()["avg_attendance_rate"] <= 100.0
+
+
+class TestStudentAttendanceSummary:
+    def test_summary_constant_queries(self, client, student_token, query_budget):
+        """UT-QB-29: GET /students/attendance is two statements however long the history is."""
+        with query_budget(4, max_repeat=1):
+            r = client.get("/api/v1/students/attendance", headers=auth_header(student_token))
+        assert r.status_code == 200
+        body = r.json()
+        assert len(body["recent"]) <= 30
+        assert body["total_sessions"] == sum(
+            body[k] for k in ("present_count", "absent_count", "late_count", "excused_count", "unmarked_count")
+        )
+
+
+class TestFeeLedger:
+    def test_fee_stats_single_aggregate(self, client, admin_token, query_budget):
+        """UT-QB-30: GET /admin/fees/stats is one aggregate over fee_plans, not a payments walk per plan."""
+        with query_budget(3, max_repeat=1):
+            r = client.get("/api/v1/admin/fees/stats", headers=auth_header(admin_token))
+        assert r.status_code == 200
+        body = r.json()
+        assert body["fully_paid_count"] + body["overdue_count"] <= body["total_students"]
+
+    def test_notification_scan_budget(self, client, admin_token, query_budget):
+        """UT-QB-32: The fee reminder scan is a fixed handful of set-based statements."""
+        url = "/api/v1/admin/fees/notifications/trigger"
+        assert client.post(url, headers=auth_header(admin_token)).status_code == 200
+        with query_budget(4, max_repeat=1):
+            r = client.post(url, headers=auth_header(admin_token))
+        assert r.status_code == 200
+
+
+class TestCsvExport:
+    @pytest.mark.parametrize("path", [
+        "/api/v1/admin/export/student",
+        "/api/v1/admin/export/teacher",
+        "/api/v1/admin/export/parent",
+        "/api/v1/admin/fees/export/csv",
+    ])
+    def test_export_single_streamed_query(self, client, admin_token, query_budget, path):
+        """UT-QB-33: CSV exports stream one SELECT however many rows they contain."""
+        with query_budget(4, max_repeat=1):
+            r = client.get(path, headers=auth_header(admin_token))
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("text/csv")
+        assert len(r.text.splitlines()) >= 1
+
+
+class TestBulkFeePlans:
+    def test_bulk_plans_constant_queries(self, client, admin_token, query_budget):
+        """UT-QB-34: Whole-school plan generation is a fixed number of statements; a re-run skips everyone."""
+        from datetime import date
+        from sqlalchemy import delete, select
+        from app.core.database import SessionLocal
+        from app.models.extensions import AcademicPeriod, FeeInstallment, FeePlan
+
+        db = SessionLocal()
+        period = AcademicPeriod(name="UT-QB-34", start_date=date(2026, 1, 1), end_date=date(2026, 12, 31))
+        db.add(period)
+        db.commit()
+        payload = {
+            "base_amount": "1000.00", "due_date": "2026-12-31", "academic_period_id": period.id,
+            "installments": [{"amount": "500.00", "due_date": "2026-06-30"}, {"amount": "500.00", "due_date": "2026-12-31"}],
+        }
+        try:
+            with query_budget(8, max_repeat=1):
+                first = client.post("/api/v1/admin/fees/plans/bulk", json=payload, headers=auth_header(admin_token))
+            assert first.status_code == 201
+            rerun = client.post("/api/v1/admin/fees/plans/bulk", json=payload, headers=auth_header(admin_token)).json()
+            assert rerun == {"created": 0, "skipped": first.json()["created"] + first.json()["skipped"]}
+        finally:
+            plans = select(FeePlan.id).where(FeePlan.academic_period_id == period.id)
+            db.execute(delete(FeeInstallment).where(FeeInstallment.fee_plan_id.in_(plans)))
+            db.execute(delete(FeePlan).where(FeePlan.academic_period_id == period.id))
+            db.execute(delete(AcademicPeriod).where(AcademicPeriod.id == period.id))
+            db.commit()
+            db.close()
+
+
+class TestFeeStudents:
+    @pytest.mark.parametrize("query", ["", "?status=overdue", "?status=partial"])
+    def test_fee_students_page_constant_queries(self, client, admin_token, query_budget, query):
+        """UT-QB-35: A /fees/students page is one joined query plus one for payments and one for installments."""
+        with query_budget(5, max_repeat=1):
+            r = client.get(f"/api/v1/admin/fees/students{query}", headers=auth_header(admin_token))
+        assert r.status_code == 200
+        if query:
+            expected = query.split("=")[1]
+            for row in r.json():
+                assert row["is_overdue"] if expected == "overdue" else row["status"] == expected
+
+
+class TestInbox:
+    def test_conversation_list_constant_queries(self, client, teacher_token, query_budget):
+        """UT-QB-37: The inbox is one query however many conversations the user has."""
+        with query_budget(3, max_repeat=1):
+            r = client.get("/api/v1/messages/conversations", headers=auth_header(teacher_token))
+        assert r.status_code == 200
+        for conv in r.json():
+            assert conv["unread_count"] >= 0
@@ -0,0 +1,88 @@
+"""
+Test suite: Response Cache & Serialization
+Covers: strong-ETag revalidation, scope invalidation, the trusted orjson
+response path and gzip compression.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+
+from conftest import client, admin_token, auth_header, query_budget
+from app.core.database import SessionLocal
+from app.core.response_cache import ResponseCache
+from app.models.admin import TimetableEntry
+from app.models.extensions import Location
+
+
+# ── UT-RESP-01: Response Cache ────────────────────────────────────────────────
+
+class TestResponseCache:
+    def test_etag_revalidation_skips_db(self, client, admin_token, query_budget):
+        """UT-RESP-01: A matching If-None-Match on /admin/subjects is a 304 with zero queries."""
+        headers = auth_header(admin_token)
+        first = client.get("/api/v1/admin/subjects", headers=headers)
+        assert first.status_code == 200 and first.headers["ETag"]
+        with query_budget(0):
+            r = client.get("/api/v1/admin/subjects",
+                           headers={**headers, "If-None-Match": first.headers["ETag"]})
+        assert r.status_code == 304
+        assert r.headers["ETag"] == first.headers["ETag"]
+
+    def test_bump_invalidates_scope(self):
+        """UT-RESP-02: Bumping a scope drops its bodies; a body read before the bump is never stored."""
+        cache = ResponseCache(ttl_seconds=60, max_entries=10)
+        gen = cache.generation()
+        cache.put("k", ["timetable:class:1"], [1, 2], gen)
+        assert cache.get("k") is not None
+        cache.bump("timetable:class:2")
+        assert cache.get("k") is not None
+        cache.bump("timetable:class:1")
+        assert cache.get("k") is None
+        cache.put("k", ["timetable:class:1"], [1], gen)   # stale read
+        assert cache.get("k") is None
+
+    def test_location_rename_refreshes_timetable(self, client, admin_token):
+        """UT-RESP-03: Renaming a location shows up in a cached class timetable straight away."""
+        db = SessionLocal()
+        try:
+            row = (
+                db.query(TimetableEntry.class_id, Location.id, Location.name)
+                .join(Location, Location.id == TimetableEntry.location_id)
+                .first()
+            )
+        finally:
+            db.close()
+        if row is None:
+            pytest.skip("no timetable entry with a location in the seed data")
+        class_id, location_id, name = row
+        headers = auth_header(admin_token)
+        url = f"/api/v1/admin/timetable?class_id={class_id}"
+        assert client.get(url, headers=headers).status_code == 200   # warm the cache
+        client.put(f"/api/v1/admin/locations/{location_id}", headers=headers, json={"name": "UT-RESP-03 Room"})
+        try:
+            names = {slot["location_name"] for slot in client.get(url, headers=headers).json()}
+            assert "UT-RESP-03 Room" in names and name not in names
+        finally:
+            client.put(f"/api/v1/admin/locations/{location_id}", headers=headers, json={"name": name})
+
+
+# ── UT-RESP-04: Serialization ─────────────────────────────────────────────────
+
+class TestSerialization:
+    def test_trusted_users_match_model(self, client, admin_token, monkeypatch):
+        """UT-RESP-04: GET /admin/users (trusted path) still validates as List[AdminUserRead]."""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "TRUSTED_RESPONSES_VALIDATE", True)
+        r = client.get("/api/v1/admin/users", headers=auth_header(admin_token))
+        assert r.status_code == 200
+        assert set(r.json()[0]) == {"id", "full_name", "email", "role", "class_name", "is_active"}
+
+    def test_gzip_above_threshold(self, client, admin_token):
+        """UT-RESP-05: Large bodies are gzip-encoded on request; tiny ones are not."""
+        headers = {**auth_header(admin_token), "Accept-Encoding": "gzip"}
+        big = client.get("/api/v1/admin/users", headers=headers)
+        assert big.headers.get("content-encoding") == "gzip"
+        assert "accept-encoding" in big.headers.get("vary", "").lower()
+        small = client.get("/api/v1/auth/me", headers=headers)
+        assert "content-encoding" not in small.headers